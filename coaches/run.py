@@ -1,12 +1,22 @@
-import csv
 import argparse
 import yaml
 from pathlib import Path
-from datetime import datetime
-from playwright.sync_api import sync_playwright, Error as PlaywrightError
+from collections import Counter
+from playwright.sync_api import Error as PlaywrightError
 
-from scraper.resolver import find_staff_url
-from scraper.parser import parse_all_coaches
+from scraper.resolver import find_staff_url, staff_page_html
+from scraper.parser import load_custom_layouts, parse_all_coaches
+from scraper.pool import BrowserUnavailable, run_pool
+from scraper.cache import BioEmailCache, ResolutionCache
+from scraper.enrich import BioEnricher
+from scraper.blocking import ResourceBlocker, rendered_empty
+from scraper.output import COACH_FIELDS, ERROR_FIELDS, TextReport, completed_schools, drop_retryable_errors
+from scraper.fetch import HttpPage, TierStats, looks_js_rendered, make_session
+
+# Shared with the domain finder (see scraper/shared/__init__.py).
+from scraper.shared.metrics import METRICS, Progress
+from scraper.shared.schools import load_schools
+from scraper.shared.streaming import CsvAppender
 
 def load_config(config_path='config.yaml'):
     try:
@@ -16,125 +26,372 @@ def load_config(config_path='config.yaml'):
         print(f"[FATAL] Error loading config.yaml: {e}")
         exit(1)
 
-def get_schools(csv_path, limit):
+def get_schools(csv_path, limit, cache_dir=None):
     try:
-        with open(csv_path, 'r', encoding='utf-8') as f:
-            schools = list(csv.DictReader(f))
-        return schools[:limit] if limit else schools
+        return load_schools(csv_path, cache_dir=cache_dir, limit=limit)
     except Exception as e:
         print(f"[FATAL] Error loading input CSV: {e}")
         exit(1)
 
-def log_to_txt(logfile, message):
-    ts = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    with open(logfile, 'a', encoding='utf-8') as f:
-        f.write(f"[{ts}] {message}\n")
+def open_resolution_cache(config, refresh=False):
+    cache_cfg = config.get('resolution_cache', {})
+    if not cache_cfg.get('enabled', True):
+        return None
+    ttl_seconds = float(cache_cfg.get('ttl_days', 7)) * 86400
+    return ResolutionCache(cache_cfg.get('path', 'cache/staff_urls.sqlite'), ttl_seconds=ttl_seconds, refresh=refresh)
+
+def bio_page_for(config, page):
+    """Page for inline bio lookups, or None when emails are filled in by the enrichment stage."""
+    return None if config.get('bio_enrichment', {}).get('deferred', True) else page
+
+def try_http_tier(http_page, name, domain, profile, config, visited, cache=None):
+    """
+    Resolves and parses a staff page over plain HTTP.
+
+    Returns the coaches found, or None when the page must be escalated to the
+    browser (no staff URL over HTTP, JS-rendered shell, or no layout matched).
+    """
+    print(f"  [FETCH] Trying HTTP tier for '{domain}'")
+    # A path missing over plain HTTP may still exist for the browser (JS routing, bot checks),
+    # so only hits are cached here; the browser tier records the misses.
+    staff_page_url = find_staff_url(
+        http_page, domain, profile.get('path_templates', []), config.get('navigation_timeout', 30000),
+        cache=cache, visited=visited, cache_misses=False,
+    )
+    if not staff_page_url:
+        return None
+    html_content = staff_page_html(visited, staff_page_url)
+    if looks_js_rendered(html_content):
+        print(f"  [FETCH] JS-rendered page, escalating to browser: {staff_page_url}")
+        return None
+    coaches = parse_all_coaches(
+        html_content, name, staff_page_url, bio_page_for(config, http_page), sport_keywords=profile.get("sport_keywords", []),
+    )
+    if not coaches:
+        print(f"  [FETCH] No layout matched over HTTP, escalating to browser: {staff_page_url}")
+        return None
+    return coaches
+
+def scrape_profile(worker, name, school, domain, profile, config, visited, cache=None, blocker=None, http_page=None, http_visited=None):
+    """
+    Resolves and parses one profile's staff page for a school. Returns coaches,
+    errors, report lines and the fetch tier ('http' or 'browser') that served it.
+    The worker's browser page is only opened when the HTTP tier cannot serve it.
+    """
+    result = {'coaches': [], 'errors': [], 'log': [], 'tier': None}
+
+    def fail(error_log, prefix="ERROR: ", retryable=False):
+        result['errors'].append({'school_name': name, 'error': error_log, 'retryable': 'yes' if retryable else 'no'})
+        result['log'].append(f"{prefix}{error_log}")
+
+    if http_page is not None:
+        coaches = try_http_tier(http_page, name, domain, profile, config, http_visited, cache=cache)
+        if coaches:
+            layout_types = set([c.get('DetectedLayout', 'Standard') for c in coaches])
+            found_msg = f"{len(coaches)} coaches found at {name} over HTTP [Layouts used: {', '.join(layout_types)}]"
+            print(f"  [SUCCESS] {found_msg}")
+            result['log'].append(f"SUCCESS: {found_msg}")
+            result['coaches'].extend(coaches)
+            result['tier'] = 'http'
+            return result
+
+    result['tier'] = 'browser'
+    page = worker.page
+    staff_page_url = find_staff_url(
+        page, domain, profile.get('path_templates', []), config.get('navigation_timeout', 30000),
+        probe=config.get('http_probe', False), cache=cache, visited=visited,
+    )
+    if not staff_page_url:
+        # Timeouts, blocks and 5xx answers leave templates undecided: try the school again next run.
+        undecided = any(v.get("verdict") == "inconclusive" for v in visited.values())
+        fail(f"No valid staff page URL found for {name} (domain: {domain}).", retryable=undecided)
+        return result
+    html_content = staff_page_html(visited, staff_page_url)
+    if html_content is None:
+        html_content = page.content()
+    if blocker and not blocker.is_full_load(domain) and rendered_empty(html_content):
+        # Some layouts only render once their blocked scripts/assets load; retry this domain in full.
+        print(f"  [BLOCKING] Page rendered empty with resource blocking, reloading in full: {staff_page_url}")
+        result['log'].append(f"INFO: Resource blocking disabled for {domain} (page rendered empty).")
+        blocker.mark_full_load(domain)
+        with METRICS.timer("navigate_browser", key=staff_page_url):
+            page.goto(staff_page_url, timeout=config.get('navigation_timeout', 30000), wait_until="domcontentloaded")
+        html_content = page.content()
+        for visit in visited.values():
+            if visit.get("final_url") == staff_page_url:
+                visit["html"] = html_content
+    sport_keywords = profile.get("sport_keywords", [])
+    coaches = parse_all_coaches(html_content, name, staff_page_url, bio_page_for(config, page), sport_keywords=sport_keywords)
+    if coaches:
+        layout_types = set([c.get('DetectedLayout', 'Standard') for c in coaches])
+        found_msg = f"{len(coaches)} coaches found at {name} [Layouts used: {', '.join(layout_types)}]"
+        print(f"  [SUCCESS] {found_msg}")
+        result['log'].append(f"SUCCESS: {found_msg}")
+        result['coaches'].extend(coaches)
+    else:
+        status_msg = school.status
+        reason = "No coaches found - The page was valid but data could not be extracted, or the sport/team does not exist."
+        if staff_page_url and "staff" in staff_page_url.lower() and (status_msg == "FOUND" or "athletics" in domain):
+            reason += " (Probably the requested sport or staff does not exist - Only directory/admin listing found.)"
+        fail(f"{reason} [URL tried: {staff_page_url}]", prefix=f"FAIL: {name}: ")
+    return result
+
+def scrape_school(worker, i, total, school, profiles, config, domain_map, cache=None, blocker=None, http_session=None):
+    """
+    Scrapes one school on the worker's page for every requested profile.
+
+    Each distinct URL is loaded at most once per school; profiles that share a
+    staff page (e.g. /staff-directory) parse the same captured HTML with their
+    own sport keywords.
+
+    Returns {profile_name: {'coaches', 'errors', 'log'}} so the caller can merge
+    results from several workers in input order.
+    """
+    name = school.school_name
+    if not name:
+        return None
+    results = {}
+    visited = {}
+    # Browser and HTTP visits are memoized separately: a page escalated from HTTP must be re-rendered.
+    http_visited = {}
+    http_page = HttpPage(http_session) if http_session is not None else None
+
+    def fail(profile_name, error_log, retryable=False):
+        results[profile_name] = {
+            'coaches': [],
+            'errors': [{'school_name': name, 'error': error_log, 'retryable': 'yes' if retryable else 'no'}],
+            'log': [f"ERROR: {error_log}"],
+        }
+
+    print(f"\n--- [{i}/{total}] Processing: {name} ---")
+    domain = domain_map.get(name, school.athletics_domain)
+    for profile_name, profile in profiles.items():
+        if len(profiles) > 1:
+            print(f"  [PROFILE] {profile_name}")
+        try:
+            if not domain or domain.lower() == "not_found":
+                fail(profile_name, f"No athletics domain found for {name}.")
+                continue
+            worker.scope.update(domain=domain, allow=profile.get('resource_allow', []))
+            results[profile_name] = scrape_profile(
+                worker, name, school, domain, profile, config, visited,
+                cache=cache, blocker=blocker, http_page=http_page, http_visited=http_visited,
+            )
+        except BrowserUnavailable:
+            # Not this school's outcome: the run stops (see main) and the school is scraped on resume.
+            raise
+        except PlaywrightError as e:
+            fail(profile_name, f"Playwright navigation error for {name}: {e}", retryable=True)
+            # Only this worker's page is replaced; other workers keep going.
+            worker.recycle()
+        except Exception as e:
+            fail(profile_name, f"Unhandled exception for {name}: {str(e)}", retryable=True)
+    return results
+
+def open_bio_cache(config, refresh=False):
+    if not config.get('bio_enrichment', {}).get('cache', True):
+        return None
+    cache_cfg = config.get('resolution_cache', {})
+    ttl_seconds = float(cache_cfg.get('ttl_days', 7)) * 86400
+    return BioEmailCache(cache_cfg.get('path', 'cache/staff_urls.sqlite'), ttl_seconds=ttl_seconds, refresh=refresh)
+
+def select_profiles(args, config):
+    """Returns {name: profile} for --profile, --profiles or --all-profiles, or None if a name is unknown."""
+    available = config.get('sport_profiles', {}) or {}
+    if args.all_profiles:
+        names = list(available)
+    elif args.profiles:
+        names = [n.strip() for n in args.profiles.split(',') if n.strip()]
+    else:
+        names = [args.profile]
+    missing = [n for n in names if n not in available]
+    if missing:
+        print(f"[FATAL] Profile(s) {', '.join(repr(n) for n in missing)} not found in config.yaml.")
+        return None
+    return {n: available[n] for n in names}
 
 def main():
     parser = argparse.ArgumentParser(description="Universities Staff Scraper with full English logging")
-    parser.add_argument('--profile', required=True, help="Profile in config.yaml (e.g., soccer_womens)")
+    selection = parser.add_mutually_exclusive_group(required=True)
+    selection.add_argument('--profile', help="Profile in config.yaml (e.g., soccer_womens)")
+    selection.add_argument('--profiles', help="Comma-separated profiles scraped in a single pass (e.g., soccer_womens,soccer_mens)")
+    selection.add_argument('--all-profiles', action='store_true', help="Scrape every profile in config.yaml in a single pass")
     parser.add_argument('--limit', type=int, default=0, help="Limit schools (default=all)")
+    parser.add_argument('--probe', action='store_true', help="Probe staff URL candidates over HTTP before opening the browser")
+    parser.add_argument('--refresh-cache', action='store_true', help="Ignore cached staff URL results and re-resolve every domain")
+    parser.add_argument('--block-resources', action='store_true', help="Abort images, media, fonts and trackers on every page load")
+    parser.add_argument('--http-first', action='store_true', help="Fetch staff pages over plain HTTP first; use the browser only when needed")
+    parser.add_argument('--fresh', action='store_true', help="Discard existing output for the selected profiles instead of resuming")
+    parser.add_argument('--workers', type=int, default=1, help="Parallel browser workers (default=1, serial)")
     args = parser.parse_args()
 
     config = load_config()
+    if args.probe:
+        config['http_probe'] = True
+    if args.http_first:
+        config['http_first'] = True
+    if args.block_resources:
+        config.setdefault('resource_blocking', {})['enabled'] = True
     output_dir = Path(config.get('output_directory', 'output'))
     output_dir.mkdir(exist_ok=True)
-    profile = config.get('sport_profiles', {}).get(args.profile)
-    if not profile:
-        print(f"[FATAL] Profile '{args.profile}' not found in config.yaml.")
+    profiles = select_profiles(args, config)
+    if not profiles:
         return
+    for layout in load_custom_layouts(config):
+        print(f"-- Custom layout registered: {layout.name} (priority {layout.priority})")
 
     input_csv = config.get("input_csv_path")
-    schools = get_schools(input_csv, args.limit)
+    schools = get_schools(input_csv, args.limit, config.get('schools_cache_dir', 'cache/schools') or None)
     domain_map = config.get('domain_map', {})
-    txt_report = output_dir / f"report_{args.profile}.txt"
-    all_coaches, errors = [], []
+    resume = config.get('resume', True) and not args.fresh
+    coach_paths = {n: output_dir / f"coaches_{n}.csv" for n in profiles}
+    error_paths = {n: output_dir / f"errors_{n}.csv" for n in profiles}
+    done = {n: set() for n in profiles}
+    for n in profiles:
+        if resume:
+            done[n] = completed_schools(coach_paths[n], error_paths[n])
+            retried = drop_retryable_errors(error_paths[n])
+            if retried:
+                print(f"-- Resuming {n}: {retried} school(s) with a transient error are scraped again")
+        else:
+            for path in (coach_paths[n], error_paths[n]):
+                path.unlink(missing_ok=True)
+
+    # Each school only runs the profiles it has no output for yet.
+    work = []
+    for school in schools:
+        name = school.school_name
+        todo = {n: p for n, p in profiles.items() if name not in done[n]}
+        if todo:
+            work.append((school, todo))
 
-    with open(txt_report, 'w', encoding='utf-8') as f:
-        f.write(f"--- Scrape Report {args.profile} ---\n")
+    reports = {n: TextReport(output_dir / f"report_{n}.txt", n, append=resume and bool(done[n])) for n in profiles}
+    coach_streams = {n: CsvAppender(coach_paths[n], COACH_FIELDS) for n in profiles}
+    error_streams = {n: CsvAppender(error_paths[n], ERROR_FIELDS) for n in profiles}
 
-    print(f"-- Scraper started with profile '{args.profile}' | Input CSV: {input_csv} --")
+    print(f"-- Scraper started with profile(s) '{', '.join(profiles)}' | Input CSV: {input_csv} --")
     print(f"-- Output directory: {output_dir}")
+    if any(done.values()):
+        print(f"-- Resuming: {len(schools) - len(work)} of {len(schools)} schools already done (use --fresh to start over)")
+    if args.workers > 1:
+        print(f"-- Workers: {args.workers} parallel browser contexts")
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
-        for i, school in enumerate(schools, 1):
-            name = school.get('school_name', '').strip()
-            if not name:
-                continue
-            print(f"\n--- [{i}/{len(schools)}] Processing: {name} ---")
-            try:
-                domain = domain_map.get(name, school.get('athletics_domain', '').strip())
-                if not domain or domain.lower() == "not_found":
-                    error_log = f"No athletics domain found for {name}."
-                    errors.append({'school_name': name, 'error': error_log})
-                    log_to_txt(txt_report, f"ERROR: {error_log}")
-                    continue
-                staff_page_url = find_staff_url(page, domain, profile.get('path_templates', []), config.get('navigation_timeout', 30000))
-                if not staff_page_url:
-                    error_log = f"No valid staff page URL found for {name} (domain: {domain})."
-                    errors.append({'school_name': name, 'error': error_log})
-                    log_to_txt(txt_report, f"ERROR: {error_log}")
-                    continue
-                html_content = page.content()
-                sport_keywords = profile.get("sport_keywords", [])
-                coaches = parse_all_coaches(html_content, name, staff_page_url, page, sport_keywords=sport_keywords)
-                if coaches:
-                    layout_types = set([c.get('DetectedLayout', 'Standard') for c in coaches])
-                    found_msg = f"{len(coaches)} coaches found at {name} [Layouts used: {', '.join(layout_types)}]"
-                    print(f"  [SUCCESS] {found_msg}")
-                    log_to_txt(txt_report, f"SUCCESS: {found_msg}")
-                    all_coaches.extend(coaches)
-                else:
-                    school_div = school.get("division", "")
-                    status_msg = school.get("status", "")
-                    reason = "No coaches found - The page was valid but data could not be extracted, or the sport/team does not exist."
-                    if staff_page_url and "staff" in staff_page_url.lower() and (status_msg == "FOUND" or "athletics" in domain):
-                        reason += " (Probably the requested sport or staff does not exist - Only directory/admin listing found.)"
-                    error_log = f"{reason} [URL tried: {staff_page_url}]"
-                    errors.append({'school_name': name, 'error': error_log})
-                    log_to_txt(txt_report, f"FAIL: {name}: {error_log}")
-            except PlaywrightError as e:
-                error_log = f"Playwright navigation error for {name}: {e}"
-                errors.append({'school_name': name, 'error': error_log})
-                log_to_txt(txt_report, f"ERROR: {error_log}")
-                try: page.close(); page = browser.new_page()
-                except: pass
-                continue
-            except Exception as e:
-                error_log = f"Unhandled exception for {name}: {str(e)}"
-                errors.append({'school_name': name, 'error': error_log})
-                log_to_txt(txt_report, f"ERROR: {error_log}")
+    cache = open_resolution_cache(config, refresh=args.refresh_cache)
+    blocking_cfg = config.get('resource_blocking', {}) or {}
+    blocker = ResourceBlocker(blocking_cfg) if blocking_cfg.get('enabled') else None
+    on_context = (lambda worker: blocker.install(worker.context, worker.scope)) if blocker else None
+    http_session = make_session(pool_size=max(10, args.workers * 2)) if config.get('http_first') else None
+    enrich_cfg = config.get('bio_enrichment', {})
+    bio_cache = open_bio_cache(config, refresh=args.refresh_cache) if enrich_cfg.get('deferred', True) else None
+    enrich_totals = Counter()
+    # One enrichment stage for the whole run: bio URLs are deduplicated across batches, and its
+    # browser threads are separate from the scraping workers (and only launch when needed).
+    enricher = BioEnricher(
+        workers=enrich_cfg.get('workers', max(args.workers, 4)), cache=bio_cache,
+        http_session=http_session, on_context=on_context,
+    ) if enrich_cfg.get('deferred', True) else None
+    tier_stats = TierStats()
+    sync_every = max(1, int(config.get('output_sync_every', 10)))
+    batch = []
+
+    def flush_batch():
+        """Fills in deferred bio emails for the finished schools, then writes and fsyncs their rows."""
+        pending_bios = [c for results in batch for r in results.values() for c in r['coaches'] if c.get('BioURL')]
+        if pending_bios:
+            enrich_totals.update(enricher.enrich(pending_bios))
+        for results in batch:
+            for profile_name, result in results.items():
+                coach_streams[profile_name].write_rows(result['coaches'])
+                error_streams[profile_name].write_rows(result['errors'])
+        for handle in (*coach_streams.values(), *error_streams.values(), *reports.values()):
+            handle.sync()
+        batch.clear()
+
+    def task(worker, i, item):
+        with METRICS.timer("school", key=item[0].school_name):
+            return scrape_school(
+                worker, i, len(work), item[0], item[1], config, domain_map,
+                cache=cache, blocker=blocker, http_session=http_session,
+            )
+
+    METRICS.reset()
+    performance = config.get('performance', {}) or {}
+    progress = Progress(len(work), show_eta=performance.get('show_eta', False))
+    progress_interval = max(1, int(performance.get('progress_interval', 10)))
+    done_count = 0
+    try:
+        for _, results in run_pool(work, task, workers=args.workers, on_context=on_context):
+            done_count += 1
+            if progress.show_eta and done_count % progress_interval == 0:
+                print(f"\n[PROGRESS] {progress.line(done_count)}")
+            if not results:
                 continue
-        browser.close()
-
-    coach_path = output_dir / f"coaches_{args.profile}.csv"
-    error_path = output_dir / f"errors_{args.profile}.csv"
-    if all_coaches:
-        fieldnames = ['School', 'Coach', 'Role', 'Email', 'SourceURL', 'DetectedLayout']
-        with open(coach_path, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(all_coaches)
-        print(f"\n[INFO] {len(all_coaches)} coaches written to '{coach_path}'.")
-        log_to_txt(txt_report, f"{len(all_coaches)} coaches written to '{coach_path}'.")
-    else:
-        print("[INFO] No coach records were found to write.")
-        log_to_txt(txt_report, "No coach records found.")
-
-    if errors:
-        with open(error_path, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=['school_name', 'error'])
-            writer.writeheader()
-            writer.writerows(errors)
-        print(f"[INFO] {len(errors)} error entries written to '{error_path}'.")
-        log_to_txt(txt_report, f"{len(errors)} error entries written to '{error_path}'.")
-    else:
-        print("[INFO] No errors were logged.")
-        log_to_txt(txt_report, "No errors logged.")
+            for profile_name, result in results.items():
+                for message in result['log']:
+                    reports[profile_name].log(message)
+                if result.get('tier'):
+                    tier_stats.add(result['tier'])
+            batch.append(results)
+            if len(batch) >= sync_every:
+                flush_batch()
+        flush_batch()
+    except BrowserUnavailable as e:
+        # Schools finished before the failure are kept; the others get no row, so a rerun resumes with them.
+        flush_batch()
+        print(f"[FATAL] {e}")
+        print("[FATAL] Install the browser with 'playwright install chromium', then rerun to resume.")
+        exit(1)
+    finally:
+        for handle in (*coach_streams.values(), *error_streams.values()):
+            handle.close()
+        if enricher:
+            enricher.close()
+        if cache:
+            cache.close()
+        if bio_cache:
+            bio_cache.close()
+
+    summary = []
+    if enrich_totals['bio_urls']:
+        summary.append(
+            f"Bio enrichment: {enrich_totals['bio_urls']} unique bio pages, {enrich_totals['cached']} cached, "
+            f"{enrich_totals['emails']} emails filled in."
+        )
+    if http_session:
+        http_session.close()
+        tiers = tier_stats.snapshot()
+        summary.append(f"Fetch tiers: {tiers.get('http', 0)} served over HTTP, {tiers.get('browser', 0)} needed the browser.")
+    for message in summary:
+        print(f"\n[INFO] {message}")
+
+    metrics_file = performance.get('metrics_file') or str(output_dir / "run_metrics.jsonl")
+    METRICS.write_summary(
+        metrics_file, pipeline='coaches', profiles=list(profiles), input=input_csv, workers=args.workers,
+        schools=len(work), coaches={n: coach_streams[n].rows for n in profiles}, errors={n: error_streams[n].rows for n in profiles},
+    )
+    print(f"\n[INFO] Where the time went (full summary appended to '{metrics_file}'):")
+    for line in METRICS.report():
+        print(f"  {line}")
 
-    print(f"\n[TXT REPORT] Complete log saved at: {txt_report}")
+    for profile_name in profiles:
+        report = reports[profile_name]
+        for message in summary:
+            report.log(message)
+        coach_count, error_count = coach_streams[profile_name].rows, error_streams[profile_name].rows
+        if coach_count:
+            print(f"\n[INFO] {coach_count} coaches written to '{coach_paths[profile_name]}'.")
+            report.log(f"{coach_count} coaches written to '{coach_paths[profile_name]}'.")
+        else:
+            print(f"[INFO] No coach records were found to write for '{profile_name}'.")
+            report.log("No coach records found.")
+        if error_count:
+            print(f"[INFO] {error_count} error entries written to '{error_paths[profile_name]}'.")
+            report.log(f"{error_count} error entries written to '{error_paths[profile_name]}'.")
+        else:
+            print(f"[INFO] No errors were logged for '{profile_name}'.")
+            report.log("No errors logged.")
+        report.close()
+        print(f"\n[TXT REPORT] Complete log saved at: {report.path}")
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,94 @@
+# scraper/blocking.py
+
+import re
+import threading
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlparse
+
+DEFAULT_BLOCKED_TYPES = ["image", "media", "font"]
+
+DEFAULT_BLOCKED_HOSTS = [
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googlesyndication.com",
+    "doubleclick.net",
+    "adservice.google.com",
+    "facebook.net",
+    "connect.facebook.net",
+    "scorecardresearch.com",
+    "quantserve.com",
+    "hotjar.com",
+    "taboola.com",
+    "outbrain.com",
+    "amazon-adsystem.com",
+    "adnxs.com",
+    "criteo.com",
+    "pubmatic.com",
+    "rubiconproject.com",
+    "moatads.com",
+]
+
+_TAG_RE = re.compile(r"<(script|style|noscript)\b.*?</\1>|<[^>]+>", re.S | re.I)
+
+
+def _host_matches(host: str, patterns: Iterable[str]) -> bool:
+    return any(host == p or host.endswith("." + p) for p in patterns)
+
+
+def rendered_empty(html: Optional[str], min_text: int = 200) -> bool:
+    """True when a page has almost no visible text, e.g. a JS shell whose data never loaded."""
+    if not html:
+        return True
+    text = _TAG_RE.sub(" ", html)
+    return len(" ".join(text.split())) < min_text
+
+
+class ResourceBlocker:
+    """
+    Aborts images, media, fonts and tracker requests on pages whose HTML is all we read.
+
+    Installed on every browser context through BrowserWorker's on_context hook.
+    Each worker keeps a `scope` dict ({"domain": ..., "allow": [...]}) describing
+    the school/profile it is working on; `allow` holds hosts or resource types
+    that must load for that profile. Domains listed under `full_load_domains`
+    in config, or that rendered empty once with blocking on, are always loaded
+    in full.
+    """
+
+    def __init__(self, settings: Dict):
+        self.blocked_types = set(settings.get("blocked_resource_types", DEFAULT_BLOCKED_TYPES))
+        self.blocked_hosts = [h.lower() for h in settings.get("blocked_hosts", DEFAULT_BLOCKED_HOSTS)]
+        self.allow = [a.lower() for a in settings.get("allow", [])]
+        self._full_load = {d.lower() for d in settings.get("full_load_domains", [])}
+        self._lock = threading.Lock()
+
+    def install(self, context, scope: Dict):
+        context.route("**/*", lambda route: self._handle(route, scope))
+
+    def _handle(self, route, scope: Dict):
+        request = route.request
+        try:
+            if self.should_block(request.url, request.resource_type, scope):
+                route.abort()
+                return
+            route.continue_()
+        except Exception:
+            # The page may already be closed or navigated away; nothing to do.
+            pass
+
+    def should_block(self, url: str, resource_type: str, scope: Dict) -> bool:
+        if self.is_full_load(scope.get("domain", "")):
+            return False
+        allow = self.allow + [a.lower() for a in scope.get("allow", [])]
+        host = (urlparse(url).hostname or "").lower()
+        if resource_type in allow or _host_matches(host, allow):
+            return False
+        return resource_type in self.blocked_types or _host_matches(host, self.blocked_hosts)
+
+    def is_full_load(self, domain: str) -> bool:
+        with self._lock:
+            return domain.strip().lower() in self._full_load
+
+    def mark_full_load(self, domain: str):
+        with self._lock:
+            self._full_load.add(domain.strip().lower())
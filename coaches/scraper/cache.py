@@ -0,0 +1,119 @@
+# scraper/cache.py
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+
+class _SqliteCache:
+    """Thread-safe SQLite table with TTL eviction on a `checked_at` column."""
+
+    TABLE = ""
+    SCHEMA = ""
+
+    def __init__(self, path: str, ttl_seconds: float = 7 * 86400, refresh: bool = False):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.refresh = refresh
+        self._lock = threading.Lock()
+        # One connection per cache file: school workers and the bio enrichment threads all
+        # read and write it, and sqlite3 connections are not safe to use concurrently.
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(self.SCHEMA)
+        self.evict_expired()
+
+    def evict_expired(self) -> int:
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock, self._conn:
+            return self._conn.execute(f"DELETE FROM {self.TABLE} WHERE checked_at < ?", (cutoff,)).rowcount
+
+    def _fresh(self, checked_at: float) -> bool:
+        return checked_at >= time.time() - self.ttl_seconds
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ResolutionCache(_SqliteCache):
+    """
+    On-disk cache of staff-URL resolution results, keyed by (domain, path template).
+
+    Every entry records whether the template was a hit or a miss, the final URL
+    after redirects, the HTTP status and when it was checked. Entries older than
+    `ttl_seconds` are ignored and evicted. Path templates are shared by many
+    profiles (e.g. "/staff-directory"), so one lookup serves all of them.
+
+    With refresh=True nothing is read from the cache, but new results still
+    overwrite the stored ones.
+    """
+
+    TABLE = "staff_urls"
+    SCHEMA = """CREATE TABLE IF NOT EXISTS staff_urls (
+                    domain TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    hit INTEGER NOT NULL,
+                    final_url TEXT,
+                    status INTEGER,
+                    checked_at REAL NOT NULL,
+                    PRIMARY KEY (domain, path)
+                )"""
+
+    @staticmethod
+    def _key(domain: str, path: str):
+        return domain.strip().lower(), path.strip()
+
+    def get(self, domain: str, path: str) -> Optional[Dict]:
+        if self.refresh:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT hit, final_url, status, checked_at FROM staff_urls WHERE domain = ? AND path = ?",
+                self._key(domain, path),
+            ).fetchone()
+        if not row or not self._fresh(row[3]):
+            return None
+        return {"hit": bool(row[0]), "final_url": row[1], "status": row[2], "checked_at": row[3]}
+
+    def put(self, domain: str, path: str, hit: bool, final_url: Optional[str] = None, status: Optional[int] = None):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO staff_urls (domain, path, hit, final_url, status, checked_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (*self._key(domain, path), int(hit), final_url, status, time.time()),
+            )
+
+
+class BioEmailCache(_SqliteCache):
+    """
+    On-disk cache of emails found on coach bio pages, keyed by bio URL.
+
+    An empty string means the page was fetched and had no email, so it is not
+    fetched again until the entry expires.
+    """
+
+    TABLE = "bio_emails"
+    SCHEMA = """CREATE TABLE IF NOT EXISTS bio_emails (
+                    url TEXT PRIMARY KEY,
+                    email TEXT NOT NULL,
+                    checked_at REAL NOT NULL
+                )"""
+
+    def get(self, url: str) -> Optional[str]:
+        if self.refresh:
+            return None
+        with self._lock:
+            row = self._conn.execute("SELECT email, checked_at FROM bio_emails WHERE url = ?", (url,)).fetchone()
+        if not row or not self._fresh(row[1]):
+            return None
+        return row[0]
+
+    def put(self, url: str, email: Optional[str]):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO bio_emails (url, email, checked_at) VALUES (?, ?, ?)",
+                (url, email or "", time.time()),
+            )
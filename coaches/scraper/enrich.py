@@ -0,0 +1,152 @@
+# scraper/enrich.py
+
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+import requests
+
+from scraper.cache import BioEmailCache
+from scraper.parser import extract_email, get_email_from_bio_page
+from scraper.pool import BrowserWorker
+from scraper.shared.metrics import METRICS
+
+BIO_TIMEOUT = 20000
+
+
+def _http_email(session: requests.Session, url: str, timeout: int) -> Optional[str]:
+    """Looks for an email in the server HTML of a bio page. None means "ask the browser"."""
+    try:
+        with METRICS.timer("bio_http", key=url):
+            resp = session.get(url, timeout=timeout / 1000, allow_redirects=True)
+        if resp.ok:
+            return extract_email(resp.text)
+    except requests.RequestException:
+        pass
+    return None
+
+
+class BioEnricher:
+    """
+    Bio-page email lookups for a whole run, fed one batch of coaches at a time.
+
+    Bio URLs are deduplicated across every batch (and, through the cache,
+    across runs). Each URL is tried over plain HTTP first when a session is
+    given, then in one of `workers` browser threads owned by the enricher.
+    Those threads live for the whole run and only start a browser when a bio
+    page actually needs one, so batches never launch browsers of their own
+    and never start Playwright on the thread that is scraping.
+    """
+
+    def __init__(
+        self,
+        workers: int = 4,
+        cache: Optional[BioEmailCache] = None,
+        http_session: Optional[requests.Session] = None,
+        on_context: Optional[Callable[[BrowserWorker], None]] = None,
+        timeout: int = BIO_TIMEOUT,
+    ):
+        self.cache = cache
+        self.http_session = http_session
+        self.timeout = timeout
+        self._lookups: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._http = ThreadPoolExecutor(max_workers=max(1, workers * 2), thread_name_prefix="bio-http") if http_session else None
+        self._jobs: "queue.Queue[tuple | None]" = queue.Queue()
+        self._threads = [
+            threading.Thread(target=self._browser_loop, args=(w, on_context), name=f"bio-browser-{w}", daemon=True)
+            for w in range(1, max(1, workers) + 1)
+        ]
+        for t in self._threads:
+            t.start()
+
+    def _browser_loop(self, worker_id: int, on_context):
+        worker = BrowserWorker(worker_id, on_context=on_context)
+        try:
+            while True:
+                job = self._jobs.get()
+                if job is None:
+                    return
+                url, future = job
+                try:
+                    email = get_email_from_bio_page(worker.page, url)
+                except Exception as e:
+                    # No browser: nothing was learned about the page, so nothing is cached.
+                    print(f"      -> [WARN] Could not open a browser for bio page '{url}': {e}")
+                    future.set_result(("", "browser"))
+                    continue
+                self._finish(url, future, email, "browser")
+        finally:
+            worker.close()
+
+    def _finish(self, url: str, future: Future, email: Optional[str], source: str):
+        if self.cache:
+            self.cache.put(url, email)
+        future.set_result((email or "", source))
+
+    def _fetch(self, url: str, future: Future):
+        email = _http_email(self.http_session, url, self.timeout)
+        if email:
+            self._finish(url, future, email, "http")
+        else:
+            self._jobs.put((url, future))
+
+    def _lookup(self, url: str) -> Future:
+        """Future of (email, source) for a bio URL; started at most once per run."""
+        with self._lock:
+            future = self._lookups.get(url)
+            if future is not None:
+                return future
+            future = self._lookups[url] = Future()
+        cached = self.cache.get(url) if self.cache else None
+        if cached is not None:
+            future.set_result((cached, "cached"))
+        elif self._http is not None:
+            self._http.submit(self._fetch, url, future)
+        else:
+            self._jobs.put((url, future))
+        return future
+
+    def enrich(self, coaches: List[Dict]) -> Dict[str, int]:
+        """
+        Fills in `Email` for coaches the parsers left with a pending "BioURL",
+        waiting for this batch's lookups, and removes every "BioURL" key.
+
+        Returns counts for the batch: unique URLs, cache hits (including URLs
+        already looked up in an earlier batch), HTTP and browser fetches, emails.
+        """
+        urls = list(dict.fromkeys(c["BioURL"] for c in coaches if c.get("BioURL")))
+        stats = {"bio_urls": len(urls), "cached": 0, "http": 0, "browser": 0, "emails": 0}
+        with self._lock:
+            seen = {url for url in urls if url in self._lookups}
+        lookups = {url: self._lookup(url) for url in urls}
+        pending = sum(1 for url in urls if url not in seen and not lookups[url].done())
+        if pending:
+            print(f"\n[ENRICH] Fetching {pending} bio page(s) ({len(urls) - pending} known, {len(urls)} unique).")
+
+        emails = {}
+        for url, future in lookups.items():
+            email, source = future.result()
+            emails[url] = email
+            stats["cached" if url in seen else source] += 1
+        for coach in coaches:
+            url = coach.pop("BioURL", None)
+            if url and not coach.get("Email") and emails.get(url):
+                coach["Email"] = emails[url]
+                stats["emails"] += 1
+        return stats
+
+    def close(self):
+        if self._http is not None:
+            self._http.shutdown(wait=True)
+        for _ in self._threads:
+            self._jobs.put(None)
+        for t in self._threads:
+            t.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
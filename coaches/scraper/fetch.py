@@ -0,0 +1,95 @@
+# scraper/fetch.py
+
+import re
+import threading
+from collections import Counter
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from scraper.blocking import rendered_empty
+from scraper.probe import DEFAULT_HEADERS, is_dns_error, is_inconclusive_status
+from scraper.shared.metrics import METRICS
+
+# Markers of client-side rendered shells whose staff data only appears after scripts run.
+_JS_SHELL_RE = re.compile(
+    r"enable javascript|requires javascript|javascript is (?:disabled|required)"
+    r"|<div[^>]+id=[\"'](?:app|root|__nuxt)[\"'][^>]*>\s*</div>",
+    re.I,
+)
+
+
+class HttpNavigationError(Exception):
+    """Raised by HttpPage.goto when plain HTTP cannot decide (blocked, timed out, unresolved host)."""
+
+
+class HttpResponse:
+    def __init__(self, status: int):
+        self.status = status
+        self.ok = 200 <= status < 400
+
+
+def make_session(pool_size: int = 10) -> requests.Session:
+    """Keep-alive session with per-host connection reuse; requests negotiates gzip by default."""
+    session = requests.Session()
+    session.headers.update(DEFAULT_HEADERS)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class HttpPage:
+    """
+    Minimal stand-in for a Playwright Page (goto/url/content) backed by a pooled
+    requests.Session, so find_staff_url and the parsers run unchanged over plain HTTP.
+
+    Blocked statuses, 5xx responses and network failures raise HttpNavigationError, which the
+    resolver treats as inconclusive rather than caching a miss. Unresolvable
+    hosts raise with Playwright's net::ERR_NAME_NOT_RESOLVED wording.
+    """
+
+    tier = "http"
+
+    def __init__(self, session: requests.Session):
+        self.session = session
+        self.url = "about:blank"
+        self._html = ""
+
+    def goto(self, url: str, timeout: int = 30000, wait_until: Optional[str] = None) -> HttpResponse:
+        try:
+            resp = self.session.get(url, timeout=timeout / 1000, allow_redirects=True)
+        except requests.RequestException as e:
+            if is_dns_error(e):
+                raise HttpNavigationError(f"net::ERR_NAME_NOT_RESOLVED at {url}") from e
+            raise HttpNavigationError(f"{type(e).__name__} at {url}") from e
+        if is_inconclusive_status(resp.status_code):
+            raise HttpNavigationError(f"HTTP {resp.status_code} at {url}")
+        self.url = resp.url
+        self._html = resp.text
+        return HttpResponse(resp.status_code)
+
+    def content(self) -> str:
+        return self._html
+
+
+def looks_js_rendered(html: Optional[str]) -> bool:
+    """True when server HTML is an empty shell that needs a real browser to fill in."""
+    return rendered_empty(html) or bool(_JS_SHELL_RE.search(html or ""))
+
+
+class TierStats:
+    """Thread-safe counter of how many school/profile pairs each fetch tier served."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = Counter()
+
+    def add(self, tier: str):
+        with self._lock:
+            self._counts[tier] += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
@@ -0,0 +1,54 @@
+# scraper/layouts.py
+
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+# extract(soup, school, source_url, page, sport_keywords) -> list of coach dicts
+Extractor = Callable[..., List[Dict]]
+# detect(soup, fingerprint, source_url) -> bool
+Detector = Callable[..., bool]
+
+
+class Layout:
+    """
+    A staff-page layout known to the parser cascade.
+
+    A layout is tried when its detection predicate accepts the document. By
+    default that means any of its `signature` classes appears in the page
+    fingerprint; an empty signature always matches. Layouts are tried by
+    descending priority and the first one that yields coaches wins.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        label: str,
+        extract: Extractor,
+        priority: int = 0,
+        signature: Iterable[str] = (),
+        detect: Optional[Detector] = None,
+    ):
+        self.name = name
+        self.label = label
+        self.extract = extract
+        self.priority = priority
+        self.signature = frozenset(signature)
+        self.detect = detect
+
+    def matches(self, soup, fingerprint: Set[str], source_url: str = "") -> bool:
+        if self.detect is not None:
+            return self.detect(soup, fingerprint, source_url)
+        return not self.signature or not self.signature.isdisjoint(fingerprint)
+
+
+_REGISTRY: Dict[str, Layout] = {}
+
+
+def register_layout(layout: Layout) -> Layout:
+    """Adds a layout to the cascade, replacing any layout with the same name."""
+    _REGISTRY[layout.name] = layout
+    return layout
+
+
+def registered_layouts() -> List[Layout]:
+    """All layouts, highest priority first (registration order breaks ties)."""
+    return sorted(_REGISTRY.values(), key=lambda layout: -layout.priority)
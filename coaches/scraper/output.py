@@ -0,0 +1,87 @@
+# scraper/output.py
+
+import csv
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Set
+
+COACH_FIELDS = ['School', 'Coach', 'Role', 'Email', 'SourceURL', 'DetectedLayout']
+ERROR_FIELDS = ['school_name', 'error', 'retryable']
+# Transient failures in error files written before the `retryable` column existed.
+TRANSIENT_ERRORS = ('Playwright navigation error', 'Unhandled exception')
+
+
+class TextReport:
+    """Timestamped text report written through one buffered handle."""
+
+    def __init__(self, path: Path, title: str, append: bool = False):
+        self.path = Path(path)
+        self._file = open(self.path, 'a' if append else 'w', encoding='utf-8')
+        if append:
+            self.log(f"--- Resumed {title} ---")
+        else:
+            self._file.write(f"--- Scrape Report {title} ---\n")
+
+    def log(self, message: str):
+        ts = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self._file.write(f"[{ts}] {message}\n")
+
+    def sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self.sync()
+        self._file.close()
+
+
+def is_retryable(row: Dict[str, str]) -> bool:
+    """True for error rows left by a transient failure (navigation timeout, crash, browser down)."""
+    if row.get('retryable') is not None:
+        return row['retryable'] == 'yes'
+    return row.get('error', '').startswith(TRANSIENT_ERRORS)
+
+
+def completed_schools(coach_path: Path, error_path: Path) -> Set[str]:
+    """
+    Schools that already have coach rows, or an error row with a definitive
+    outcome (no domain, no staff page, no coaches) from a previous run.
+    Schools whose only errors are retryable are scraped again.
+    """
+    done: Set[str] = set()
+    for path, column in ((coach_path, 'School'), (error_path, 'school_name')):
+        if not Path(path).exists():
+            continue
+        try:
+            with open(path, 'r', encoding='utf-8', newline='') as f:
+                done.update(row.get(column, '') for row in csv.DictReader(f) if column == 'School' or not is_retryable(row))
+        except Exception as e:
+            print(f"[WARN] Could not read '{path}' to resume: {e}")
+    done.discard('')
+    return done
+
+
+def drop_retryable_errors(error_path: Path) -> int:
+    """
+    Rewrites an error file without its retryable rows, whose schools are about
+    to be scraped again, and in the current ERROR_FIELDS layout. Returns the
+    number of rows dropped.
+    """
+    path = Path(error_path)
+    if not path.exists():
+        return 0
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.DictReader(f)
+        rows = list(reader)
+        up_to_date = reader.fieldnames == ERROR_FIELDS
+    kept = [dict(row, retryable='no') for row in rows if not is_retryable(row)]
+    if up_to_date and len(kept) == len(rows):
+        return 0
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=ERROR_FIELDS, extrasaction='ignore', lineterminator='\n')
+        writer.writeheader()
+        writer.writerows(kept)
+    os.replace(tmp, path)
+    return len(rows) - len(kept)
@@ -1,8 +1,12 @@
-from bs4 import BeautifulSoup, Tag
+from bs4 import BeautifulSoup, CData, NavigableString, Tag
 import re
-from typing import List, Dict, Optional
+import soupsieve as sv
+from typing import Dict, List, Optional, Set, Tuple
 from playwright.sync_api import Page
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlparse
+
+from scraper.layouts import Layout, register_layout, registered_layouts
+from scraper.shared.metrics import METRICS
 
 VALID_ROLE_KEYWORDS = [
     "coach",
@@ -48,22 +52,63 @@ EXCLUDED_ROLE_KEYWORDS = [
     "operations",
 ]
 
+# Selectors are compiled once at import; soupsieve would otherwise re-parse the
+# selector string on every call, for every row and card.
+MAILTO = sv.compile('a[href^="mailto:"]')
+ANY_LINK = sv.compile("a")
+PRESTO_CARD_CONTAINER = sv.compile(".coaches-headshot-container, .staff-headshot-container, .directory-list")
+PRESTO_CARD_ITEM = sv.compile(".card, .item")
+PRESTO_CARD_NAME = sv.compile("a.card-title, h5.card-title a, h5.card-title, .name a, .name")
+PRESTO_CARD_ROLE = sv.compile("p.card-text, .position")
+PRESTO_BIO_CONTAINER = sv.compile(".coach-bios-wrapper, .coach-bios")
+PRESTO_BIO = sv.compile(".coach-bio")
+PRESTO_BIO_INFO = sv.compile(".info")
+PRESTO_BIO_NAME = sv.compile("span.name")
+SIDEARM_TABLE = sv.compile("table.sidearm-table, table.default-table")
+SIDEARM_TABLE_ROW = sv.compile("tbody tr")
+SIDEARM_TABLE_NAME = sv.compile('th a, td a[href*="/roster/coaches/"], td a[href*="/coaches/"]')
+SIDEARM_CARDS_CONTAINER = sv.compile(
+    ".sidearm-coaches, .sidearm-coach-list, .sidearm-roster-coaches, .sidearm-staff-directory, .sidearm-staff, .sidearm-staff-list"
+)
+SIDEARM_CARD = sv.compile(
+    ".sidearm-coach, .sidearm-coach-card, .sidearm-roster-coach-card, .sidearm-staff-member, .sidearm-person, .sidearm-staff-row"
+)
+SIDEARM_CARD_NAME = sv.compile(
+    'a[href*="/coaches/"], a[href*="/staff/"], .sidearm-coach-name a, .sidearm-coach-name, .sidearm-person-name a, .sidearm-person-name, .coach-name a, .coach-name, h3 a, h3, h4 a, h4'
+)
+SIDEARM_CARD_ROLE = sv.compile(".sidearm-coach-title, .sidearm-person-title, .title, .position, .sidearm-staff-title")
+
+def extract_email(content: str) -> Optional[str]:
+    soup = BeautifulSoup(content, "lxml")
+    email_el = MAILTO.select_one(soup)
+    if email_el and email_el.has_attr("href"):
+        return email_el["href"].replace("mailto:", "").strip()
+    email_match = re.search(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}", content)
+    if email_match:
+        return email_match.group(0)
+    return None
+
 def get_email_from_bio_page(page: Page, bio_url: str) -> Optional[str]:
     try:
         print(f"      -> Navigating to bio page: {bio_url}")
-        page.goto(bio_url, wait_until="domcontentloaded", timeout=20000)
-        content = page.content()
-        soup = BeautifulSoup(content, "lxml")
-        email_el = soup.select_one('a[href^="mailto:"]')
-        if email_el and email_el.has_attr("href"):
-            return email_el["href"].replace("mailto:", "").strip()
-        email_match = re.search(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}", content)
-        if email_match:
-            return email_match.group(0)
+        with METRICS.timer("bio_browser", key=bio_url):
+            page.goto(bio_url, wait_until="domcontentloaded", timeout=20000)
+            return extract_email(page.content())
     except Exception as e:
         print(f"      -> [WARN] Could not get email from bio page '{bio_url}': {e}")
     return None
 
+def resolve_bio_email(page: Optional[Page], bio_url: str) -> Tuple[str, str]:
+    """
+    Returns (email, pending_bio_url) for a coach without a mailto link.
+
+    With a page the bio is fetched inline; with page=None the lookup is deferred
+    and the URL is handed back for the bio enrichment stage (scraper/enrich.py).
+    """
+    if page is None:
+        return "", bio_url
+    return get_email_from_bio_page(page, bio_url) or "", ""
+
 def is_excluded_role(role: str) -> bool:
     if not role:
         return False
@@ -103,17 +148,13 @@ def extract_full_name(text):
 def parse_presto_format(soup: BeautifulSoup, school: str, source_url: str) -> List[Dict]:
     coaches = []
     seen = set()
-    card_container = soup.select_one(
-        ".coaches-headshot-container, .staff-headshot-container, .directory-list"
-    )
+    card_container = PRESTO_CARD_CONTAINER.select_one(soup)
     if card_container:
         print("  [INFO] Detected PrestoSports format (cards/list).")
-        for item in card_container.select(".card, .item"):
-            name_tag = item.select_one(
-                "a.card-title, h5.card-title a, h5.card-title, .name a, .name"
-            )
-            role_tag = item.select_one("p.card-text, .position")
-            email_tag = item.select_one('a[href^="mailto:"]')
+        for item in PRESTO_CARD_ITEM.select(card_container):
+            name_tag = PRESTO_CARD_NAME.select_one(item)
+            role_tag = PRESTO_CARD_ROLE.select_one(item)
+            email_tag = MAILTO.select_one(item)
             name = name_tag.get_text(strip=True) if name_tag else ""
             role = role_tag.get_text(strip=True) if role_tag else ""
             email = (
@@ -129,12 +170,12 @@ def parse_presto_format(soup: BeautifulSoup, school: str, source_url: str) -> Li
                     {"School": school, "Coach": name, "Role": role, "Email": email, "SourceURL": source_url}
                 )
                 seen.add(key)
-    bio_container = soup.select_one(".coach-bios-wrapper, .coach-bios")
+    bio_container = PRESTO_BIO_CONTAINER.select_one(soup)
     if bio_container:
         print("  [INFO] Detected PrestoSports format (coach bios).")
-        for bio in bio_container.select(".coach-bio"):
-            info = bio.select_one(".info") or bio
-            name_el = info.select_one("span.name") or info.select_one("a")
+        for bio in PRESTO_BIO.select(bio_container):
+            info = PRESTO_BIO_INFO.select_one(bio) or bio
+            name_el = PRESTO_BIO_NAME.select_one(info) or ANY_LINK.select_one(info)
             name = name_el.get_text(strip=True) if name_el else ""
             href = ""
             if isinstance(name_el, Tag):
@@ -152,7 +193,7 @@ def parse_presto_format(soup: BeautifulSoup, school: str, source_url: str) -> Li
                     continue
                 role = text
                 break
-            email_el = info.select_one('a[href^="mailto:"]')
+            email_el = MAILTO.select_one(info)
             email = (
                 email_el["href"].replace("mailto:", "").strip()
                 if email_el and email_el.has_attr("href")
@@ -177,18 +218,16 @@ def parse_presto_format(soup: BeautifulSoup, school: str, source_url: str) -> Li
                     seen.add(key)
     return coaches
 
-def parse_sidearm_format(soup: BeautifulSoup, school: str, source_url: str, page: Page) -> List[Dict]:
+def parse_sidearm_format(soup: BeautifulSoup, school: str, source_url: str, page: Optional[Page]) -> List[Dict]:
     coaches = []
     seen = set()
-    table = soup.select_one("table.sidearm-table, table.default-table")
+    table = SIDEARM_TABLE.select_one(soup)
     if not table:
         return []
     print("  [INFO] Detected Sidearm format (table).")
-    for row in table.select("tbody tr"):
-        name_el = row.select_one(
-            "th a, td a[href*=\"/roster/coaches/\"], td a[href*=\"/coaches/\"]"
-        )
-        email_el = row.select_one('a[href^="mailto:"]')
+    for row in SIDEARM_TABLE_ROW.select(table):
+        name_el = SIDEARM_TABLE_NAME.select_one(row)
+        email_el = MAILTO.select_one(row)
         name = name_el.get_text(strip=True) if name_el else ""
         role = ""
         cells = row.find_all("td")
@@ -202,39 +241,32 @@ def parse_sidearm_format(soup: BeautifulSoup, school: str, source_url: str, page
             if email_el and email_el.has_attr("href")
             else ""
         )
+        pending_bio = ""
         if name and role and not email and name_el and name_el.has_attr("href"):
             bio_url = urljoin(source_url, name_el["href"])
-            email = get_email_from_bio_page(page, bio_url) or ""
+            email, pending_bio = resolve_bio_email(page, bio_url)
         if not name or not role or is_excluded_role(role):
             continue
         key = (school, name)
         if key not in seen:
-            coaches.append(
-                {"School": school, "Coach": name, "Role": role, "Email": email, "SourceURL": source_url}
-            )
+            coach = {"School": school, "Coach": name, "Role": role, "Email": email, "SourceURL": source_url}
+            if pending_bio:
+                coach["BioURL"] = pending_bio
+            coaches.append(coach)
             seen.add(key)
     return coaches
 
-def parse_sidearm_cards_format(soup: BeautifulSoup, school: str, source_url: str, page: Page) -> List[Dict]:
+def parse_sidearm_cards_format(soup: BeautifulSoup, school: str, source_url: str, page: Optional[Page]) -> List[Dict]:
     coaches = []
     seen = set()
-    container = soup.select_one(
-        ".sidearm-coaches, .sidearm-coach-list, .sidearm-roster-coaches, .sidearm-staff-directory, .sidearm-staff, .sidearm-staff-list"
-    )
+    container = SIDEARM_CARDS_CONTAINER.select_one(soup)
     if not container:
         return []
     print("  [INFO] Detected Sidearm format (cards/grid).")
-    card_selectors = (
-        ".sidearm-coach, .sidearm-coach-card, .sidearm-roster-coach-card, .sidearm-staff-member, .sidearm-person, .sidearm-staff-row"
-    )
-    for card in container.select(card_selectors):
-        name_el = card.select_one(
-            'a[href*="/coaches/"], a[href*="/staff/"], .sidearm-coach-name a, .sidearm-coach-name, .sidearm-person-name a, .sidearm-person-name, .coach-name a, .coach-name, h3 a, h3, h4 a, h4'
-        )
-        role_el = card.select_one(
-            ".sidearm-coach-title, .sidearm-person-title, .title, .position, .sidearm-staff-title"
-        )
-        email_el = card.select_one('a[href^="mailto:"]')
+    for card in SIDEARM_CARD.select(container):
+        name_el = SIDEARM_CARD_NAME.select_one(card)
+        role_el = SIDEARM_CARD_ROLE.select_one(card)
+        email_el = MAILTO.select_one(card)
         name = name_el.get_text(strip=True) if name_el else ""
         role = role_el.get_text(strip=True) if role_el else ""
         email = (
@@ -248,66 +280,124 @@ def parse_sidearm_cards_format(soup: BeautifulSoup, school: str, source_url: str
                 if is_valid_role(t):
                     role = t
                     break
+        pending_bio = ""
         if name and role and not email and name_el and name_el.has_attr("href"):
             href = name_el["href"]
             if href and not href.startswith("mailto:"):
                 bio_url = urljoin(source_url, href)
-                email = get_email_from_bio_page(page, bio_url) or ""
+                email, pending_bio = resolve_bio_email(page, bio_url)
         if not name or not role or is_excluded_role(role):
             continue
         key = (school, name)
         if key not in seen:
-            coaches.append(
-                {"School": school, "Coach": name, "Role": role, "Email": email, "SourceURL": source_url}
-            )
+            coach = {"School": school, "Coach": name, "Role": role, "Email": email, "SourceURL": source_url}
+            if pending_bio:
+                coach["BioURL"] = pending_bio
+            coaches.append(coach)
             seen.add(key)
     return coaches
 
+FALLBACK_BLOCKS = sv.compile("table, ul, ol, div.staff-directory, div.staff, section, div.team-staff, div.directory-block")
+FALLBACK_ELEMENT_TAGS = {"tr", "div", "li", "section", "p"}
+FALLBACK_EMAIL_RE = re.compile(r'\b([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})\b')
+
+class TextIndex:
+    """
+    Memoized `get_text(" ", strip=True)` for every tag of a document.
+
+    The document's text strings are collected once, in order, and each tag
+    remembers the slice of strings inside it, so reading an element's text no
+    longer walks its subtree again. Only plain strings count, as in get_text
+    (comments, scripts and styles are skipped).
+    """
+
+    def __init__(self, root: Tag):
+        self.strings: List[str] = []
+        self.spans: Dict[int, Tuple[int, int]] = {}
+        starts: Dict[int, int] = {}
+        stack = [(root, False)]
+        while stack:
+            node, closing = stack.pop()
+            if closing:
+                self.spans[id(node)] = (starts.pop(id(node)), len(self.strings))
+            elif isinstance(node, Tag):
+                starts[id(node)] = len(self.strings)
+                stack.append((node, True))
+                stack.extend((child, False) for child in reversed(node.contents))
+            elif type(node) in (NavigableString, CData):
+                text = node.strip()
+                if text:
+                    self.strings.append(text)
+
+    def text(self, tag: Tag) -> str:
+        span = self.spans.get(id(tag))
+        if span is None:
+            return tag.get_text(" ", strip=True)
+        return " ".join(self.strings[span[0]:span[1]])
+
+def _fallback_elements(soup: BeautifulSoup) -> List[Tag]:
+    """
+    Every tr/div/li/section/p nested inside a fallback block, once each, in document order.
+
+    Equivalent to iterating `block.find_all(...)` for every block, minus the
+    repeats caused by blocks nested inside other blocks.
+    """
+    block_ids = {id(b) for b in FALLBACK_BLOCKS.select(soup)}
+    elements = []
+    stack = [(soup, False)]
+    while stack:
+        node, in_block = stack.pop()
+        if in_block and node.name in FALLBACK_ELEMENT_TAGS:
+            elements.append(node)
+        child_in_block = in_block or id(node) in block_ids
+        stack.extend((child, child_in_block) for child in reversed(node.contents) if isinstance(child, Tag))
+    return elements
+
+def _role_from_text(text_lower: str) -> str:
+    role = ""
+    for kw in VALID_ROLE_KEYWORDS:
+        if kw in text_lower:
+            role = kw.title()
+    return role
+
 def parse_fallback_staff_format(
     soup: BeautifulSoup,
     school: str,
     source_url: str,
     page: Page,
-    sport_keywords: Optional[List[str]] = None
+    sport_keywords: Optional[List[str]] = None,
 ) -> List[Dict]:
     # Fallback with sport/gender filter and full name extraction
     coaches = []
     seen = set()
     print("  [INFO] Fallback: Searching for staff in custom/unusual layouts.")
     keywords = [kw.lower() for kw in (sport_keywords or [])]
-    blocks = soup.select("table, ul, ol, div.staff-directory, div.staff, section, div.team-staff, div.directory-block")
-    for block in blocks:
-        for el in block.find_all(["tr", "div", "li", "section", "p"], recursive=True):
-            text = el.get_text(" ", strip=True)
-            valid_role = is_valid_role(text) and not is_excluded_role(text)
-            sport_match = is_womens_soccer(text, keywords)
-            if valid_role and sport_match:
-                name = extract_full_name(text)
-                role = ""
-                email = ""
-                for kw in VALID_ROLE_KEYWORDS:
-                    if kw in text.lower():
-                        role = kw.title()
-                email_match = re.search(r'\b([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})\b', text)
-                if email_match:
-                    email = email_match.group(1)
-                key = (school, name)
-                if key not in seen and len(name) > 2:
-                    coaches.append(
-                        {"School": school, "Coach": name, "Role": role, "Email": email, "SourceURL": source_url, "DetectedLayout": "Fallback"}
-                    )
-                    seen.add(key)
-    for email_a in soup.select('a[href^="mailto:"]'):
+    index = TextIndex(soup)
+    for el in _fallback_elements(soup):
+        text = index.text(el)
+        valid_role = is_valid_role(text) and not is_excluded_role(text)
+        if not valid_role or not is_womens_soccer(text, keywords):
+            continue
+        name = extract_full_name(text)
+        role = _role_from_text(text.lower())
+        email = ""
+        email_match = FALLBACK_EMAIL_RE.search(text)
+        if email_match:
+            email = email_match.group(1)
+        key = (school, name)
+        if key not in seen and len(name) > 2:
+            coaches.append(
+                {"School": school, "Coach": name, "Role": role, "Email": email, "SourceURL": source_url, "DetectedLayout": "Fallback"}
+            )
+            seen.add(key)
+    for email_a in MAILTO.select(soup):
         email = email_a["href"].replace("mailto:", "").strip()
-        parent_text = email_a.find_parent().get_text(" ", strip=True)
+        parent_text = index.text(email_a.find_parent())
         valid_role = is_valid_role(parent_text) and not is_excluded_role(parent_text)
         sport_match = is_womens_soccer(parent_text, keywords)
         if valid_role and sport_match:
             name = extract_full_name(parent_text)
-            role = ""
-            for kw in VALID_ROLE_KEYWORDS:
-                if kw in parent_text.lower():
-                    role = kw.title()
+            role = _role_from_text(parent_text.lower())
             key = (school, name)
             if key not in seen and len(name) > 2:
                 coaches.append(
@@ -317,29 +407,152 @@ def parse_fallback_staff_format(
     print(f"  [INFO] Fallback scraper found {len(coaches)} coach(es) after filtering by sport keywords.")
     return coaches
 
+# Built-in layouts. Higher priority is tried first; the first layout that yields coaches wins.
+register_layout(Layout(
+    "presto", "Presto layout",
+    lambda soup, school, url, page, keywords: parse_presto_format(soup, school, url),
+    priority=40,
+    signature=["coaches-headshot-container", "staff-headshot-container", "directory-list", "coach-bios-wrapper", "coach-bios"],
+))
+register_layout(Layout(
+    "sidearm_table", "Sidearm-table layout",
+    lambda soup, school, url, page, keywords: parse_sidearm_format(soup, school, url, page),
+    priority=30,
+    signature=["sidearm-table", "default-table"],
+))
+register_layout(Layout(
+    "sidearm_cards", "Sidearm-cards layout",
+    lambda soup, school, url, page, keywords: parse_sidearm_cards_format(soup, school, url, page),
+    priority=20,
+    signature=["sidearm-coaches", "sidearm-coach-list", "sidearm-roster-coaches", "sidearm-staff-directory", "sidearm-staff", "sidearm-staff-list"],
+))
+register_layout(Layout(
+    "fallback", "fallback layout (with sport filter)",
+    lambda soup, school, url, page, keywords: parse_fallback_staff_format(soup, school, url, page, sport_keywords=keywords),
+    priority=0,
+))
+
+def parse_selector_layout(
+    soup: BeautifulSoup,
+    school: str,
+    source_url: str,
+    page: Optional[Page],
+    spec: Dict,
+) -> List[Dict]:
+    """
+    Generic card/row extractor driven by compiled selectors from a `custom_layouts` entry.
+
+    Each item under `container` yields a coach from its `name`, `role` and
+    optional `email` elements; a missing role falls back to the first valid
+    role text in the item, and a missing email to the `bio_link` page.
+    """
+    coaches = []
+    seen = set()
+    container = spec["container"].select_one(soup)
+    if not container:
+        return []
+    print(f"  [INFO] Detected custom layout '{spec['label']}'.")
+    for item in spec["item"].select(container):
+        name_el = spec["name"].select_one(item)
+        role_el = spec["role"].select_one(item) if spec.get("role") else None
+        email_el = (spec.get("email") or MAILTO).select_one(item)
+        name = name_el.get_text(strip=True) if name_el else ""
+        role = role_el.get_text(strip=True) if role_el else ""
+        email = (
+            email_el["href"].replace("mailto:", "").strip()
+            if email_el and email_el.has_attr("href")
+            else ""
+        )
+        if not role:
+            role = next((t.strip() for t in item.stripped_strings if is_valid_role(t.strip())), "")
+        if not name or not role or is_excluded_role(role):
+            continue
+        pending_bio = ""
+        bio_el = spec["bio_link"].select_one(item) if spec.get("bio_link") else None
+        if not email and bio_el and bio_el.has_attr("href") and not bio_el["href"].startswith("mailto:"):
+            email, pending_bio = resolve_bio_email(page, urljoin(source_url, bio_el["href"]))
+        key = (school, name)
+        if key not in seen:
+            coach = {"School": school, "Coach": name, "Role": role, "Email": email, "SourceURL": source_url, "DetectedLayout": spec["label"]}
+            if pending_bio:
+                coach["BioURL"] = pending_bio
+            coaches.append(coach)
+            seen.add(key)
+    return coaches
+
+def load_custom_layouts(config: Dict) -> List[Layout]:
+    """
+    Registers the extractors declared under `custom_layouts` in config.yaml.
+
+    Selectors are compiled once here. A layout is tried when its container is
+    present and, if `domains` is given, the staff page is on one of them.
+    """
+    layouts = []
+    for name, entry in (config.get("custom_layouts") or {}).items():
+        try:
+            spec = {"label": entry.get("label", name)}
+            for key in ("container", "item", "name", "role", "email", "bio_link"):
+                if entry.get(key):
+                    spec[key] = sv.compile(entry[key])
+            missing = [key for key in ("container", "item", "name") if key not in spec]
+            if missing:
+                print(f"[WARN] Custom layout '{name}' is missing: {', '.join(missing)}. Skipped.")
+                continue
+        except Exception as e:
+            print(f"[WARN] Custom layout '{name}' has an invalid selector: {e}. Skipped.")
+            continue
+        domains = [d.lower() for d in entry.get("domains", [])]
+
+        def detect(soup, fingerprint, source_url, spec=spec, domains=domains):
+            host = urlparse(source_url).netloc.lower()
+            if domains and not any(host == d or host.endswith("." + d) for d in domains):
+                return False
+            return spec["container"].select_one(soup) is not None
+
+        layouts.append(register_layout(Layout(
+            name, spec["label"],
+            lambda soup, school, url, page, keywords, spec=spec: parse_selector_layout(soup, school, url, page, spec),
+            priority=int(entry.get("priority", 10)),
+            detect=detect,
+        )))
+    return layouts
+
+def fingerprint(soup: BeautifulSoup) -> Set[str]:
+    """All class names used in the document, collected in a single pass."""
+    classes: Set[str] = set()
+    for tag in soup.find_all(class_=True):
+        classes.update(tag.get("class", []))
+    return classes
+
+def detect_layouts(soup: BeautifulSoup, source_url: str = "") -> List[Layout]:
+    """Registered layouts that accept the document, highest priority first."""
+    classes = fingerprint(soup)
+    return [layout for layout in registered_layouts() if layout.matches(soup, classes, source_url)]
+
 def parse_all_coaches(
     html: str,
     school: str,
     source_url: str,
-    page: Page,
+    page: Optional[Page],
     sport_keywords: Optional[List[str]] = None,
 ) -> List[Dict]:
-    soup = BeautifulSoup(html, "lxml")
-    coaches = parse_presto_format(soup, school, source_url)
-    if coaches:
-        print(f"[INFO] {school}: Found {len(coaches)} Presto layout coaches"); return coaches
-
-    coaches = parse_sidearm_format(soup, school, source_url, page)
-    if coaches:
-        print(f"[INFO] {school}: Found {len(coaches)} Sidearm-table layout coaches"); return coaches
-
-    coaches = parse_sidearm_cards_format(soup, school, source_url, page)
-    if coaches:
-        print(f"[INFO] {school}: Found {len(coaches)} Sidearm-cards layout coaches"); return coaches
-
-    coaches = parse_fallback_staff_format(soup, school, source_url, page, sport_keywords=sport_keywords)
-    if coaches:
-        print(f"[INFO] {school}: Found {len(coaches)} in fallback layout (with sport filter)"); return coaches
+    """
+    Runs the layout cascade over a staff page.
+
+    Coaches without a mailto link get their email from their bio page: inline
+    through `page`, or, with page=None, deferred as a "BioURL" key for the bio
+    enrichment stage to fill in.
+
+    The document is fingerprinted once and only registered layouts that
+    detect themselves in it are tried (see scraper/layouts.py).
+    """
+    # With inline bio lookups (page given) this includes their bio_browser time.
+    with METRICS.timer("parse", key=source_url):
+        soup = BeautifulSoup(html, "lxml")
+        for layout in detect_layouts(soup, source_url):
+            coaches = layout.extract(soup, school, source_url, page, sport_keywords)
+            if coaches:
+                print(f"[INFO] {school}: Found {len(coaches)} {layout.label} coaches"); return coaches
 
     print(f"[WARN] {school}: No coaches detected on any layout.")
     return []
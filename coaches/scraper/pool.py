@@ -0,0 +1,166 @@
+# scraper/pool.py
+
+import queue
+import threading
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+from playwright.sync_api import sync_playwright
+
+from scraper.shared.metrics import METRICS
+
+
+class BrowserUnavailable(RuntimeError):
+    """The worker could not launch its browser, so none of its tasks can use a page."""
+
+
+class BrowserWorker:
+    """
+    Owns one Playwright driver, browser and isolated context/page.
+
+    Playwright's sync API is bound to the thread that started it, so each
+    worker thread must create and use its own BrowserWorker. The browser is
+    launched on first access to `page`, so workers whose tasks are all served
+    over plain HTTP (--http-first) never start one. A failed launch raises
+    BrowserUnavailable, then again on every later access without retrying.
+
+    `on_context(worker)` runs on every new context, including after a recycle,
+    so request routes and similar per-context setup survive page crashes.
+    `scope` is free-form state for whatever the worker is currently scraping.
+    """
+
+    def __init__(self, worker_id: int = 0, headless: bool = True, on_context: Optional[Callable[["BrowserWorker"], None]] = None):
+        self.worker_id = worker_id
+        self.headless = headless
+        self.on_context = on_context
+        self.scope = {}
+        self._playwright = None
+        self.browser = None
+        self.context = None
+        self._page = None
+        self._launch_error = None
+
+    @property
+    def page(self):
+        if self._page is None:
+            if self.browser is None:
+                self.start()
+            else:
+                self._new_page()
+        return self._page
+
+    def start(self) -> "BrowserWorker":
+        if self._launch_error is not None:
+            raise BrowserUnavailable(self._launch_error)
+        with METRICS.timer("browser_start"):
+            try:
+                if self._playwright is None:
+                    self._playwright = sync_playwright().start()
+                self.browser = self._playwright.chromium.launch(headless=self.headless)
+            except Exception as e:
+                self._launch_error = f"Worker {self.worker_id} could not start a browser: {e}"
+                raise BrowserUnavailable(self._launch_error) from e
+            self._new_page()
+        return self
+
+    def _new_page(self):
+        self.context = self.browser.new_context()
+        if self.on_context:
+            self.on_context(self)
+        self._page = self.context.new_page()
+
+    def recycle(self):
+        """Drops the current context (and its page) after a crash; the next `page` access opens a fresh one."""
+        if self.context is not None:
+            try:
+                self.context.close()
+            except Exception:
+                pass
+        self.context = None
+        self._page = None
+
+    def close(self):
+        if self._playwright is None:
+            return
+        for closer in (
+            lambda: self.context.close(),
+            lambda: self.browser.close(),
+            lambda: self._playwright.stop(),
+        ):
+            try:
+                closer()
+            except Exception:
+                pass
+
+
+Task = Callable[[BrowserWorker, int, Any], Any]
+
+
+def run_pool(
+    items: Iterable[Any],
+    task: Task,
+    workers: int = 1,
+    headless: bool = True,
+    on_context: Optional[Callable[[BrowserWorker], None]] = None,
+) -> Iterator[Tuple[int, Any]]:
+    """
+    Runs `task(worker, index, item)` for every item and yields `(index, result)`
+    in input order, whatever order the workers finish in.
+
+    With workers <= 1 everything runs on the calling thread with a single page,
+    exactly like the original serial loop. Each worker starts its browser the
+    first time a task uses `worker.page`; tasks let BrowserUnavailable through,
+    and it is raised here like any other task exception.
+    """
+    items = list(items)
+    if workers <= 1:
+        worker = BrowserWorker(0, headless, on_context)
+        try:
+            for i, item in enumerate(items, 1):
+                yield i, task(worker, i, item)
+        finally:
+            worker.close()
+        return
+
+    jobs: "queue.Queue[Tuple[int, Any] | None]" = queue.Queue()
+    for i, item in enumerate(items, 1):
+        jobs.put((i, item))
+    for _ in range(workers):
+        jobs.put(None)
+    results: "queue.Queue[Tuple[int, Any, BaseException | None]]" = queue.Queue()
+
+    def loop(worker_id: int):
+        worker = BrowserWorker(worker_id, headless, on_context)
+        try:
+            while True:
+                job = jobs.get()
+                if job is None:
+                    return
+                i, item = job
+                try:
+                    results.put((i, task(worker, i, item), None))
+                except BaseException as e:
+                    results.put((i, None, e))
+        finally:
+            worker.close()
+
+    threads: List[threading.Thread] = [
+        threading.Thread(target=loop, args=(w,), name=f"scraper-worker-{w}", daemon=True)
+        for w in range(1, workers + 1)
+    ]
+    for t in threads:
+        t.start()
+
+    # Re-order completions so callers see results exactly as the serial loop would.
+    pending = {}
+    next_index = 1
+    for _ in range(len(items)):
+        i, result, exc = results.get()
+        pending[i] = (result, exc)
+        while next_index in pending:
+            result, exc = pending.pop(next_index)
+            if exc is not None:
+                raise exc
+            yield next_index, result
+            next_index += 1
+    for t in threads:
+        t.join()
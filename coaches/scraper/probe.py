@@ -0,0 +1,91 @@
+# scraper/probe.py
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import requests
+
+# Sites behind Cloudflare and similar reject the default python-requests agent.
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+}
+
+# Status codes that say "the server refused this client", not "the page is missing".
+# Candidates that hit them are left for the browser to decide.
+INCONCLUSIVE_STATUSES = {401, 403, 405, 406, 429, 501, 503}
+
+
+def is_inconclusive_status(status: Optional[int]) -> bool:
+    """Blocked or server-side failures (any 5xx): worth retrying later, never a cached miss."""
+    return status is not None and (status in INCONCLUSIVE_STATUSES or status >= 500)
+
+
+def is_dns_error(e: Exception) -> bool:
+    msg = str(e)
+    return "Name or service not known" in msg or "getaddrinfo failed" in msg or "nodename nor servname" in msg
+
+
+def is_valid_staff_url(base_domain: str, final_url: str) -> bool:
+    """Same redirect/404 checks the browser resolver applies to `page.url`."""
+    base_domain = base_domain.strip()
+    parts = final_url.split('/')
+    if len(parts) < 3 or base_domain not in parts[2] or final_url.strip('/') == f"https://{base_domain}":
+        return False
+    return "404" not in final_url and "error" not in final_url
+
+
+def _probe_one(session: requests.Session, base_domain: str, path: str, timeout: float) -> Dict:
+    url = f"https://{base_domain.strip()}{path.strip()}"
+    result = {"path": path, "url": url, "status": None, "final_url": None, "verdict": "inconclusive"}
+    try:
+        resp = session.head(url, timeout=timeout, allow_redirects=True)
+        if resp.status_code in INCONCLUSIVE_STATUSES:
+            # Plenty of CMSs do not implement HEAD; retry with a GET without reading the body.
+            resp = session.get(url, timeout=timeout, allow_redirects=True, stream=True)
+            resp.close()
+        result["status"] = resp.status_code
+        result["final_url"] = resp.url
+        if is_inconclusive_status(resp.status_code):
+            return result
+        if resp.ok and is_valid_staff_url(base_domain, resp.url):
+            result["verdict"] = "hit"
+        else:
+            result["verdict"] = "miss"
+    except requests.exceptions.ConnectionError as e:
+        if is_dns_error(e):
+            result["verdict"] = "miss"
+    except requests.RequestException:
+        pass
+    return result
+
+
+def probe_paths(
+    base_domain: str,
+    path_templates: List[str],
+    timeout: float = 10,
+    max_workers: int = 8,
+    session: Optional[requests.Session] = None,
+) -> List[Dict]:
+    """
+    Probes every candidate path concurrently with lightweight HTTP requests.
+
+    Returns one dict per template, in template order, with the HTTP status,
+    final URL after redirects and a verdict: "hit", "miss" or "inconclusive"
+    (blocked, timed out or otherwise undecidable without a real browser).
+    """
+    if not path_templates:
+        return []
+    own_session = session is None
+    if own_session:
+        session = requests.Session()
+        session.headers.update(DEFAULT_HEADERS)
+    try:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(path_templates))) as ex:
+            return list(ex.map(lambda p: _probe_one(session, base_domain, p, timeout), path_templates))
+    finally:
+        if own_session:
+            session.close()
@@ -1,44 +1,136 @@
-# scraper/resolver.py 
+# scraper/resolver.py
 
+import time
 from playwright.sync_api import Page
-from typing import List
+from typing import Dict, List, Optional
 
-def find_staff_url(page: Page, base_domain: str, path_templates: List[str], timeout: int) -> str | None:
+from scraper.cache import ResolutionCache
+from scraper.probe import is_inconclusive_status, is_valid_staff_url, probe_paths
+from scraper.shared.metrics import METRICS
+
+def _try_in_browser(page: Page, base_domain: str, url: str, timeout: int) -> Dict:
+    """
+    Opens one candidate URL in the browser.
+
+    Returns a dict with the verdict ("hit", "miss" or "inconclusive" for timeouts,
+    blocked requests, 5xx responses and other transient failures), the final URL, the HTTP status and, on a hit,
+    the page HTML.
+    """
+    result = {"verdict": "miss", "final_url": None, "status": None}
+    try:
+        print(f"    -> Trying: {url}")
+        with METRICS.timer(f"navigate_{getattr(page, 'tier', 'browser')}", key=url):
+            resp = page.goto(url, timeout=timeout, wait_until="domcontentloaded")
+        result["status"] = resp.status if resp else None
+
+        # Check if the response is successful.
+        if resp and resp.ok:
+            final_url = page.url
+            result["final_url"] = final_url
+
+            # Verify we were not redirected to the homepage or a different domain,
+            # and that it's not a 404 or error page.
+            if not is_valid_staff_url(base_domain, final_url):
+                print(f"      [FAIL] Redirected to homepage, different domain or error page.")
+                return result
+
+            print(f"      [SUCCESS] Valid page found: {final_url}")
+            result["verdict"] = "hit"
+            result["html"] = page.content()
+        elif resp and is_inconclusive_status(resp.status):
+            print(f"      [FAIL] HTTP {resp.status} for {url}, not treated as a miss.")
+            result["verdict"] = "inconclusive"
+    except Exception as e:
+        if 'net::ERR_NAME_NOT_RESOLVED' in str(e):
+            print(f"      [FAIL] Could not resolve domain for {url}")
+        else:
+            print(f"      [FAIL] Exception while trying {url}: {type(e).__name__}")
+            result["verdict"] = "inconclusive"
+    return result
+
+def find_staff_url(
+    page: Page,
+    base_domain: str,
+    path_templates: List[str],
+    timeout: int,
+    probe: bool = False,
+    cache: Optional[ResolutionCache] = None,
+    visited: Optional[Dict[str, Dict]] = None,
+    cache_misses: bool = True,
+) -> str | None:
     """
     Tries to find a valid staff page URL by combining the base domain with a list
     of predefined path templates.
 
+    With probe=True every candidate is first checked concurrently over plain HTTP;
+    paths that are clearly missing (404, homepage redirect, unresolvable host) are
+    skipped and only the remaining ones are opened in the browser, in template order.
+
+    With a cache, templates already known to miss on this domain are skipped and
+    known hits go straight to their cached final URL. Fresh verdicts are stored;
+    with cache_misses=False only hits are, for callers (the HTTP tier) whose
+    misses the browser may still turn into hits.
+
+    `visited` memoizes browser visits by requested and final URL (including the
+    HTML of hits), so several profiles resolving against the same school never
+    load a URL twice, even when one reaches it through a redirect.
+    Use staff_page_html() to read the HTML of the returned URL back out of it.
+
     Returns the first valid URL found.
     """
     print(f"  [RESOLVER] Resolving staff URL for domain '{base_domain}'")
+    start = time.perf_counter()
+    cached = {path: cache.get(base_domain, path) for path in path_templates} if cache else {}
+
+    probes = {}
+    if probe:
+        unknown = [path for path in path_templates if not cached.get(path)]
+        for result in probe_paths(base_domain, unknown, timeout=timeout / 1000):
+            probes[result["path"]] = result
+            if result["verdict"] == "miss":
+                print(f"    -> [PROBE] Skipping {result['url']} (status: {result['status']}, final: {result['final_url']})")
+                if cache:
+                    cache.put(base_domain, result["path"], False, result["final_url"], result["status"])
+
     found_url = None
     for path in path_templates:
+        entry = cached.get(path)
+        if entry and not entry["hit"]:
+            print(f"    -> [CACHE] Skipping known miss: {path}")
+            continue
+        if path in probes and probes[path]["verdict"] == "miss":
+            continue
         url = f"https://{base_domain.strip()}{path.strip()}"
-        try:
-            print(f"    -> Trying: {url}")
-            resp = page.goto(url, timeout=timeout, wait_until="domcontentloaded")
-            
-            # Check if the response is successful.
-            if resp and resp.ok:
-                final_url = page.url
-                
-                # Verify we were not redirected to the homepage or a different domain.
-                if base_domain not in final_url.split('/')[2] or final_url.strip('/') == f"https://{base_domain}":
-                    print(f"      [FAIL] Redirected to homepage or different domain.")
-                    continue
-
-                # Verify it's not a 404 or error page.
-                if "404" not in final_url and "error" not in final_url:
-                    print(f"      [SUCCESS] Valid page found: {final_url}")
-                    found_url = final_url
-                    break # CRITICAL: Stop on the first success to prevent state issues.
-        except Exception as e:
-            if 'net::ERR_NAME_NOT_RESOLVED' in str(e):
-                print(f"      [FAIL] Could not resolve domain for {url}")
-            else:
-                print(f"      [FAIL] Exception while trying {url}: {type(e).__name__}")
-    
+        if entry and entry["final_url"]:
+            print(f"    -> [CACHE] Known hit for {path}")
+            url = entry["final_url"]
+        if visited is not None and url in visited:
+            print(f"    -> Already visited: {url}")
+            result = visited[url]
+        else:
+            # Per template, so templates that rarely hit but cost a slow load stand out.
+            with METRICS.timer(f"resolve_template {path}", key=base_domain):
+                result = _try_in_browser(page, base_domain, url, timeout)
+            if visited is not None:
+                visited[url] = result
+                # Cached hits navigate to the final URL directly; after a redirect, find the visit there too.
+                if result["final_url"]:
+                    visited.setdefault(result["final_url"], result)
+        if cache and (result["verdict"] == "hit" or (cache_misses and result["verdict"] == "miss")):
+            cache.put(base_domain, path, result["verdict"] == "hit", result["final_url"], result["status"])
+        if result["verdict"] == "hit":
+            found_url = result["final_url"]
+            break # CRITICAL: Stop on the first success to prevent state issues.
+
     if not found_url:
         print(f"  [RESOLVER] FAILED. No valid URL found for any path template on '{base_domain}'.")
 
-    return found_url
\ No newline at end of file
+    METRICS.add("resolve", time.perf_counter() - start, key=base_domain)
+    return found_url
+
+def staff_page_html(visited: Dict[str, Dict], staff_url: str) -> Optional[str]:
+    """Returns the HTML captured by find_staff_url for a resolved staff URL."""
+    for result in visited.values():
+        if result.get("final_url") == staff_url and result.get("html") is not None:
+            return result["html"]
+    return None
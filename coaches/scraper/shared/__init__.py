@@ -0,0 +1,14 @@
+# scraper/shared/__init__.py
+
+# School records (schools.py), run metrics (metrics.py) and the CSV appender (streaming.py) are
+# shared with the domain finder, whose output is this scraper's input. This package's modules are
+# that project's source files, imported under qualified names: `scraper.shared.metrics` is
+# "domain finder/src/metrics.py". Nothing is added to sys.path, so an installed package called
+# `metrics`, `schools` or `streaming` is never picked up instead, whatever the import order.
+# Only those three modules (standard library only) are meant to be imported from here.
+from pathlib import Path
+
+_SHARED_SRC = Path(__file__).resolve().parents[3] / 'domain finder' / 'src'
+if not (_SHARED_SRC / 'schools.py').is_file():
+    raise ImportError(f"The coaches scraper needs the domain finder sources in {_SHARED_SRC}")
+__path__ = [str(_SHARED_SRC)]
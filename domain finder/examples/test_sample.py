@@ -39,8 +39,8 @@ def test_sample():
     
     print("\n" + "-"*70 + "\n")
     
-    # Initialize finder
-    finder = DomainFinder()
+    # Initialize finder (config.yaml + .env credentials)
+    finder = DomainFinder.from_env()
     
     results = []
     
@@ -48,14 +48,15 @@ def test_sample():
         school_name = row['school_name']
         print(f"[{idx+1}/5] 🔍 Searching: {school_name}")
         
-        domain, status = finder.find_athletics_domain(school_name)
+        result = finder.find(row)
+        domain, status = result['domain'], result['status']
         
         if status == "FOUND":
             print(f"        ✅ Found: {domain}")
-        elif status == "NOT_FOUND":
-            print(f"        ❌ Not found")
+        elif status == "FOUND_NOT_CONFIDENT":
+            print(f"        ⚠️  Not confident: {domain}")
         else:
-            print(f"        ⚠️  No results")
+            print(f"        ❌ Not found")
         
         results.append({
             'school_name': school_name,
@@ -65,6 +66,8 @@ def test_sample():
         
         print()
     
+    finder.close()
+
     # Summary
     print("-"*70)
     print("\n📊 TEST RESULTS:\n")
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Domain Finder - Domain Assignment Check and Benchmark
+Compares greedy selection (select_candidate with a shared used_domains set)
+with the global assignment (src/assignment.py).
+
+Every school of the input file gets the synthetic search results of
+benchmark_scoring.py, which share domains between schools. Both strategies
+run over the schools in input order and in a shuffled order: the global
+assignment must give every school the same domain in both orders, and must
+assign at least as much total score as greedy. resolve_results() must leave
+one row per school when earlier NOT_FOUND and ERROR rows of re-searched
+schools are still in the result files. Finally the assignment is timed.
+
+Usage (from the domain finder folder):
+    python scripts/benchmark_assignment.py [input_csv] [--repeat N]
+"""
+
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from assignment import assign_domains, resolve_results  # noqa: E402
+from batch_scorer import candidate_table, candidates_for, group_by_school, score_table  # noqa: E402
+from benchmark_scoring import CONFIG, DEFAULT_INPUT, SPORT_PROFILE, synthetic_items  # noqa: E402
+from candidate_store import CandidateStore  # noqa: E402
+from domain_finder import school_fields, select_candidate  # noqa: E402
+from streaming import RESULT_FIELDS, read_schools  # noqa: E402
+
+
+def run_greedy(order, scored):
+    used, out = set(), {}
+    for i in order:
+        out[i] = select_candidate(candidates_for(scored[i], used), used, CONFIG)
+    return out
+
+
+def run_global(order, scored):
+    return assign_domains({i: candidates_for(scored[i], set()) for i in order})
+
+
+def summary(results):
+    found = [r for r in results.values() if r['status'] != 'NOT_FOUND']
+    return len(found), sum(r['score'] for r in found)
+
+
+def check_resolve_results(df, items, count=3):
+    """Rows of re-searched schools, old and new, through resolve_results; returns the schools left with several rows."""
+    schools = [{k: str(v) for k, v in row.items() if k in RESULT_FIELDS} for _, row in df.head(count).iterrows()]
+    earlier = [
+        dict(schools[0], athletics_domain='', status='NOT_FOUND', score='0', reason='No candidate passed threshold'),
+        dict(schools[1], athletics_domain='', status='NOT_FOUND', score='0', reason='Google API error: 500'),
+        dict(schools[2], athletics_domain='', status='NOT_FOUND', score='0', reason='No candidate passed threshold'),
+    ]
+    retried = [dict(schools[0], athletics_domain='', status='NOT_FOUND', score='0', reason='No candidate passed threshold')]
+    found = [dict(school, athletics_domain='stale.example.com', status='FOUND', score='150', reason='Old search') for school in schools[1:]]
+    with tempfile.TemporaryDirectory(prefix='assignment-') as work:
+        output_csv, error_csv = os.path.join(work, 'domains.csv'), os.path.join(work, 'domains_errors.csv')
+        for path, rows in ((output_csv, found), (error_csv, earlier + retried)):
+            with open(path, 'w', encoding='utf-8', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS)
+                writer.writeheader()
+                writer.writerows(rows)
+        store = CandidateStore(os.path.join(work, 'candidates'))
+        for i, school in enumerate(schools):
+            store.add(school['school_name'], school['division'], 'query', items[i])
+        store.flush()
+        resolve_results(output_csv, error_csv, str(store.directory), CONFIG, {}, SPORT_PROFILE)
+        keys = Counter((r['school_name'], r['division']) for path in (output_csv, error_csv) for r in read_schools(path))
+    return [key for key, n in keys.items() if n != 1] + [(s['school_name'], s['division']) for s in schools if not keys[(s['school_name'], s['division'])]]
+
+
+def main():
+    input_csv, repeat = DEFAULT_INPUT, 5
+    args = iter(sys.argv[1:])
+    for arg in args:
+        if arg == '--repeat':
+            repeat = int(next(args, repeat))
+        else:
+            input_csv = arg
+
+    df = pd.read_csv(input_csv).reset_index(drop=True)
+    if 'athletics_domain' not in df.columns:
+        df['athletics_domain'] = ''
+    fields = [school_fields(row, SPORT_PROFILE) for _, row in df.iterrows()]
+    items = synthetic_items(df)
+    scored_table = score_table(candidate_table(items), dict(enumerate(fields)), {}, SPORT_PROFILE)
+    scored = group_by_school(scored_table)
+    order = list(range(len(fields)))
+    shuffled = order[:]
+    random.Random(1).shuffle(shuffled)
+    print(f"\n📂 {len(fields)} schools, {len(scored_table)} candidates from {input_csv}")
+
+    greedy, greedy_shuffled = run_greedy(order, scored), run_greedy(shuffled, scored)
+    moved = sum(greedy[i]['domain'] != greedy_shuffled[i]['domain'] for i in order)
+    assigned, assigned_shuffled = run_global(order, scored), run_global(shuffled, scored)
+    unstable = sum(assigned[i]['domain'] != assigned_shuffled[i]['domain'] for i in order)
+    for label, results in (('greedy', greedy), ('global', assigned)):
+        found, total = summary(results)
+        print(f"   {label:<8} {found} schools with a domain, total score {total:,}")
+    print(f"   greedy:  {moved} schools get a different domain when the input is shuffled")
+    if unstable:
+        print(f"❌ Global assignment changed for {unstable} schools when the input is shuffled")
+        sys.exit(1)
+    if summary(assigned)[1] < summary(greedy)[1]:
+        print("❌ Global assignment scored lower than greedy")
+        sys.exit(1)
+    print("✅ Global assignment: identical in both orders, total score ≥ greedy")
+    duplicated = check_resolve_results(df, items)
+    if duplicated:
+        print(f"❌ resolve_results left {len(duplicated)} schools without exactly one row: {duplicated}")
+        sys.exit(1)
+    print("✅ resolve_results: one row per school after retries")
+
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run_global(order, scored)
+        best = min(best, time.perf_counter() - start)
+    print(f"⏱️  global assignment              {best * 1000:8.1f} ms  ({len(fields) / best:,.0f} schools/s)")
+
+
+if __name__ == "__main__":
+    main()
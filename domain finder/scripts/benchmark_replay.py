@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Domain Finder + Coaches - Offline Replay Benchmark
+Runs both pipelines end to end against recorded traffic, with no network.
+
+A local stand-in server replays the fixtures in scripts/replay_fixtures/:
+- search.json: Custom Search responses, keyed by the exact query sent
+- sites/<domain>/<path>.html: archived athletics pages ("/" is index.html),
+  staff pages and coach bios; every other path is a 404
+- statuses.json: "<domain><path>" answered with a fixed error status instead
+  (server errors and blocks on candidate staff URLs)
+It is installed as the HTTP(S) proxy of both pipelines, so searches, domain
+liveness checks, staff URL resolution and bio enrichment go through the same
+code as a live run. HTTPS is terminated with a throwaway certificate (made with
+the openssl command line tool) that the pipelines are told to trust. Every
+response waits --latency ms first, to stand in for the network.
+
+DomainFinder.process_schools runs over replay_fixtures/schools.csv, and its
+result file is the input of coaches/run.py (--http-first, run as a separate
+process with its own config in the work directory). For each pipeline the
+report shows schools/s, requests/s served by the stand-in (pages/s for the
+coaches) and the p50/p95 per-school latency from the run's metrics summary.
+Outputs are checked against replay_fixtures/expected.json, so a faster run
+that finds different domains or coaches fails. The staff URL cache must also
+hold no entry for the statuses.json paths: an error status is never a miss.
+
+With --warm each pipeline runs once to fill its caches (search cache, domain
+liveness, staff URL and bio email caches) and the second run is measured.
+With --no-cache all of those caches are disabled. Results are also appended
+as one JSON line to data/output/replay_metrics.jsonl.
+
+Usage (from the domain finder folder):
+    python scripts/benchmark_replay.py [--workers N] [--coach-workers N] [--latency MS]
+                                       [--warm | --no-cache] [--profile NAME] [--keep DIR]
+"""
+
+import argparse
+import contextlib
+import csv
+import json
+import os
+import shutil
+import sqlite3
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+import yaml
+
+ROOT = Path(__file__).resolve().parent.parent
+COACHES = ROOT.parent / 'coaches'
+FIXTURES = Path(__file__).resolve().parent / 'replay_fixtures'
+RESULTS_FILE = ROOT / 'data' / 'output' / 'replay_metrics.jsonl'
+SEARCH_HOST = 'www.googleapis.com'
+
+sys.path.insert(0, str(ROOT / 'src'))
+
+from domain_finder import DomainFinder, load_config  # noqa: E402
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    """Forward proxy answering every request from the fixtures (CONNECT tunnels are terminated here)."""
+
+    protocol_version = 'HTTP/1.1'
+    tunnel_host = None
+
+    def log_message(self, *args):
+        pass
+
+    def do_CONNECT(self):
+        self.send_response(200, 'Connection Established')
+        self.end_headers()
+        # The rest of the connection is TLS for the tunnelled host; keep serving requests over it.
+        self.connection = self.server.tls.wrap_socket(self.connection, server_side=True)
+        self.rfile = self.connection.makefile('rb')
+        self.wfile = self.connection.makefile('wb')
+        self.tunnel_host = self.path.rsplit(':', 1)[0]
+        # http.client sends CONNECT as HTTP/1.0, which would otherwise close the tunnel right away.
+        self.close_connection = False
+
+    def do_GET(self):
+        self.reply(head=False)
+
+    def do_HEAD(self):
+        self.reply(head=True)
+
+    def reply(self, head: bool):
+        if self.path.startswith('http://'):
+            url = urlsplit(self.path)
+            host, path, query = url.hostname, url.path or '/', url.query
+        else:
+            url = urlsplit(self.path)
+            host, path, query = self.tunnel_host or self.headers.get('Host', '').split(':')[0], url.path, url.query
+        time.sleep(self.server.latency)
+        if host == SEARCH_HOST and path.startswith('/customsearch/'):
+            q = parse_qs(query).get('q', [''])[0]
+            payload = self.server.search.get(q)
+            self.server.count('searches' if payload is not None else 'unrecorded_searches')
+            body = json.dumps(payload or {'searchInformation': {'totalResults': '0'}}).encode()
+            return self.send(200, 'application/json', body, head)
+        status = self.server.statuses.get(f"{host}{path}")
+        if status:
+            self.server.count('error_statuses')
+            return self.send(status, 'text/html', b'<html><body><h1>Service unavailable</h1></body></html>', head)
+        site = self.server.sites / host
+        if not site.is_dir():
+            self.server.count('unknown_hosts')
+            return self.send(502, 'text/plain', b'unknown host', head)
+        name = path + 'index' if path.endswith('/') else path
+        page = site / f"{name.strip('/')}.html"
+        kind = 'head_checks' if head else 'pages'
+        if page.is_file() and site in page.resolve().parents:
+            self.server.count(kind)
+            return self.send(200, 'text/html; charset=utf-8', page.read_bytes(), head)
+        self.server.count(f"{kind}_404")
+        self.send(404, 'text/html', b'<html><body><h1>Page not found</h1></body></html>', head)
+
+    def send(self, status: int, content_type: str, body: bytes, head: bool):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+
+
+class ReplayServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, fixtures: Path, latency: float, cert: Path, key: Path):
+        super().__init__(('127.0.0.1', 0), ReplayHandler)
+        with open(fixtures / 'search.json', encoding='utf-8') as f:
+            self.search = json.load(f)
+        statuses = fixtures / 'statuses.json'
+        self.statuses = json.loads(statuses.read_text(encoding='utf-8')) if statuses.exists() else {}
+        self.sites = (fixtures / 'sites').resolve()
+        self.latency = latency
+        self.tls = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        self.tls.load_cert_chain(cert, key)
+        self._lock = threading.Lock()
+        self.stats = Counter()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def count(self, name: str):
+        with self._lock:
+            self.stats[name] += 1
+
+    def take_stats(self) -> Counter:
+        with self._lock:
+            stats, self.stats = self.stats, Counter()
+        return stats
+
+
+def make_certificate(hosts, directory: Path):
+    """Self-signed certificate for the replayed hosts; also the CA bundle the pipelines trust."""
+    cert, key = directory / 'replay_cert.pem', directory / 'replay_key.pem'
+    names = ','.join(f"DNS:{host}" for host in sorted(hosts))
+    try:
+        subprocess.run(
+            ['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '2', '-subj', '/CN=replay stand-in',
+             '-keyout', str(key), '-out', str(cert), '-addext', f"subjectAltName={names}"],
+            check=True, capture_output=True,
+        )
+    except (OSError, subprocess.CalledProcessError) as e:
+        sys.exit(f"❌ Could not create the replay certificate with openssl: {e}")
+    return cert, key
+
+
+def proxy_environment(server: ReplayServer, cert: Path) -> dict:
+    env = {k: v for k, v in os.environ.items() if k.lower() not in ('no_proxy', 'all_proxy')}
+    for name in ('HTTP_PROXY', 'HTTPS_PROXY', 'http_proxy', 'https_proxy'):
+        env[name] = server.url
+    env['REQUESTS_CA_BUNDLE'] = str(cert)
+    return env
+
+
+def last_summary(path: Path) -> dict:
+    with open(path, encoding='utf-8') as f:
+        return json.loads(f.read().splitlines()[-1])
+
+
+def domain_finder_config(work: Path, workers: int, cache: bool) -> dict:
+    config = load_config(str(ROOT / 'config.yaml'))
+    config['search'] = dict(config.get('search', {}), qps=1e6, burst=workers, concurrency=workers,
+                            daily_quota=0, quota_file=str(work / 'search_quota.json'))
+    config['cache'] = dict(config.get('cache', {}), enabled=cache, directory=str(work / 'cache' / 'search'),
+                           liveness_file=str(work / 'cache' / 'liveness.sqlite'), schools_dir=str(work / 'cache' / 'schools'))
+    config['output'] = dict(config.get('output', {}), candidates_dir=str(work / 'candidates'))
+    config['resume'] = dict(config.get('resume', {}), checkpoint_file='')
+    config['performance'] = dict(config.get('performance', {}), metrics_file=str(work / 'domain_metrics.jsonl'))
+    config['validation'] = dict(config.get('validation', {}), check_domain_accessibility=True)
+    return config
+
+
+def run_domain_finder(work: Path, fixtures: Path, workers: int, cache: bool) -> Path:
+    output = work / 'domains.csv'
+    for path in (output, work / 'domains_errors.csv', work / 'domains_checkpoints.sqlite'):
+        path.unlink(missing_ok=True)
+    shutil.rmtree(work / 'candidates', ignore_errors=True)
+    finder = DomainFinder(domain_finder_config(work, workers, cache), 'replay-key', 'replay-cse', workers=workers)
+    with open(work / 'domain_finder.log', 'a', encoding='utf-8') as log, contextlib.redirect_stdout(log):
+        finder.process_schools(str(fixtures / 'schools.csv'), str(output))
+    return output
+
+
+def run_coaches(work: Path, domains_csv: Path, profile: str, workers: int, cache: bool, env: dict):
+    folder = work / 'coaches'
+    folder.mkdir(exist_ok=True)
+    with open(COACHES / 'config.yaml', encoding='utf-8') as f:
+        config = yaml.safe_load(f)
+    config.update(input_csv_path=str(domains_csv), output_directory='output', http_first=True, resume=False)
+    config['resolution_cache'] = dict(config.get('resolution_cache', {}), enabled=cache)
+    config['bio_enrichment'] = dict(config.get('bio_enrichment', {}), cache=cache)
+    config['performance'] = dict(config.get('performance', {}), metrics_file='output/run_metrics.jsonl')
+    with open(folder / 'config.yaml', 'w', encoding='utf-8') as f:
+        yaml.safe_dump(config, f, sort_keys=False)
+    with open(work / 'coaches.log', 'a', encoding='utf-8') as log:
+        done = subprocess.run(
+            [sys.executable, str(COACHES / 'run.py'), '--profile', profile, '--http-first', '--fresh', '--workers', str(workers)],
+            cwd=folder, env=env, stdout=log, stderr=subprocess.STDOUT,
+        )
+    if done.returncode:
+        with open(work / 'coaches.log', encoding='utf-8') as log:
+            print(''.join(log.readlines()[-20:]))
+        sys.exit(f"❌ coaches/run.py exited with {done.returncode}")
+    return folder / 'output'
+
+
+def cached_error_paths(cache_file: Path, statuses: dict) -> list:
+    """statuses.json paths the coaches staff URL cache recorded anyway (should be none)."""
+    if not cache_file.exists():
+        return []
+    with contextlib.closing(sqlite3.connect(cache_file)) as conn:
+        rows = conn.execute("SELECT domain, path, status FROM staff_urls").fetchall()
+    return [f"{domain}{path} ({status})" for domain, path, status in rows if f"{domain}{path}" in statuses]
+
+
+def read_rows(path: Path):
+    if not path.exists():
+        return []
+    with open(path, encoding='utf-8', newline='') as f:
+        return list(csv.DictReader(f))
+
+
+def stage(summary: dict, requests: int) -> dict:
+    school = summary['stages'].get('school', {})
+    elapsed = summary['elapsed_s'] or 1e-9
+    return {
+        'schools': school.get('count', 0),
+        'elapsed_s': elapsed,
+        'schools_per_s': round(school.get('count', 0) / elapsed, 2),
+        'requests_per_s': round(requests / elapsed, 2),
+        'p50_ms': school.get('p50_ms'),
+        'p95_ms': school.get('p95_ms'),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline replay benchmark of the domain finder and coaches pipelines")
+    parser.add_argument('--workers', type=int, default=4, help="Domain finder search workers (default 4)")
+    parser.add_argument('--coach-workers', type=int, default=4, help="Coaches scraper workers (default 4)")
+    parser.add_argument('--latency', type=float, default=100, help="Milliseconds added to every replayed response (default 100)")
+    caching = parser.add_mutually_exclusive_group()
+    caching.add_argument('--warm', action='store_true', help="Measure a second run, with the caches filled by a first one")
+    caching.add_argument('--no-cache', action='store_true', help="Disable the search, liveness, staff URL and bio caches")
+    parser.add_argument('--profile', default='soccer_womens', help="Coaches sport profile (default soccer_womens)")
+    parser.add_argument('--fixtures', default=str(FIXTURES), help="Fixture folder (default scripts/replay_fixtures)")
+    parser.add_argument('--keep', help="Work folder to keep (outputs, logs, per-stage metrics); default a temporary one")
+    args = parser.parse_args()
+
+    fixtures = Path(args.fixtures).resolve()
+    with contextlib.ExitStack() as stack:
+        if args.keep:
+            work = Path(args.keep).resolve()
+            shutil.rmtree(work, ignore_errors=True)
+            work.mkdir(parents=True)
+        else:
+            work = Path(stack.enter_context(tempfile.TemporaryDirectory(prefix='replay-')))
+        hosts = {SEARCH_HOST, *(p.name for p in (fixtures / 'sites').iterdir() if p.is_dir())}
+        cert, key = make_certificate(hosts, work)
+        server = ReplayServer(fixtures, args.latency / 1000, cert, key)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        stack.callback(server.shutdown)
+        env = proxy_environment(server, cert)
+        # The domain finder runs in this process: its requests sessions read the proxy settings per request.
+        for name in [k for k in os.environ if k not in env]:
+            del os.environ[name]
+        os.environ.update(env)
+        cache = not args.no_cache
+        cache_label = 'warm' if args.warm else 'disabled' if args.no_cache else 'cold'
+        print(f"\n📼 Replaying {fixtures} through {server.url} (+{args.latency:.0f} ms per response, caches {cache_label})")
+
+        for run in range(2 if args.warm else 1):
+            server.take_stats()
+            domains_csv = run_domain_finder(work, fixtures, args.workers, cache)
+            finder_stats = server.take_stats()
+            coaches_out = run_coaches(work, domains_csv, args.profile, args.coach_workers, cache, env)
+            coach_stats = server.take_stats()
+
+        finder = stage(last_summary(work / 'domain_metrics.jsonl'), finder_stats['searches'] + finder_stats['head_checks'] + finder_stats['head_checks_404'])
+        coaches = stage(last_summary(coaches_out / 'run_metrics.jsonl'), coach_stats['pages'] + coach_stats['pages_404'])
+        print(f"\n   {'pipeline':<15} {'schools':>7} {'wall s':>8} {'schools/s':>10} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8}")
+        for label, s, unit in (('domain finder', finder, 'searches+HEAD'), ('coaches', coaches, 'pages')):
+            print(f"   {label:<15} {s['schools']:>7} {s['elapsed_s']:>8.2f} {s['schools_per_s']:>10.2f} {s['requests_per_s']:>8.2f} "
+                  f"{s['p50_ms'] or 0:>8.1f} {s['p95_ms'] or 0:>8.1f}   ({unit})")
+        print(f"   domain finder: {finder_stats['searches']} searches, {finder_stats['head_checks']} liveness checks")
+        print(f"   coaches:       {coach_stats['pages']} pages, {coach_stats['pages_404']} missing paths, "
+              f"{coach_stats['error_statuses']} error statuses")
+
+        with open(fixtures / 'expected.json', encoding='utf-8') as f:
+            expected = json.load(f)
+        domains = {r['school_name']: r['athletics_domain'] for r in read_rows(domains_csv) + read_rows(work / 'domains_errors.csv')}
+        coach_rows = read_rows(coaches_out / f"coaches_{args.profile}.csv")
+        got = {'domains': domains, 'coaches': len(coach_rows), 'emails': sum(bool(r.get('Email')) for r in coach_rows)}
+        unrecorded = finder_stats['unrecorded_searches'] + finder_stats['unknown_hosts'] + coach_stats['unknown_hosts']
+
+        RESULTS_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(RESULTS_FILE, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({
+                'started': time.time(), 'fixtures': str(fixtures), 'latency_ms': args.latency, 'caches': cache_label,
+                'workers': args.workers, 'coach_workers': args.coach_workers, 'profile': args.profile,
+                'domain_finder': finder, 'coaches': coaches, 'requests': dict(finder_stats + coach_stats),
+            }) + '\n')
+        print(f"\n📝 Appended to {RESULTS_FILE}" + (f"; outputs and logs kept in {work}" if args.keep else ''))
+
+        if unrecorded:
+            print(f"⚠️  {unrecorded} requests had no recording (empty search results or unknown hosts)")
+        for name in ('domains', 'coaches', 'emails'):
+            if got[name] != expected[name]:
+                print(f"❌ {name} differ from expected.json: {got[name]!r} != {expected[name]!r}")
+                sys.exit(1)
+        cached_errors = cached_error_paths(coaches_out.parent / 'cache' / 'staff_urls.sqlite', server.statuses)
+        if cached_errors:
+            print(f"❌ Error statuses were cached as misses: {', '.join(cached_errors)}")
+            sys.exit(1)
+        print(f"✅ {sum(1 for d in domains.values() if d)} domains and {got['coaches']} coaches ({got['emails']} emails) as expected")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Domain Finder - Scoring Parity Check and Benchmark
+Compares the batch scorer (src/batch_scorer.py) with score_candidates.
+
+Every school of the input file gets ten synthetic search results: its own
+domain, domains of other schools (so the "already used" and whitelist rules
+fire), social/encyclopedia/store sites, media snippets and .edu pages.
+Schools are then selected in order exactly like a real run, and each
+school's candidate list (domain, score, reason, order) must be identical
+between the two scorers. Finally both are timed on the same data.
+
+With --check only the parity is checked, on the replay fixtures: the recorded
+search results of scripts/replay_fixtures (plus the synthetic ones) for its
+schools. A mismatch fails with an AssertionError, so CI runs this mode.
+
+Usage (from the domain finder folder):
+    python scripts/benchmark_scoring.py [input_csv] [--repeat N]
+    python scripts/benchmark_scoring.py --check
+"""
+
+import json
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from batch_scorer import candidate_table, candidates_for, group_by_school, score_table  # noqa: E402
+from domain_finder import school_fields, score_candidates, select_candidate  # noqa: E402
+
+DEFAULT_INPUT = 'data/input/schools_with_domains_COMPLETE_v2.csv'
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'replay_fixtures')
+SPORT_PROFILE = {'sport_keywords': ['volleyball', 'wvball', 'vb']}
+CONFIG = {'validation': {'check_domain_accessibility': False}}
+
+
+def synthetic_items(df: pd.DataFrame, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    domains = [d for d in df['athletics_domain'].fillna('') if d] or ['example.com']
+    snippets = ['Official athletics website', 'Lions defeated the Hawks 3-1', 'Campus visit and recruiting',
+                'Volleyball roster and schedule', 'History of the college', 'Shop team gear', '']
+    items = {}
+    for i, row in df.iterrows():
+        name = str(row['school_name'])
+        slug = ''.join(w[:4].lower() for w in name.split()[:3] if w.isalpha()) or 'school'
+        own = row['athletics_domain'] if isinstance(row['athletics_domain'], str) else f'go{slug}.com'
+        pool = [
+            f'https://www.{own}/',
+            f'https://{rng.choice(domains)}/sports/womens-volleyball',
+            f'https://{rng.choice(domains)}/',
+            f'https://en.wikipedia.org/wiki/{slug}',
+            f'https://www.facebook.com/{slug}athletics',
+            f'https://{slug}.edu/',
+            f'https://athletics.{slug}.edu/sports',
+            f'https://shop.{slug}store.com/',
+            f'https://{slug}sports.net/news',
+            f'https://www.{slug}.org/about',
+        ]
+        rng.shuffle(pool)
+        items[i] = [
+            {'link': url, 'title': f"{name} {rng.choice(['Athletics', 'Volleyball', 'Home', 'News'])}", 'snippet': rng.choice(snippets)}
+            for url in pool
+        ]
+    return items
+
+
+def replay_schools() -> pd.DataFrame:
+    """The replay fixture schools, with the domains the replay expects."""
+    df = pd.read_csv(os.path.join(FIXTURES, 'schools.csv')).reset_index(drop=True)
+    with open(os.path.join(FIXTURES, 'expected.json'), encoding='utf-8') as f:
+        expected = json.load(f)['domains']
+    df['athletics_domain'] = [expected.get(name) or None for name in df['school_name']]
+    return df
+
+
+def replay_items(df: pd.DataFrame) -> dict:
+    """Recorded search results of every query that names the school, then its synthetic results."""
+    with open(os.path.join(FIXTURES, 'search.json'), encoding='utf-8') as f:
+        search = json.load(f)
+    items = synthetic_items(df)
+    for i, name in df['school_name'].items():
+        recorded = [item for query, response in search.items() if query.startswith(f"{name} ")
+                    for item in response.get('items', [])]
+        items[i] = recorded + items[i]
+    return items
+
+
+def assert_parity(rows, reference, batch):
+    for row, a, b in zip(rows, reference, batch):
+        assert len(a) == len(b), f"{row['school_name']}: {len(a)} reference candidates, {len(b)} batch"
+        for x, y in zip(a, b):
+            assert x == y, (f"{row['school_name']}: reference {x['domain']} {x['score']} {x['reason']}, "
+                            f"batch {y['domain']} {y['score']} {y['reason']}")
+
+
+def run_reference(rows, fields, items, domain_map):
+    used, out = set(), []
+    for i in range(len(rows)):
+        candidates = score_candidates(items[i], fields[i], used, domain_map, SPORT_PROFILE)
+        select_candidate(candidates, used, CONFIG)
+        out.append(candidates)
+    return out
+
+
+def run_batch(rows, fields, items, domain_map):
+    scored = score_table(candidate_table(items), dict(enumerate(fields)), domain_map, SPORT_PROFILE)
+    by_school = group_by_school(scored)
+    used, out = set(), []
+    for i in range(len(rows)):
+        candidates = candidates_for(by_school[i], used)
+        select_candidate(candidates, used, CONFIG)
+        out.append(candidates)
+    return out
+
+
+def main():
+    input_csv, repeat, check = DEFAULT_INPUT, 3, False
+    args = iter(sys.argv[1:])
+    for arg in args:
+        if arg == '--repeat':
+            repeat = int(next(args, repeat))
+        elif arg == '--check':
+            check = True
+        else:
+            input_csv = arg
+
+    if check:
+        input_csv = os.path.join(FIXTURES, 'schools.csv')
+        df = replay_schools()
+        items = replay_items(df)
+    else:
+        df = pd.read_csv(input_csv).reset_index(drop=True)
+        if 'athletics_domain' not in df.columns:
+            df['athletics_domain'] = ''
+        items = synthetic_items(df)
+    rows = [row for _, row in df.iterrows()]
+    fields = [school_fields(row, SPORT_PROFILE) for row in rows]
+    # A few schools whitelisted so the domain_map bonus is exercised.
+    domain_map = {r['school_name']: r['athletics_domain'] for r in rows[::7] if isinstance(r['athletics_domain'], str)}
+
+    print(f"\n📂 {len(rows)} schools, {sum(len(v) for v in items.values())} candidates from {input_csv}")
+
+    reference = run_reference(rows, fields, items, domain_map)
+    batch = run_batch(rows, fields, items, domain_map)
+    if check:
+        assert_parity(rows, reference, batch)
+        print(f"✅ Parity: identical candidates, scores and reasons for all {len(rows)} schools")
+        return
+    mismatches = [i for i, (a, b) in enumerate(zip(reference, batch)) if a != b]
+    if mismatches:
+        i = mismatches[0]
+        print(f"❌ Parity FAILED for {len(mismatches)} schools; first: {rows[i]['school_name']}")
+        for a, b in zip(reference[i], batch[i]):
+            if a != b:
+                print(f"   reference: {a['domain']} {a['score']} {a['reason']}")
+                print(f"   batch:     {b['domain']} {b['score']} {b['reason']}")
+                break
+        sys.exit(1)
+    print(f"✅ Parity: identical candidates, scores and reasons for all {len(rows)} schools")
+
+    for label, fn in (('score_candidates (per school)', run_reference), ('batch scorer', run_batch)):
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn(rows, fields, items, domain_map)
+            best = min(best, time.perf_counter() - start)
+        print(f"⏱️  {label:<30} {best * 1000:8.1f} ms  ({len(rows) / best:,.0f} schools/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Domain Finder - Startup Time Benchmark
+Measures what a short run or a unit test pays before the first school.
+
+Each stage is timed in fresh interpreters (no warm module cache) and the
+median of --repeat runs is reported:
+
+- import:     `import domain_finder`, with no API keys in the environment
+- from_env:   DomainFinder.from_env() (config.yaml, .env, logging)
+- first find: one domain_map school, scored without any search
+- client:     building the search client, liveness checker and query plan
+              (what the first real search pays)
+
+With --against REV the import is also timed for the domain_finder.py of a
+git revision (with dummy API keys, which older revisions require).
+
+Usage (from the domain finder folder):
+    python scripts/benchmark_startup.py [--repeat N] [--against REV]
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+STAGES = r'''
+import json, sys, time
+t0 = time.perf_counter()
+import domain_finder
+t1 = time.perf_counter()
+finder = domain_finder.DomainFinder.from_env()
+t2 = time.perf_counter()
+finder.domain_map = {'Benchmark College': 'benchmarkathletics.com'}
+finder.find({'school_name': 'Benchmark College'})
+t3 = time.perf_counter()
+heavy = sorted(m for m in ('pandas', 'pyarrow', 'requests') if m in sys.modules)
+finder.client, finder.liveness, finder.plan
+t4 = time.perf_counter()
+finder.close()
+print(json.dumps({'import': t1 - t0, 'from_env': t2 - t1, 'first find': t3 - t2, 'client': t4 - t3, 'heavy': heavy}))
+'''
+
+IMPORT_ONLY = r'''
+import json, time
+t0 = time.perf_counter()
+import domain_finder
+print(json.dumps({'import': time.perf_counter() - t0}))
+'''
+
+
+def run(code: str, src: str, env: dict) -> dict:
+    out = subprocess.run([sys.executable, '-c', code], cwd=os.getcwd(), env=dict(env, PYTHONPATH=src),
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def median_ms(samples: list, key: str) -> float:
+    return statistics.median(s[key] for s in samples) * 1000
+
+
+def main():
+    repeat = 5
+    against = None
+    for i, arg in enumerate(sys.argv):
+        if arg == '--repeat' and i + 1 < len(sys.argv):
+            repeat = max(1, int(sys.argv[i + 1]))
+        elif arg == '--against' and i + 1 < len(sys.argv):
+            against = sys.argv[i + 1]
+
+    # Credentials are only needed once a search is sent; dummy ones let the client be built.
+    env = {k: v for k, v in os.environ.items() if k not in ('GOOGLE_API_KEY', 'GOOGLE_CSE_ID')}
+    samples = [run(STAGES, SRC, dict(env, GOOGLE_API_KEY='benchmark', GOOGLE_CSE_ID='benchmark')) for _ in range(repeat)]
+    offline_import = [run(IMPORT_ONLY, SRC, env) for _ in range(repeat)]
+
+    print(f"\n⏱️  Startup (median of {repeat} fresh interpreters)")
+    print(f"   import, no API keys      {median_ms(offline_import, 'import'):8.1f} ms")
+    for key in ('from_env', 'first find', 'client'):
+        print(f"   {key:<24} {median_ms(samples, key):8.1f} ms")
+    heavy = samples[-1]['heavy']
+    print(f"   heavy modules before the first search: {', '.join(heavy) if heavy else 'none'}")
+
+    if against:
+        with tempfile.TemporaryDirectory() as tmp:
+            top = subprocess.run(['git', 'rev-parse', '--show-toplevel'], cwd=SRC, capture_output=True, text=True, check=True).stdout.strip()
+            repo_src = os.path.relpath(SRC, top)
+            archive = subprocess.run(['git', 'archive', against, repo_src], cwd=top, capture_output=True, check=True).stdout
+            subprocess.run(['tar', '-x', '-C', tmp], input=archive, check=True)
+            old = [run(IMPORT_ONLY, os.path.join(tmp, repo_src), dict(env, GOOGLE_API_KEY='benchmark', GOOGLE_CSE_ID='benchmark')) for _ in range(repeat)]
+        print(f"   import at {against:<14} {median_ms(old, 'import'):8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -17,12 +17,13 @@ __title__ = "Domain Finder"
 __description__ = "Automated athletics domain discovery system"
 __url__ = "https://github.com/Matias-Kostiak-Data/domain-finder"
 
-# Import main classes for easier access
-from .domain_finder import DomainFinder, process_schools_with_resume
+# Import main classes for easier access (no side effects: config and .env are read on demand)
+from .domain_finder import DomainFinder, load_config, process_schools
 
 __all__ = [
     'DomainFinder',
-    'process_schools_with_resume',
+    'load_config',
+    'process_schools',
     '__version__',
     '__author__',
-]
\ No newline at end of file
+]
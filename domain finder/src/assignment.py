@@ -0,0 +1,248 @@
+"""
+Global school -> domain assignment over the scored candidates of all schools.
+
+Selecting schools one at a time against a shared used_domains set lets
+whichever school comes first claim a domain that several schools found, so
+results depend on input order, resume splits and thread timing. Here every
+school's candidates are collected first and the assignment is solved once,
+as a maximum-weight bipartite matching: each domain goes to at most one
+school and the total score of the chosen candidates is as high as possible.
+Schools and domains are visited in sorted order, so ties are broken the same
+way whatever order the schools were searched in.
+
+The selection rules are those of select_candidate:
+1. Candidates scoring at least MIN_SCORE that are not blacklisted, weighted
+   by score. With a liveness checker, assigned domains that are down are
+   dropped for every school and the matching is solved again.
+2. Schools left without a domain may take a .edu candidate with an
+   athletics path (FOUND_NOT_CONFIDENT) among the domains nobody took in
+   step 1, preferring their better-ranked candidates.
+
+resolve_results() applies the assignment to the result files of a
+process_schools run, from the raw candidates in the candidate store.
+"""
+
+import heapq
+from typing import TYPE_CHECKING, Dict, Hashable, List, Optional, Tuple
+
+try:
+    from .batch_scorer import candidate_table, candidates_for, group_by_school, score_table
+    from .candidate_store import candidates_by_school, load_candidates
+    from .checkpoint import ERROR_REASON_PREFIXES
+    from .domain_finder import ScoringRules, has_athletics_marker, is_blacklisted, known_domain_result, profile_mascot
+    from .schools import School
+    from .streaming import latest_results, write_results
+except ImportError:
+    from batch_scorer import candidate_table, candidates_for, group_by_school, score_table
+    from candidate_store import candidates_by_school, load_candidates
+    from checkpoint import ERROR_REASON_PREFIXES
+    from domain_finder import ScoringRules, has_athletics_marker, is_blacklisted, known_domain_result, profile_mascot
+    from schools import School
+    from streaming import latest_results, write_results
+
+if TYPE_CHECKING:
+    from .checkpoint import CheckpointStore
+    from .liveness import LivenessChecker
+
+MIN_SCORE = 150  # select_candidate's threshold for a FOUND domain
+
+
+def max_weight_matching(edges: Dict[Hashable, Dict[str, int]]) -> Dict[Hashable, str]:
+    """
+    Maximum-weight matching of schools to domains.
+
+    `edges` maps each school key (sortable) to {domain: weight}; only positive
+    weights are used. Returns {school: domain} for the schools that get one.
+
+    Shortest augmenting paths with dual potentials (the Hungarian method in
+    the form of Crouse, 2016) over the sparse graph: every school also has a
+    private "unassigned" option, so one Dijkstra search per school ends at the
+    first free domain. Schools whose best domain is uncontested cost one
+    visit of their own edges.
+    """
+    rows = sorted(edges)
+    domains = sorted({d for options in edges.values() for d, w in options.items() if w > 0})
+    column = {d: j for j, d in enumerate(domains)}
+    top = max((w for options in edges.values() for w in options.values()), default=0)
+    # Costs are top - weight (>= 0); leaving a school unassigned costs top.
+    adjacency = [
+        sorted((column[d], top - w) for d, w in edges[row].items() if w > 0) + [(len(domains) + i, top)]
+        for i, row in enumerate(rows)
+    ]
+    u = [0] * len(rows)
+    v: Dict[int, int] = {}
+    col4row: List[Optional[int]] = [None] * len(rows)
+    row4col: Dict[int, int] = {}
+
+    for cur in range(len(rows)):
+        shortest: Dict[int, int] = {}
+        path: Dict[int, int] = {}
+        done = set()
+        visited_rows = []
+        heap = []
+        i, min_val = cur, 0
+        while True:
+            visited_rows.append(i)
+            for j, cost in adjacency[i]:
+                if j in done:
+                    continue
+                reduced = min_val + cost - u[i] - v.get(j, 0)
+                if reduced < shortest.get(j, reduced + 1):
+                    shortest[j] = reduced
+                    path[j] = i
+                    heapq.heappush(heap, (reduced, j))
+            while True:
+                min_val, j = heapq.heappop(heap)
+                if j not in done and shortest[j] == min_val:
+                    break
+            done.add(j)
+            if j not in row4col:
+                sink = j
+                break
+            i = row4col[j]
+
+        u[cur] += min_val
+        for i in visited_rows[1:]:
+            u[i] += min_val - shortest[col4row[i]]
+        for j in done:
+            v[j] = v.get(j, 0) - (min_val - shortest[j])
+        j = sink
+        while True:
+            i = path[j]
+            row4col[j] = i
+            col4row[i], j = j, col4row[i]
+            if i == cur:
+                break
+
+    return {row: domains[j] for row, j in zip(rows, col4row) if j < len(domains)}
+
+
+def assign_domains(
+    candidates: Dict[Hashable, list],
+    liveness: Optional["LivenessChecker"] = None,
+    rules: Optional[ScoringRules] = None,
+) -> Dict[Hashable, dict]:
+    """
+    Result dicts, as select_candidate returns them, for every school at once.
+
+    `candidates` maps each school key to its scored candidates, best first,
+    scored without any used domains (score_candidates(..., set(), ...)) and
+    with the same `rules` as the blacklist check here.
+    """
+    best: Dict[Hashable, Dict[str, dict]] = {}
+    for key, cands in candidates.items():
+        best[key] = {}
+        for cand in cands:
+            if cand['score'] >= MIN_SCORE and not is_blacklisted(cand['domain'], rules):
+                best[key].setdefault(cand['domain'], cand)
+
+    # 1. Confident domains; domains found down are dropped and the matching solved again.
+    down = set()
+    while True:
+        edges = {key: {d: c['score'] for d, c in options.items() if d not in down} for key, options in best.items()}
+        matched = max_weight_matching(edges)
+        if liveness is None:
+            break
+        liveness.prefetch(matched.values())
+        newly_down = {d for d in matched.values() if not liveness.is_up(d)}
+        if not newly_down:
+            break
+        down |= newly_down
+
+    # 2. .edu fallback for the schools left over, among the domains still free.
+    taken = set(matched.values())
+    fallback_options: Dict[Hashable, Dict[str, dict]] = {}
+    for key, cands in candidates.items():
+        if key in matched:
+            continue
+        options = fallback_options[key] = {}
+        for cand in cands:
+            domain = cand['domain']
+            if domain.endswith('.edu') and domain not in taken and has_athletics_marker(domain, cand['url']):
+                options.setdefault(domain, cand)
+    fallback = max_weight_matching({
+        key: {d: len(candidates[key]) - rank for rank, d in enumerate(options)}
+        for key, options in fallback_options.items()
+    })
+
+    results = {}
+    for key, cands in candidates.items():
+        if key in matched:
+            cand = best[key][matched[key]]
+            results[key] = {'domain': cand['domain'], 'status': 'FOUND', 'score': cand['score'], 'reason': cand['reason'], 'candidates': cands}
+        elif key in fallback:
+            cand = fallback_options[key][fallback[key]]
+            results[key] = {'domain': cand['domain'], 'status': 'FOUND_NOT_CONFIDENT', 'score': cand['score'], 'reason': 'Fallback .edu with athletics path', 'candidates': cands}
+        else:
+            results[key] = {'domain': '', 'status': 'NOT_FOUND', 'score': 0, 'reason': 'No candidate passed threshold', 'candidates': cands}
+    return results
+
+
+def score_stored(
+    stored: Dict[Hashable, dict],
+    schools: Dict[Hashable, School],
+    domain_map: dict,
+    sport_profile: dict,
+    rules: Optional[ScoringRules] = None,
+) -> Dict[Hashable, list]:
+    """Scored candidates (no used domains) of every school in `schools`, from candidate store entries."""
+    keys = list(schools)
+    table = candidate_table({i: stored[key]['items'] for i, key in enumerate(keys) if key in stored})
+    scored = group_by_school(score_table(table, dict(enumerate(schools.values())), domain_map, sport_profile, rules))
+    return {key: candidates_for(scored.get(i, []), set()) for i, key in enumerate(keys)}
+
+
+def resolve_results(
+    output_csv: str,
+    error_csv: str,
+    candidates_dir: str,
+    config: dict,
+    domain_map: dict,
+    sport_profile: dict,
+    checkpoints: Optional["CheckpointStore"] = None,
+    liveness: Optional["LivenessChecker"] = None,
+    rules: Optional[ScoringRules] = None,
+) -> Tuple[int, int]:
+    """
+    Re-solves the domains of every searched school in the result files at once
+    and rewrites the files (and checkpoint statuses) where the outcome changed.
+    Schools settled by overrides or domain_map, schools whose last search
+    failed, and schools without stored candidates are left as they are.
+
+    Each school keeps only its latest row (see streaming.latest_results);
+    superseded rows are dropped when the files are rewritten.
+
+    Candidates are scored and filtered with `rules`, built from `config` when
+    not given, never with whatever another copy of domain_finder was set up with.
+    Returns (schools assigned, schools changed).
+    """
+    rules = rules or ScoringRules.from_config(config)
+    latest, superseded = latest_results(output_csv, error_csv)
+    mascot = profile_mascot(sport_profile)
+    stored = candidates_by_school(load_candidates(candidates_dir))
+    schools: Dict[Tuple[str, str], School] = {}
+    for key, row in latest.items():
+        school = School.from_row(row, mascot)
+        if (key in stored and not row.get('reason', '').startswith(ERROR_REASON_PREFIXES)
+                and known_domain_result(school, config, domain_map) is None):
+            schools[key] = school
+    if not schools and not superseded:
+        return 0, 0
+
+    results = assign_domains(score_stored(stored, schools, domain_map, sport_profile, rules), liveness, rules) if schools else {}
+    rows, changed = [], {}
+    for key, row in latest.items():
+        result = results.get(key)
+        if result is not None:
+            new = dict(row, athletics_domain=result['domain'], status=result['status'], score=str(result['score']), reason=result['reason'])
+            if any(new[k] != row.get(k, '') for k in ('athletics_domain', 'status', 'score', 'reason')):
+                changed[key] = result
+            row = new
+        rows.append(row)
+
+    if changed or superseded:
+        write_results(output_csv, error_csv, rows)
+        if checkpoints is not None:
+            for (school_name, division), result in changed.items():
+                checkpoints.update(school_name, division, result['status'], result['reason'])
+    return len(schools), len(changed)
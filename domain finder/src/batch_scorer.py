@@ -0,0 +1,179 @@
+"""
+Batch version of score_candidates over a whole table of (school, candidate) rows.
+
+Every feature is computed once per column with pandas string operations:
+each word list (blacklist, media words, strong keywords, encyclopedia and
+store domains) is matched with its compiled matcher regex (see matcher.py)
+instead of a Python loop per candidate, and domain_map membership is one
+isin() against a set.
+
+A candidate's score depends on whether its domain was already taken by an
+earlier school, which is only known while schools are selected in order.
+score_table() therefore computes both outcomes, "fresh" and "used", and
+candidates_for() picks the right one per candidate from the current
+used_domains. The result is identical, score and reason, to score_candidates.
+"""
+
+import re
+from typing import TYPE_CHECKING, Dict, Hashable, List, Optional, Set
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .domain_finder import ATHLETICS_WORDS, DEFAULT_RULES, MEDIA_WORDS, STORES, school_token_set, strong_keyword_matcher
+except ImportError:
+    from domain_finder import ATHLETICS_WORDS, DEFAULT_RULES, MEDIA_WORDS, STORES, school_token_set, strong_keyword_matcher
+
+if TYPE_CHECKING:
+    from .domain_finder import ScoringRules
+    from .schools import School
+
+REJECTED = -9999
+LOW_SCORE = 220
+# netloc as urlparse() finds it: after an optional scheme and "//", up to the path/query/fragment
+NETLOC = re.compile(r'^(?:[A-Za-z][A-Za-z0-9+.\-]*:)?//([^/?#]*)')
+SCORED_COLUMNS = ['domain', 'url', 'title', 'snippet', 'score_fresh', 'reason_fresh', 'score_used', 'reason_used']
+
+
+def _contains(series: pd.Series, matcher) -> np.ndarray:
+    return series.str.contains(matcher.regex, regex=True).to_numpy(dtype=bool)
+
+
+def _append(reason: np.ndarray, mask: np.ndarray, text) -> np.ndarray:
+    """Appends `text` (a string or a per-row array) to the reasons selected by mask."""
+    return np.where(mask, reason + '; ' + text, reason)
+
+
+def _joined(reason: np.ndarray) -> np.ndarray:
+    return np.array([r[2:] for r in reason], dtype=object)
+
+
+def domains_from_urls(url: pd.Series) -> pd.Series:
+    """extract_domain_from_url() for a whole column."""
+    netloc = url.str.extract(NETLOC, expand=False).fillna('')
+    return netloc.str.replace(r'^www\.', '', regex=True)
+
+
+def candidate_table(items_by_school: Dict[Hashable, List[dict]]) -> pd.DataFrame:
+    """Flattens {school_key: [search items]} into one row per candidate, in result order."""
+    rows = [
+        (key, item.get('link', ''), item.get('title', '') or '', item.get('snippet', '') or '')
+        for key, items in items_by_school.items()
+        for item in items
+    ]
+    return pd.DataFrame(rows, columns=['school_key', 'url', 'title', 'snippet'])
+
+
+def score_table(
+    table: pd.DataFrame,
+    fields_by_school: Dict[Hashable, "School"],
+    domain_map: dict,
+    sport_profile: dict,
+    rules: Optional["ScoringRules"] = None,
+) -> pd.DataFrame:
+    """
+    Adds domain, score_fresh/reason_fresh and score_used/reason_used columns.
+
+    `table` has school_key, url, title and snippet columns; fields_by_school
+    maps each school_key to the School record of that school. `rules` are the
+    blacklist and encyclopedia matchers, as for score_candidates.
+    """
+    rules = rules or DEFAULT_RULES
+    table = table.reset_index(drop=True).copy()
+    n = len(table)
+    url = table['url'].astype(str)
+    domain = domains_from_urls(url)
+    title_lower = table['title'].astype(str).str.lower()
+    snippet_lower = table['snippet'].astype(str).str.lower()
+    domain_lower = domain.str.lower()
+
+    mascot_candidates = [kw.lower() for kw in sport_profile.get('sport_keywords', []) if len(kw) > 2]
+    strong_keywords = strong_keyword_matcher(tuple(sport_profile.get('sport_keywords', [])), mascot_candidates[0] if mascot_candidates else '')
+
+    blacklisted = _contains(domain_lower, rules.blacklist)
+    media = _contains(snippet_lower, MEDIA_WORDS) | _contains(title_lower, MEDIA_WORDS)
+    athletic = _contains(domain, ATHLETICS_WORDS) | _contains(url, ATHLETICS_WORDS)
+    is_com = domain.str.endswith('.com').to_numpy(dtype=bool)
+    is_org_net = (domain.str.endswith('.org') | domain.str.endswith('.net')).to_numpy(dtype=bool)
+    is_edu = domain.str.endswith('.edu').to_numpy(dtype=bool)
+    whitelisted = domain.isin(set(domain_map.values())).to_numpy(dtype=bool)
+    bad = _contains(domain_lower, rules.encyclopedias) | _contains(domain_lower, STORES)
+    strong = _contains(domain_lower + url.str.lower(), strong_keywords)
+
+    # Token matches: one (candidate, token) pair per row, tested in a single pass.
+    tokens = {key: list(school_token_set(fields)) for key, fields in fields_by_school.items()}
+    haystack = (domain + '\n' + title_lower + '\n' + snippet_lower).to_numpy(dtype=object)
+    row_tokens = [tokens[key] for key in table['school_key']]
+    counts = np.fromiter((len(ts) for ts in row_tokens), dtype=np.int64, count=n)
+    owner = np.repeat(np.arange(n), counts)
+    flat_tokens = [t for ts in row_tokens for t in ts]
+    hits = np.fromiter((t in haystack[i] for t, i in zip(flat_tokens, owner)), dtype=bool, count=len(flat_tokens))
+    token_matches = np.bincount(owner[hits], minlength=n)
+
+    # Score and reasons up to (but excluding) the "Already used domain" penalty...
+    head_score = np.where(blacklisted, -1000, 0) + np.where(media, -500, 0)
+    head = np.full(n, '', dtype=object)
+    head = _append(head, blacklisted, 'Blacklisted domain')
+    head = _append(head, media, 'Media/recruiting/news snippet')
+
+    # ...and after it.
+    tail_score = (
+        np.where(is_com, np.where(athletic, 200, 100), 0)
+        + np.where(is_org_net, 50, 0)
+        + np.where(is_edu, np.where(athletic, 100, -500), 0)
+        + token_matches * 30
+        + np.where(whitelisted, 20, 0)
+    )
+    tail = np.full(n, '', dtype=object)
+    tail = _append(tail, is_com & athletic, '.com with athletics/sports')
+    tail = _append(tail, is_com & ~athletic, '.com generic')
+    tail = _append(tail, is_org_net, '.org/.net')
+    tail = _append(tail, is_edu & athletic, '.edu with athletics/sports')
+    tail = _append(tail, is_edu & ~athletic, '.edu root without athletics')
+    tail = _append(tail, token_matches > 0, token_matches.astype(str).astype(object) + ' school/city/mascot tokens matched')
+    tail = _append(tail, whitelisted, 'Domain in whitelist for another school')
+    tail = _append(tail, bad, 'Rejected: encyclopedia/store domain')
+    edu_root = is_edu & ~athletic
+
+    for variant, penalty in (('fresh', 0), ('used', 100)):
+        score = np.where(bad, REJECTED, head_score - penalty + tail_score)
+        low = score < LOW_SCORE
+        reason = head + ('; Already used domain' if penalty else '') + tail
+        reason = _append(reason, low & ~strong, 'Rejected: score too low and no strong keyword')
+        reason = _append(reason, low & strong, 'Accepted with low score due to strong keyword')
+        reason = _append(reason, edu_root, 'Rejected: .edu root without athletics path')
+        score = np.where((low & ~strong) | edu_root, REJECTED, score)
+        table[f'score_{variant}'] = score
+        table[f'reason_{variant}'] = _joined(reason)
+
+    table['domain'] = domain
+    return table
+
+
+def group_by_school(scored: pd.DataFrame) -> Dict[Hashable, List[tuple]]:
+    """Splits a scored table into {school_key: [row tuples]} once, in result order."""
+    grouped: Dict[Hashable, List[tuple]] = {}
+    columns = [scored[c].tolist() for c in SCORED_COLUMNS]
+    for key, row in zip(scored['school_key'].tolist(), zip(*columns)):
+        grouped.setdefault(key, []).append(row)
+    return grouped
+
+
+def candidates_for(rows: List[tuple], used_domains: Set[str]) -> list:
+    """
+    Candidate dicts for one school's rows (from group_by_school), best first,
+    exactly as score_candidates would build them given the current used_domains.
+    """
+    candidates = []
+    for domain, url, title, snippet, score_fresh, reason_fresh, score_used, reason_used in rows:
+        used = domain in used_domains
+        candidates.append({
+            'domain': domain,
+            'score': int(score_used if used else score_fresh),
+            'reason': reason_used if used else reason_fresh,
+            'url': url,
+            'title': title,
+            'snippet': snippet,
+        })
+    return sorted(candidates, key=lambda x: x['score'], reverse=True)
@@ -0,0 +1,91 @@
+"""
+Columnar store of raw search candidates, one row per (school, rank).
+
+process_schools records every result Google returned for a school (url,
+title, snippet and rank) before any scoring happens. rescore.py reads the
+store back and re-ranks every school without network access, so scoring
+rules can change without searching again.
+
+Rows are buffered in memory and written as Parquet part files on flush(), so
+an interrupted run keeps everything saved at the last auto-save. A school
+searched in several runs keeps only its most recent batch when loaded. A
+school whose search returned nothing is recorded as a single row with rank -1.
+When several query variants were sent, their results are stored merged (in
+the order found, duplicates dropped) under the queries joined by ' | '.
+"""
+
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import pandas as pd
+
+COLUMNS = ['school_name', 'division', 'query', 'rank', 'url', 'title', 'snippet', 'searched_at']
+NO_RESULTS_RANK = -1
+
+
+class CandidateStore:
+    """Thread-safe buffer of raw candidates flushed to Parquet part files."""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._rows: List[dict] = []
+        self.schools = 0
+
+    def add(self, school_name: str, division: str, query: str, items: List[dict]):
+        """Records the raw Custom Search items returned for one school."""
+        searched_at = time.time()
+        base = {'school_name': school_name, 'division': division, 'query': query, 'searched_at': searched_at}
+        rows = [
+            dict(base, rank=rank, url=item.get('link', '') or '', title=item.get('title', '') or '', snippet=item.get('snippet', '') or '')
+            for rank, item in enumerate(items, start=1)
+        ]
+        if not rows:
+            rows = [dict(base, rank=NO_RESULTS_RANK, url='', title='', snippet='')]
+        with self._lock:
+            self._rows.extend(rows)
+            self.schools += 1
+
+    def flush(self) -> int:
+        """Writes buffered rows to a new part file. Returns the number of rows written."""
+        with self._lock:
+            rows, self._rows = self._rows, []
+        if not rows:
+            return 0
+        df = pd.DataFrame(rows, columns=COLUMNS).astype({'rank': 'int16'})
+        path = self.directory / f"part-{time.strftime('%Y%m%d-%H%M%S')}-{time.time_ns() % 10**9:09d}.parquet"
+        tmp = path.with_suffix('.tmp')
+        df.to_parquet(tmp, index=False)
+        tmp.replace(path)
+        return len(rows)
+
+
+def load_candidates(directory: str) -> pd.DataFrame:
+    """All stored candidates, keeping only the latest search of each school."""
+    parts = sorted(Path(directory).glob('part-*.parquet'))
+    if not parts:
+        return pd.DataFrame(columns=COLUMNS)
+    df = pd.concat((pd.read_parquet(p) for p in parts), ignore_index=True)
+    latest = df.groupby(['school_name', 'division'], dropna=False)['searched_at'].transform('max')
+    return df[df['searched_at'] == latest].sort_values(['school_name', 'division', 'rank'], kind='stable')
+
+
+def candidates_by_school(df: pd.DataFrame) -> Dict[Tuple[str, str], dict]:
+    """
+    Groups a candidate table back into {(school_name, division): {'query', 'items'}},
+    with items shaped like the Custom Search response ('link', 'title', 'snippet').
+    """
+    grouped = {}
+    for (school_name, division), group in df.groupby(['school_name', 'division'], sort=False, dropna=False):
+        hits = group[group['rank'] != NO_RESULTS_RANK]
+        grouped[(school_name, division)] = {
+            'query': group['query'].iloc[0],
+            'items': [
+                {'link': url, 'title': title, 'snippet': snippet}
+                for url, title, snippet in zip(hits['url'], hits['title'], hits['snippet'])
+            ],
+        }
+    return grouped
@@ -0,0 +1,184 @@
+"""
+Resume state for process_schools, keyed on (school_name, division).
+
+The store is an append-only journal: every outcome is a new row with the
+school's status, its attempt count so far, when it was recorded and when it
+may be tried again. Rows are never updated in place, so an interrupted run
+can only lose its last, uncommitted row, and the history of each school
+stays readable. A school's state is its latest row; deciding whether an
+input row needs work is one index lookup, so resuming does not read the
+result CSVs at all.
+
+Retry policy, decided when the outcome is recorded:
+- FOUND / FOUND_NOT_CONFIDENT: never retried.
+- ERROR (API or network failure, no real answer): retried after
+  `retry_errors_after` seconds, doubled on every further failure.
+- NOT_FOUND after a real search: retried after `retry_not_found_after`
+  seconds (0 = never).
+No school is tried more than `max_attempts` times.
+"""
+
+import csv
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+DONE_STATUSES = ('FOUND', 'FOUND_NOT_CONFIDENT')
+# NOT_FOUND reasons in old result files that mean "the search itself failed"
+ERROR_REASON_PREFIXES = ('Google API', 'API error')
+
+
+class CheckpointStore:
+    """Thread-safe, append-only SQLite journal of per-school outcomes and retry times."""
+
+    # Latest journal row of every school.
+    LATEST = "SELECT * FROM outcomes WHERE id IN (SELECT MAX(id) FROM outcomes GROUP BY school_name, division)"
+
+    def __init__(
+        self,
+        path: str,
+        retry_errors_after: float = 30 * 60,
+        retry_not_found_after: float = 30 * 86400,
+        max_attempts: int = 5,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.retry_errors_after = retry_errors_after
+        self.retry_not_found_after = retry_not_found_after
+        self.max_attempts = max(1, int(max_attempts))
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("""CREATE TABLE IF NOT EXISTS outcomes (
+                                      id INTEGER PRIMARY KEY AUTOINCREMENT,
+                                      school_name TEXT NOT NULL,
+                                      division TEXT NOT NULL,
+                                      status TEXT NOT NULL,
+                                      attempts INTEGER NOT NULL,
+                                      recorded_at REAL NOT NULL,
+                                      next_attempt REAL,
+                                      reason TEXT
+                                  )""")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS outcomes_school ON outcomes (school_name, division, id)")
+            # Stores written before the journal kept one mutable row per school: carry them over once.
+            if self._conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'checkpoints'").fetchone():
+                self._conn.execute(
+                    "INSERT INTO outcomes (school_name, division, status, attempts, recorded_at, next_attempt, reason) "
+                    "SELECT school_name, division, status, attempts, last_attempt, next_attempt, reason FROM checkpoints"
+                )
+                self._conn.execute("DROP TABLE checkpoints")
+
+    @classmethod
+    def from_config(cls, config: dict, default_path: str) -> "CheckpointStore":
+        resume = config.get('resume', {})
+        return cls(
+            resume.get('checkpoint_file') or default_path,
+            retry_errors_after=float(resume.get('retry_errors_after_minutes', 30)) * 60,
+            retry_not_found_after=float(resume.get('retry_not_found_after_days', 30)) * 86400,
+            max_attempts=int(resume.get('max_attempts', 5)),
+        )
+
+    @staticmethod
+    def _key(school_name: str, division: str):
+        return str(school_name).strip(), str(division or '').strip()
+
+    def _next_attempt(self, status: str, attempts: int, now: float) -> Optional[float]:
+        if status in DONE_STATUSES or attempts >= self.max_attempts:
+            return None
+        if status == 'ERROR':
+            return now + self.retry_errors_after * 2 ** (attempts - 1)
+        if self.retry_not_found_after <= 0:
+            return None
+        return now + self.retry_not_found_after
+
+    def _latest(self, key) -> Optional[tuple]:
+        """(attempts, next_attempt) of a school's latest row, or None."""
+        return self._conn.execute(
+            "SELECT attempts, next_attempt FROM outcomes WHERE school_name = ? AND division = ? ORDER BY id DESC LIMIT 1", key
+        ).fetchone()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM (SELECT 1 FROM outcomes GROUP BY school_name, division)").fetchone()[0]
+
+    def is_due(self, school_name: str, division: str, now: Optional[float] = None) -> bool:
+        """True if the school was never tried, or its retry time has come."""
+        with self._lock:
+            row = self._latest(self._key(school_name, division))
+        if row is None:
+            return True
+        return row[1] is not None and row[1] <= (now or time.time())
+
+    def due_count(self, now: Optional[float] = None) -> int:
+        """Recorded schools whose retry time has come."""
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT COUNT(*) FROM ({self.LATEST}) WHERE next_attempt IS NOT NULL AND next_attempt <= ?",
+                (now or time.time(),),
+            ).fetchone()[0]
+
+    def _append(self, key, status: str, attempts: int, reason: str, now: float):
+        self._conn.execute(
+            "INSERT INTO outcomes (school_name, division, status, attempts, recorded_at, next_attempt, reason) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (*key, status, attempts, now, self._next_attempt(status, attempts, now), reason),
+        )
+
+    def _record(self, school_name: str, division: str, status: str, reason: str, now: float):
+        key = self._key(school_name, division)
+        row = self._latest(key)
+        self._append(key, status, (row[0] if row else 0) + 1, reason, now)
+
+    def record(self, school_name: str, division: str, status: str, reason: str = '', now: Optional[float] = None):
+        """Appends an outcome; status is FOUND, FOUND_NOT_CONFIDENT, NOT_FOUND or ERROR."""
+        with self._lock, self._conn:
+            self._record(school_name, division, status, reason, now or time.time())
+
+    def update(self, school_name: str, division: str, status: str, reason: str = '', now: Optional[float] = None):
+        """Appends a changed outcome without counting an attempt (a domain reassigned after the search)."""
+        key = self._key(school_name, division)
+        with self._lock, self._conn:
+            row = self._latest(key)
+            if row is None:
+                return
+            self._append(key, status, row[0], reason, now or time.time())
+
+    def clear(self):
+        """Empties the journal (the result files it describes were deleted)."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM outcomes")
+
+    def counts(self) -> Counter:
+        """Latest status of every recorded school, counted."""
+        with self._lock:
+            return Counter(dict(self._conn.execute(f"SELECT status, COUNT(*) FROM ({self.LATEST}) GROUP BY status")))
+
+    def import_results(self, *paths: str) -> int:
+        """
+        Seeds an empty store from result CSVs written before checkpoints existed,
+        dated by each file's modification time. Returns the number of rows imported.
+        """
+        imported = 0
+        for path in paths:
+            if not os.path.exists(path):
+                continue
+            mtime = os.path.getmtime(path)
+            with open(path, 'r', encoding='utf-8', newline='') as f, self._lock, self._conn:
+                for row in csv.DictReader(f):
+                    if not row.get('school_name'):
+                        continue
+                    status = row.get('status') or 'NOT_FOUND'
+                    reason = row.get('reason', '') or ''
+                    if status == 'NOT_FOUND' and reason.startswith(ERROR_REASON_PREFIXES):
+                        status = 'ERROR'
+                    self._record(row['school_name'], row.get('division', ''), status, reason, mtime)
+                    imported += 1
+        return imported
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -11,46 +11,78 @@ Key changes:
 
 """
 
+import importlib
 import os
 import time
-from typing import Optional, Dict, Set
-from dotenv import load_dotenv
-import requests
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain, islice
+from typing import TYPE_CHECKING, FrozenSet, Optional, Dict, Set
 import logging
-import yaml
 import re
 
-# Load environment variables from the correct .env path
+from functools import lru_cache
 from pathlib import Path
-dotenv_path = Path(__file__).parent.parent / ".env"
-load_dotenv(dotenv_path)
-
-def load_config():
-    config_path = 'config.yaml'
-    if os.path.exists(config_path):
-        with open(config_path, 'r') as f:
-            return yaml.safe_load(f)
-    return {}
-CONFIG = load_config()
 
-LOG_LEVEL = os.getenv('LOG_LEVEL', CONFIG.get('logging', {}).get('level', 'INFO'))
-logging.basicConfig(
-    level=getattr(logging, LOG_LEVEL),
-    format=CONFIG.get('logging', {}).get('format', '%(message)s')
-)
+try:
+    from .checkpoint import CheckpointStore
+    from .matcher import TermMatcher, domain_matcher
+    from .metrics import METRICS, Progress
+    from .query_strategy import QueryPlan
+    from .quota import QuotaExhausted
+    from .schools import School, iter_schools
+    from .search_cache import OfflineCacheMiss
+    from .streaming import CsvAppender, approx_row_count, dedupe_results
+except ImportError:
+    from checkpoint import CheckpointStore
+    from matcher import TermMatcher, domain_matcher
+    from metrics import METRICS, Progress
+    from query_strategy import QueryPlan
+    from quota import QuotaExhausted
+    from schools import School, iter_schools
+    from search_cache import OfflineCacheMiss
+    from streaming import CsvAppender, approx_row_count, dedupe_results
+
+if TYPE_CHECKING:
+    from .liveness import LivenessChecker
+    from .search_client import SearchClient
+
+# Importing this module has no side effects: config, .env and logging are
+# only read by load_config()/load_credentials()/configure_logging(), usually
+# through DomainFinder.from_env(). Modules that pull in requests or pandas
+# are imported on first use (see _submodule).
+ENV_PATH = Path(__file__).parent.parent / ".env"
 logger = logging.getLogger(__name__)
 
-GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY')
-GOOGLE_CSE_ID = os.getenv('GOOGLE_CSE_ID')
-SEARCH_URL = "https://www.googleapis.com/customsearch/v1"
+def _submodule(name: str):
+    """Imports a sibling module on first use, in package or script layout."""
+    return importlib.import_module(f"{__package__}.{name}" if __package__ else name)
+
+def load_config(path: str = 'config.yaml') -> dict:
+    """Reads the YAML config (relative to the current directory by default); {} if missing."""
+    import yaml
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            return yaml.safe_load(f) or {}
+    return {}
+
+def load_credentials(env_path=ENV_PATH) -> tuple:
+    """(GOOGLE_API_KEY, GOOGLE_CSE_ID) from the environment, after loading the .env file."""
+    from dotenv import load_dotenv
+    load_dotenv(env_path)
+    return os.getenv('GOOGLE_API_KEY'), os.getenv('GOOGLE_CSE_ID')
 
-if not GOOGLE_API_KEY or not GOOGLE_CSE_ID:
-    raise ValueError("❌ GOOGLE_API_KEY or GOOGLE_CSE_ID not found in .env file")
+def configure_logging(config: dict):
+    level = os.getenv('LOG_LEVEL', config.get('logging', {}).get('level', 'INFO'))
+    logging.basicConfig(
+        level=getattr(logging, level),
+        format=config.get('logging', {}).get('format', '%(message)s')
+    )
 
-MIN_DELAY = CONFIG.get('search', {}).get('rate_limit_seconds', 1.5)
 
-# Blacklist 
-BLACKLISTED_DOMAINS = set(CONFIG.get('validation', {}).get('excluded_domains', [
+# Blacklist (replaced by validation.excluded_domains, see ScoringRules.from_config)
+DEFAULT_BLACKLISTED_DOMAINS = [
     "wikipedia.org", "facebook.com", "twitter.com", "instagram.com", "youtube.com",
     "linkedin.com", "ncaa.com", "maxpreps.com", "athletic.net", "hudl.com", "fieldlevel.com",
     "x.com", "blogspot.com", "prestosports.com", "sideline.bsnsports.com", "streamlineathletes.com",
@@ -60,14 +92,87 @@ BLACKLISTED_DOMAINS = set(CONFIG.get('validation', {}).get('excluded_domains', [
     "csuvikings.com", "gobearcats.com", "goutsa.com", "gonavigators.com", "ciurams.com",
     "lehighsports.com", "region10sports.com", "harperhawks.net", "hvccathletics.com",
     "columbiacougars.com", "shopthunderbirdgear.merchorders.com", "postandcourier.com"
-]))
+]
+# Scoring word lists, shared by score_candidates and the batch scorer
+MEDIA_SNIPPET_WORDS = ['defeated', 'hosted', 'vs.', 'history of', 'recruiting', 'campus visit', 'results from', 'roster', 'schedule']
+ATHLETICS_MARKERS = ['athletics', 'sports', 'athleticdepartment']
+STRONG_KEYWORDS = ['athletics', 'sports', 'athleticdepartment', 'wranglersports', 'tbirds', 'raiders', 'panthers', 'eagles', 'vikings', 'chargers', 'hawks', 'bears', 'mustangs', 'saints', 'titans', 'pirates', 'lakers', 'bulldogs', 'wildcats', 'cougars', 'rangers', 'indians', 'pioneers', 'apaches', 'tigers', 'rebels', 'warriors', 'knights', 'lions', 'wolves', 'falcons', 'dragons', 'spartans', 'jets', 'bluejays', 'bison', 'bucs']
+ENCYCLOPEDIA_DOMAINS = ['encyclopediaofalabama.org', 'wikipedia.org', 'britannica.com']
+STORE_DOMAINS = ['campuswardrobe.com', 'shop', 'store', 'merch', 'catalog']
+
+STORES = TermMatcher(STORE_DOMAINS)
+MEDIA_WORDS = TermMatcher(MEDIA_SNIPPET_WORDS)
+ATHLETICS_WORDS = TermMatcher(ATHLETICS_MARKERS)
+
+class ScoringRules:
+    """
+    The blacklist and encyclopedia matchers of one config, compiled once.
+
+    "substring" matching keeps the historical `entry in domain` test,
+    "registrable" only matches the listed domains and their subdomains
+    (validation.blacklist_match). Each DomainFinder keeps its own rules and
+    passes them to every scoring and selection call, so finders built from
+    different configs never share them.
+    """
+
+    def __init__(self, blacklisted_domains=DEFAULT_BLACKLISTED_DOMAINS, match: str = 'substring'):
+        self.blacklisted_domains = frozenset(blacklisted_domains)
+        self.match = match
+        self.blacklist = domain_matcher(self.blacklisted_domains, match)
+        self.encyclopedias = domain_matcher(ENCYCLOPEDIA_DOMAINS, match)
+
+    @classmethod
+    def from_config(cls, config: dict) -> "ScoringRules":
+        validation = config.get('validation', {})
+        return cls(validation.get('excluded_domains', DEFAULT_BLACKLISTED_DOMAINS), validation.get('blacklist_match', 'substring'))
+
+    def is_blacklisted(self, domain: str) -> bool:
+        return self.blacklist.search(domain.lower())
+
+DEFAULT_RULES = ScoringRules()
+
+@lru_cache(maxsize=None)
+def strong_keyword_matcher(sport_keywords: tuple = (), mascot: str = '') -> TermMatcher:
+    """STRONG_KEYWORDS plus a profile's sport keywords and mascot+sports/athletics."""
+    terms = STRONG_KEYWORDS + [k.lower() for k in sport_keywords]
+    if mascot:
+        terms += [mascot.lower() + 'sports', mascot.lower() + 'athletics']
+    return TermMatcher(terms)
 
-def is_blacklisted(domain: str) -> bool:
-    domain = domain.lower()
-    for blk in BLACKLISTED_DOMAINS:
-        if blk in domain:
+class SharedDomainSet(set):
+    """
+    Set of domains already assigned to a school, safe to share between search threads.
+
+    claim() checks and adds atomically, so two schools searched at the same
+    time can never both take the same domain.
+    """
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self._lock = threading.Lock()
+
+    def claim(self, domain: str) -> bool:
+        with self._lock:
+            if domain in self:
+                return False
+            self.add(domain)
             return True
-    return False
+
+def claim_domain(used_domains: Set[str], domain: str) -> bool:
+    """Marks a domain as used; False if another school already has it."""
+    claim = getattr(used_domains, 'claim', None)
+    if claim:
+        return claim(domain)
+    if domain in used_domains:
+        return False
+    used_domains.add(domain)
+    return True
+
+def is_blacklisted(domain: str, rules: Optional[ScoringRules] = None) -> bool:
+    return (rules or DEFAULT_RULES).is_blacklisted(domain)
+
+def has_athletics_marker(*texts: str) -> bool:
+    return any(ATHLETICS_WORDS.search(t) for t in texts)
 
 def extract_domain_from_url(url: str) -> str:
     from urllib.parse import urlparse
@@ -77,78 +182,34 @@ def extract_domain_from_url(url: str) -> str:
         domain = domain[4:]
     return domain
 
-def is_athletics_domain(domain: str) -> bool:
+def is_athletics_domain(domain: str, rules: Optional[ScoringRules] = None) -> bool:
     lowered = domain.lower()
-    return (lowered.endswith('.com') or lowered.endswith('.net') or lowered.endswith('.org')) and (not is_blacklisted(domain))
+    return (lowered.endswith('.com') or lowered.endswith('.net') or lowered.endswith('.org')) and (not is_blacklisted(domain, rules))
 
 def normalize(s: str) -> str:
     return re.sub(r'[^a-z0-9]', '', s.lower())
 
 def avoid_media_snippet(snippet: str, title: str) -> bool:
-    blacklist_snips = ['defeated', 'hosted', 'vs.', 'history of', 'recruiting', 'campus visit', 'results from', 'roster', 'schedule']
-    return any(w in snippet.lower() or w in title.lower() for w in blacklist_snips)
-
-def build_query(row):
-    # Robust: no NaNs ni floats, todo string
-    def safe_str(val):
-        if isinstance(val, float):
-            return "" if (val != val) else str(val)
-        return str(val) if val is not None else ""
-    parts = [safe_str(row['school_name'])]
-    mascot = ""
-    for word in safe_str(row['school_name']).split():
-        if word.lower() not in ['college', 'community', 'state', 'university', 'technical', 'junior', 'school']:
-            mascot = word
-    city_state = safe_str(row.get('city_state', ''))
-    if city_state: parts.append(city_state)
-    conference = safe_str(row.get('conference', ''))
-    if conference: parts.append(conference)
-    parts += ["athletics", "official site"]
-    if mascot: parts.append(mascot)
-    return " ".join([p for p in parts if p])
-
-def get_school_tokens(school_name, city_state):
-    tokens = [w.lower() for w in re.split('[^a-zA-Z0-9]', str(school_name)) if len(w) > 2]
-    if city_state:
-        city_tokens = [w.lower() for w in re.split('[^a-zA-Z0-9]', str(city_state)) if len(w) > 2]
-        tokens += city_tokens
-    return tokens
-
-def is_school_tag_match(school_tokens, domain, title, snippet):
-    domain = domain.lower()
-    title = title.lower()
-    snippet = snippet.lower()
-    match_count = sum(1 for t in school_tokens if t in domain or t in title or t in snippet)
-    return match_count >= 1
-
-def find_athletics_domain_for_school(row, used_domains: Set[str], config: dict, domain_map: dict, sport_profile: dict) -> dict:
-    """
-    Returns a dict with: domain, status, score, reason, and all candidates tried.
-    """
-    def safe_str(val):
-        if val is None:
-            return ''
-        if isinstance(val, float):
-            if val != val:  # NaN
-                return ''
-            return str(val)
-        return str(val)
-
-    school_name = safe_str(row.get('school_name', '')).strip()
-    division = safe_str(row.get('division', '')).strip()
-    city_state = safe_str(row.get('city_state', '')).strip()
-    mascot = ''
-    # Try to extract mascot/team from config if possible
-    mascot_candidates = []
-    for kw in sport_profile.get('sport_keywords', []):
-        if len(kw) > 2:
-            mascot_candidates.append(kw.lower())
-    mascot = mascot_candidates[0] if mascot_candidates else ''
-    conference = safe_str(row.get('conference', '')).strip()
+    return MEDIA_WORDS.search(snippet.lower()) or MEDIA_WORDS.search(title.lower())
+
+def profile_mascot(sport_profile: dict) -> str:
+    """The profile's "mascot": its first sport keyword longer than two letters, lowercase."""
+    mascot_candidates = [kw.lower() for kw in sport_profile.get('sport_keywords', []) if len(kw) > 2]
+    return mascot_candidates[0] if mascot_candidates else ''
+
+def school_fields(row, sport_profile: dict) -> School:
+    """The School record (clean fields, tokens, query) for an input row; Schools are returned as is."""
+    if isinstance(row, School):
+        return row
+    return School.from_row(row, profile_mascot(sport_profile))
+
+def known_domain_result(fields: School, config: dict, domain_map: dict) -> Optional[dict]:
+    """Result for a school settled by manual_overrides or domain_map, or None if it needs a search."""
+    school_name = fields.school_name
 
     # 0. Manual override check (school_name|division)
     manual_overrides = config.get('manual_overrides', {})
-    override_key = f"{school_name}|{division}"
+    override_key = fields.override_key
     if override_key in manual_overrides:
         domain = manual_overrides[override_key]
         return {
@@ -163,7 +224,7 @@ def find_athletics_domain_for_school(row, used_domains: Set[str], config: dict,
     if school_name in domain_map:
         domain = domain_map[school_name]
         # Validate .edu root
-        if domain.endswith('.edu') and not any(x in domain for x in ['athletics', 'sports', 'athleticdepartment']):
+        if domain.endswith('.edu') and not has_athletics_marker(domain):
             return {
                 'domain': '',
                 'status': 'NOT_FOUND',
@@ -178,84 +239,40 @@ def find_athletics_domain_for_school(row, used_domains: Set[str], config: dict,
             'reason': 'Found in whitelist/domain_map',
             'candidates': [{'domain': domain, 'score': 999, 'reason': 'Whitelist/domain_map'}]
         }
+    return None
 
-    # 2. Build query
-    def safe_str(val):
-        if isinstance(val, float):
-            return "" if (val != val) else str(val)
-        return str(val) if val is not None else ""
-    query_parts = [safe_str(school_name)]
-    if city_state:
-        query_parts.append(city_state)
-    if conference:
-        query_parts.append(conference)
-    if mascot:
-        query_parts.append(mascot)
-    query_parts += ["athletics", "official site"]
-    query = " ".join([p for p in query_parts if p])
-
-    params = {
-        'key': GOOGLE_API_KEY,
-        'cx': GOOGLE_CSE_ID,
-        'q': query,
-        'num': 10
-    }
+def build_search_query(fields: School) -> str:
+    """Name, city/state, conference and mascot, then "athletics official site" (precomputed)."""
+    return fields.query
 
-    try:
-        response = requests.get(
-            SEARCH_URL,
-            params=params,
-            timeout=config.get('search', {}).get('request_timeout', 10)
-        )
-        if response.status_code == 429:
-            logger.warning("⚠️  Rate limit hit - waiting 60s...")
-            time.sleep(60)
-            return {'domain': '', 'status': 'NOT_FOUND', 'score': 0, 'reason': 'Google API rate limit', 'candidates': []}
-        if response.status_code != 200:
-            logger.error(f"❌ Search error: {response.status_code}")
-            return {'domain': '', 'status': 'NOT_FOUND', 'score': 0, 'reason': f'Google API error {response.status_code}', 'candidates': []}
-        items = response.json().get('items', [])
-    except Exception as e:
-        logger.error(f"❌ API error: {e}")
-        return {'domain': '', 'status': 'NOT_FOUND', 'score': 0, 'reason': f'API error: {e}', 'candidates': []}
+def school_token_set(fields: School) -> FrozenSet[str]:
+    """Lowercase name/city/mascot/conference tokens looked for in each candidate (precomputed)."""
+    return fields.tokens
 
-    # 3. Scoring
-    school_tokens = set([w.lower() for w in re.split('[^a-zA-Z0-9]', school_name) if len(w) > 2])
-    if city_state:
-        school_tokens.update([w.lower() for w in re.split('[^a-zA-Z0-9]', city_state) if len(w) > 2])
-    if mascot:
-        school_tokens.add(mascot.lower())
-    if conference:
-        school_tokens.add(conference.lower())
+def score_candidates(items, fields: School, used_domains: Set[str], domain_map: dict, sport_profile: dict, rules: Optional[ScoringRules] = None) -> list:
+    """Scores raw Custom Search items for one school, best first. Pure: no network I/O."""
+    rules = rules or DEFAULT_RULES
+    mascot = fields.mascot
+    school_tokens = fields.tokens
 
     candidates = []
-    sport_keywords = [k.lower() for k in sport_profile.get('sport_keywords', [])]
-    mascot_lower = mascot.lower() if mascot else ''
-    strong_keywords = ['athletics', 'sports', 'athleticdepartment', 'wranglersports', 'tbirds', 'raiders', 'panthers', 'eagles', 'vikings', 'chargers', 'hawks', 'bears', 'mustangs', 'saints', 'titans', 'pirates', 'lakers', 'bulldogs', 'wildcats', 'cougars', 'rangers', 'indians', 'pioneers', 'apaches', 'tigers', 'rebels', 'warriors', 'knights', 'lions', 'wolves', 'falcons', 'dragons', 'spartans', 'jets', 'bluejays', 'bison', 'bucs']
-    encyclopedia_domains = ['encyclopediaofalabama.org', 'wikipedia.org', 'britannica.com']
-    store_domains = ['campuswardrobe.com', 'shop', 'store', 'merch', 'catalog']
+    whitelisted_domains = set(domain_map.values())
+    strong_keywords = strong_keyword_matcher(tuple(sport_profile.get('sport_keywords', [])), mascot)
     def is_strong_athletics_domain(domain, url):
-        domain_and_path = (domain + url).lower()
-        if any(kw in domain_and_path for kw in strong_keywords + sport_keywords):
-            return True
-        if mascot_lower and (mascot_lower + 'sports' in domain_and_path or mascot_lower + 'athletics' in domain_and_path):
-            return True
-        return False
+        return strong_keywords.search((domain + url).lower())
     def is_bad_domain(domain):
         d = domain.lower()
-        if any(bad in d for bad in encyclopedia_domains):
-            return True
-        if any(bad in d for bad in store_domains):
-            return True
-        return False
+        return rules.encyclopedias.search(d) or STORES.search(d)
     for item in items:
         url = item.get('link', '')
         domain = extract_domain_from_url(url)
         title = item.get('title', '') or ''
         snippet = item.get('snippet', '') or ''
+        athletic = has_athletics_marker(domain, url)
+        strong = is_strong_athletics_domain(domain, url)
         score = 0
         reason = []
-        if is_blacklisted(domain):
+        if rules.is_blacklisted(domain):
             score -= 1000
             reason.append('Blacklisted domain')
         if avoid_media_snippet(snippet, title):
@@ -264,7 +281,7 @@ def find_athletics_domain_for_school(row, used_domains: Set[str], config: dict,
         if domain in used_domains:
             score -= 100
             reason.append('Already used domain')
-        if domain.endswith('.com') and any(x in domain or x in url for x in ['athletics', 'sports', 'athleticdepartment']):
+        if domain.endswith('.com') and athletic:
             score += 200
             reason.append('.com with athletics/sports')
         elif domain.endswith('.com'):
@@ -274,7 +291,7 @@ def find_athletics_domain_for_school(row, used_domains: Set[str], config: dict,
             score += 50
             reason.append('.org/.net')
         if domain.endswith('.edu'):
-            if any(x in domain or x in url for x in ['athletics', 'sports', 'athleticdepartment']):
+            if athletic:
                 score += 100
                 reason.append('.edu with athletics/sports')
             else:
@@ -286,7 +303,7 @@ def find_athletics_domain_for_school(row, used_domains: Set[str], config: dict,
             score += token_matches * 30
             reason.append(f'{token_matches} school/city/mascot tokens matched')
         # Extra: if domain is in domain_map for another school, small bonus
-        if domain in domain_map.values():
+        if domain in whitelisted_domains:
             score += 20
             reason.append('Domain in whitelist for another school')
 
@@ -295,44 +312,57 @@ def find_athletics_domain_for_school(row, used_domains: Set[str], config: dict,
             reason.append('Rejected: encyclopedia/store domain')
             score = -9999
         # Endurecimiento: score bajo y sin palabra clave fuerte
-        if score < 220 and not is_strong_athletics_domain(domain, url):
+        if score < 220 and not strong:
             reason.append('Rejected: score too low and no strong keyword')
             score = -9999  # Forzar al fondo del ranking
         # Si el score es bajo pero hay palabra clave fuerte, dejar advertencia
-        if score < 220 and is_strong_athletics_domain(domain, url):
+        if score < 220 and strong:
             reason.append('Accepted with low score due to strong keyword')
         # .edu raíz sin path de deportes
-        if domain.endswith('.edu') and not any(x in domain or x in url for x in ['athletics', 'sports', 'athleticdepartment']):
+        if domain.endswith('.edu') and not athletic:
             reason.append('Rejected: .edu root without athletics path')
             score = -9999
         candidates.append({'domain': domain, 'score': score, 'reason': '; '.join(reason), 'url': url, 'title': title, 'snippet': snippet})
-
-    # 4. Select best candidate
-    candidates = sorted(candidates, key=lambda x: x['score'], reverse=True)
-    for cand in candidates:
-        if cand['score'] >= 150 and not is_blacklisted(cand['domain']) and cand['domain'] not in used_domains:
-            # Validate domain is up (timeout bajo y robusto)
-            try:
-                r = requests.head("http://" + cand['domain'], timeout=2)
-                if r.status_code >= 400:
-                    continue
-            except requests.RequestException:
-                continue
-            except Exception:
-                continue
-            used_domains.add(cand['domain'])
-            return {
-                'domain': cand['domain'],
-                'status': 'FOUND',
-                'score': cand['score'],
-                'reason': cand['reason'],
-                'candidates': candidates
-            }
+    return sorted(candidates, key=lambda x: x['score'], reverse=True)
+
+_default_liveness = None
+_default_liveness_lock = threading.Lock()
+
+def default_liveness(config: dict) -> "LivenessChecker":
+    """In-memory checker for callers that do not pass their own (no disk cache)."""
+    global _default_liveness
+    with _default_liveness_lock:
+        if _default_liveness is None:
+            _default_liveness = _submodule('liveness').LivenessChecker.from_config(config, use_cache=False)
+        return _default_liveness
+
+def select_candidate(candidates: list, used_domains: Set[str], config: dict, liveness: Optional["LivenessChecker"] = None, rules: Optional[ScoringRules] = None) -> dict:
+    """Picks the best scored candidate that is unused (and reachable, if configured)."""
+    check_accessibility = config.get('validation', {}).get('check_domain_accessibility', True)
+    eligible = [c for c in candidates if c['score'] >= 150 and not is_blacklisted(c['domain'], rules) and c['domain'] not in used_domains]
+    if check_accessibility and eligible:
+        liveness = liveness or default_liveness(config)
+        # Probe the top-K eligible domains at once; the rest only if all of those fail.
+        liveness.prefetch(c['domain'] for c in eligible)
+    for cand in eligible:
+        if cand['domain'] in used_domains:
+            continue
+        # Validate domain is up
+        if check_accessibility and not liveness.is_up(cand['domain']):
+            continue
+        if not claim_domain(used_domains, cand['domain']):
+            continue
+        return {
+            'domain': cand['domain'],
+            'status': 'FOUND',
+            'score': cand['score'],
+            'reason': cand['reason'],
+            'candidates': candidates
+        }
 
     # 5. Fallback: .edu with athletics path
     for cand in candidates:
-        if cand['domain'].endswith('.edu') and any(x in cand['domain'] or x in cand['url'] for x in ['athletics', 'sports', 'athleticdepartment']) and cand['domain'] not in used_domains:
-            used_domains.add(cand['domain'])
+        if cand['domain'].endswith('.edu') and has_athletics_marker(cand['domain'], cand['url']) and claim_domain(used_domains, cand['domain']):
             return {
                 'domain': cand['domain'],
                 'status': 'FOUND_NOT_CONFIDENT',
@@ -350,153 +380,463 @@ def find_athletics_domain_for_school(row, used_domains: Set[str], config: dict,
         'candidates': candidates
     }
 
-def process_schools(input_csv, output_csv, limit=None):
-    import pandas as pd
+def run_search(query: str, config: dict, client: "SearchClient"):
+    """
+    Sends one query through the client (which holds the credentials). Returns
+    (items, cost, error): cost is 1 when the API answered and 0 for a cached
+    answer or no answer; error is a NOT_FOUND result dict when the search
+    failed, else None.
+    """
+    try:
+        # Whole search as the caller waits for it: cache, rate limiting and retries included.
+        with METRICS.timer('search', key=query):
+            response = client.search(query, num=10)
+        cost = 0 if getattr(response, 'from_cache', False) else 1
+        if response.status_code == 429:
+            logger.warning("⚠️  Rate limit hit - school re-queued")
+            return [], cost, {'domain': '', 'status': 'NOT_FOUND', 'score': 0, 'reason': 'Google API rate limit', 'candidates': [], 'error': True, 'rate_limited': True}
+        if response.status_code != 200:
+            logger.error(f"❌ Search error: {response.status_code}")
+            return [], cost, {'domain': '', 'status': 'NOT_FOUND', 'score': 0, 'reason': f'Google API error {response.status_code}', 'candidates': [], 'error': True}
+        return response.json().get('items', []), cost, None
+    except QuotaExhausted as e:
+        return [], 0, {'domain': '', 'status': 'NOT_FOUND', 'score': 0, 'reason': f'Google API quota: {e}', 'candidates': [], 'error': True, 'quota_exhausted': True}
+    except OfflineCacheMiss as e:
+        return [], 0, {'domain': '', 'status': 'NOT_FOUND', 'score': 0, 'reason': f'API error: {e}', 'candidates': [], 'error': True, 'offline_miss': True}
+    except Exception as e:
+        logger.error(f"❌ API error: {e}")
+        return [], 0, {'domain': '', 'status': 'NOT_FOUND', 'score': 0, 'reason': f'API error: {e}', 'candidates': [], 'error': True}
 
-    print("\n" + "="*70)
-    print("🏐 MEGA-FINDER DOMAIN FINDER v17.1 - SMART, BRANDED, NO REPETIDOS")
-    print("="*70)
-    print(f"\n📂 Loading: {input_csv}")
-    df = pd.read_csv(input_csv)
-    print(f"   Total schools: {len(df)}")
-
-    processed_schools = set()
-    resume_config = CONFIG.get('resume', {})
-    if resume_config.get('auto_detect', True) and os.path.exists(output_csv):
-        try:
-            existing_df = pd.read_csv(output_csv)
-            if resume_config.get('skip_processed', True):
-                processed_schools = set(existing_df['school_name'].values)
+def find_athletics_domain_for_school(row, used_domains: Set[str], config: dict, domain_map: dict, sport_profile: dict, client: Optional["SearchClient"] = None, liveness: Optional["LivenessChecker"] = None, plan: Optional[QueryPlan] = None, rules: Optional[ScoringRules] = None) -> dict:
+    """
+    Returns a dict with: domain, status, score, reason, and all candidates tried.
+    Schools that were searched also carry the queries sent (joined with ' | '),
+    the merged raw result items, 'queries' (how many were answered) and
+    'searches', the number of API calls made (cached answers are free).
+    A failed search (API or network error) that leaves the school NOT_FOUND is
+    flagged with 'error', plus 'rate_limited' when the API still answered 429
+    after the client's retries and 'quota_exhausted' when no search was sent
+    because the daily quota is spent.
+
+    Query variants come from `plan` (default: QueryPlan.from_config(config));
+    variants stop as soon as a confident candidate turns up. Searches go
+    through `client` (rate-limited, shared by all threads, holding the
+    credentials); only schools settled by overrides or domain_map can do
+    without one. Domain accessibility checks go through `liveness` when
+    given, and blacklist matching follows `rules` (default: the built-in
+    blacklist; DomainFinder passes the rules of its config).
+    """
+    fields = school_fields(row, sport_profile)
+    known = known_domain_result(fields, config, domain_map)
+    if known is not None:
+        return known
+    if client is None:
+        raise ValueError("A SearchClient is needed to search (see DomainFinder, which builds one from its credentials)")
+
+    # 2. Plan queries
+    own_plan = plan is None
+    if own_plan:
+        plan = QueryPlan.from_config(config)
+    queries = plan.queries(fields)
+
+    # 3-4. Search in rounds, merging results, until a candidate is confident
+    sent, items, seen_links = [], [], set()
+    candidates = []
+    searches = 0
+    error = None
+    try:
+        for round_queries in plan.rounds(queries):
+            for query, (new_items, cost, failed) in zip(round_queries, plan.map(lambda q: run_search(q, config, client), round_queries)):
+                searches += cost
+                if failed is not None and failed.get('offline_miss') and sent:
+                    continue  # offline runs re-score what is cached; later variants may never have been searched
+                if failed is not None:
+                    error = error or failed
+                    continue
+                sent.append(query)
+                for item in new_items:
+                    link = item.get('link', '')
+                    if link not in seen_links:
+                        seen_links.add(link)
+                        items.append(item)
+            if error is not None:
+                break
+            candidates = score_candidates(items, fields, used_domains, domain_map, sport_profile, rules)
+            if plan.confident(candidates, used_domains):
+                break
+    finally:
+        if own_plan:
+            plan.close()
+    if not sent and error is not None:
+        return dict(error, searches=searches)
+
+    # 5-6. Select
+    if error is not None:
+        candidates = score_candidates(items, fields, used_domains, domain_map, sport_profile, rules)
+    result = select_candidate(candidates, used_domains, config, liveness=liveness, rules=rules)
+    if error is not None and result['status'] == 'NOT_FOUND':
+        # Not every planned query got an answer: retry the school rather than give up on it.
+        return dict(error, searches=searches)
+    result.update(query=' | '.join(sent), items=items, queries=len(sent), searches=searches)
+    return result
+
+def ordered_map(fn, items, executor: Optional[ThreadPoolExecutor] = None, window: int = 1):
+    """map() over an iterator with at most `window` calls in flight; results stay in input order."""
+    if executor is None:
+        yield from map(fn, items)
+        return
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+class DomainFinder:
+    """
+    Athletics domain finder with injected config and credentials.
+
+    Construction only stores its arguments. The search client, domain
+    liveness checker and query plan are built on first use, and credentials
+    are only required once a search has to be sent, so scoring-only and
+    offline callers need neither a .env file nor network access:
+
+        finder = DomainFinder.from_env()                # config.yaml + .env, like the CLI
+        finder = DomainFinder(config, api_key, cse_id)  # everything injected
+        finder.find(row)
+        finder.process_schools(input_csv, output_csv, limit=5)
+
+    With `assignment.mode: global` (the default), find() picks each school's
+    best domain on its own, and process_schools settles domains wanted by
+    several schools in one assignment stage at the end of the run (see
+    assignment.py). With `greedy`, or without the candidate store, the first
+    school to be selected claims a domain and later schools cannot take it.
+    """
+
+    def __init__(self, config: Optional[dict] = None, api_key: Optional[str] = None, cse_id: Optional[str] = None, offline: bool = False, workers: Optional[int] = None):
+        config = config if config is not None else {}
+        if offline:
+            # Offline runs only re-score cached searches: no API calls and no live domain checks.
+            config = dict(config, validation=dict(config.get('validation', {}), check_domain_accessibility=False))
+        self.config = config
+        self.api_key = api_key
+        self.cse_id = cse_id
+        self.offline = offline
+        self.workers = max(1, int(workers or config.get('search', {}).get('concurrency', 1)))
+        self.domain_map = config.get('domain_map', {})
+        # For now, use a default sport_profile (should be passed in future modularization)
+        self.sport_profile = list(config.get('sport_profiles', {}).values())[0] if config.get('sport_profiles') else {}
+        self.used_domains = SharedDomainSet()
+        # Global assignment re-solves domains from the candidate store, so it needs the store.
+        self.global_assignment = (config.get('assignment', {}).get('mode', 'global') == 'global'
+                                  and config.get('output', {}).get('save_candidates', True))
+        self.rules = ScoringRules.from_config(config)
+        self._client = None
+        self._liveness = None
+        self._plan = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, config_path: str = 'config.yaml', env_path=ENV_PATH, **kwargs) -> "DomainFinder":
+        """Finder configured like the command line: config file, .env credentials and logging."""
+        config = load_config(config_path)
+        configure_logging(config)
+        api_key, cse_id = load_credentials(env_path)
+        return cls(config, api_key, cse_id, **kwargs)
+
+    @property
+    def client(self) -> "SearchClient":
+        with self._lock:
+            if self._client is None:
+                if not self.offline and not (self.api_key and self.cse_id):
+                    raise ValueError("❌ GOOGLE_API_KEY or GOOGLE_CSE_ID not found in .env file")
+                self._client = _submodule('search_client').SearchClient.from_config(
+                    self.config, self.api_key, self.cse_id, max_in_flight=self.workers, offline=self.offline
+                )
+            return self._client
+
+    @property
+    def liveness(self) -> Optional["LivenessChecker"]:
+        """Shared domain checker, or None when accessibility checks are disabled."""
+        if not self.config.get('validation', {}).get('check_domain_accessibility', True):
+            return None
+        with self._lock:
+            if self._liveness is None:
+                self._liveness = _submodule('liveness').LivenessChecker.from_config(self.config)
+            return self._liveness
+
+    @property
+    def plan(self) -> QueryPlan:
+        with self._lock:
+            if self._plan is None:
+                self._plan = QueryPlan.from_config(self.config)
+            return self._plan
+
+    def find(self, row) -> dict:
+        """find_athletics_domain_for_school() for one input row (dict or pandas row)."""
+        # Overrides and domain_map entries never search, so they need no client or credentials.
+        school = school_fields(row, self.sport_profile)
+        known = known_domain_result(school, self.config, self.domain_map)
+        if known is not None:
+            return known
+        # Global assignment: no school blocks another here; conflicts are settled after the run.
+        used_domains = set() if self.global_assignment else self.used_domains
+        client, liveness, plan = self.client, self.liveness, self.plan
+        with METRICS.timer('school', key=school.school_name):
+            return find_athletics_domain_for_school(
+                school, used_domains, self.config, self.domain_map, self.sport_profile,
+                client=client, liveness=liveness, plan=plan, rules=self.rules,
+            )
+
+    def find_athletics_domain(self, school_name: str, **fields) -> tuple:
+        """(domain, status) for a school by name; other input columns may be given as keywords."""
+        result = self.find(dict(fields, school_name=school_name))
+        return result['domain'], result['status']
+
+    def close(self):
+        """Releases the client, checker and plan; they are rebuilt if the finder is used again."""
+        with self._lock:
+            client, liveness, plan = self._client, self._liveness, self._plan
+            self._client = self._liveness = self._plan = None
+        if plan is not None:
+            plan.close()
+        if client is not None:
+            client.close()
+        if liveness is not None:
+            liveness.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def process_schools(self, input_csv, output_csv, limit=None):
+        config = self.config
+        print("\n" + "="*70)
+        print("🏐 MEGA-FINDER DOMAIN FINDER v17.1 - SMART, BRANDED, NO REPETIDOS")
+        print("="*70)
+        print(f"\n📂 Loading: {input_csv}")
+        total_rows = approx_row_count(input_csv)
+        print(f"   Total schools: {total_rows}")
+
+        error_csv = output_csv.replace('.csv', '_errors.csv')
+        resume_config = config.get('resume', {})
+        checkpoints = CheckpointStore.from_config(config, output_csv.replace('.csv', '_checkpoints.sqlite'))
+        has_results = os.path.exists(output_csv) or os.path.exists(error_csv)
+        if len(checkpoints) and not has_results:
+            # Result files were deleted to start over: forget their checkpoints too.
+            checkpoints.clear()
+        elif len(checkpoints) == 0 and has_results:
+            # First run with checkpoints: seed them from the existing result files.
+            imported = checkpoints.import_results(error_csv, output_csv)
+            print(f"\n📥 Imported {imported} previous results into {checkpoints.path}")
+        skip_processed = resume_config.get('auto_detect', True) and resume_config.get('skip_processed', True)
+        total = total_rows
+        if skip_processed and len(checkpoints):
+            total = max(0, total_rows - len(checkpoints)) + checkpoints.due_count()
             if resume_config.get('show_stats', True):
-                print(f"\n♻️  RESUMING: {len(processed_schools)} schools already processed")
-        except:
-            print("\n🆕 Starting fresh (no previous file found)")
-    else:
-        print("\n🆕 Starting fresh")
-
-    df_to_process = df[~df['school_name'].isin(processed_schools)]
-    if limit is not None:
-        try:
-            limit = int(limit)
-            df_to_process = df_to_process.head(limit)
-        except Exception:
-            print(f"[WARN] Invalid limit value: {limit}")
-    print(f"   Remaining: {len(df_to_process)} schools to process\n")
-    if len(df_to_process) == 0:
-        print("✅ All schools already processed!")
-        return pd.read_csv(output_csv)
-
-    used_domains = set()
-    valid_results = []
-    error_results = []
-    start_time = time.time()
-    progress_interval = CONFIG.get('performance', {}).get('progress_interval', 25)
-    auto_save_interval = CONFIG.get('output', {}).get('auto_save_interval', 10)
-
-    # Load config/domain_map for passing to finder
-    domain_map = CONFIG.get('domain_map', {})
-    # For now, use a default sport_profile (should be passed in future modularization)
-    default_profile = list(CONFIG.get('sport_profiles', {}).values())[0] if CONFIG.get('sport_profiles') else {}
-
-    for idx, row in df_to_process.iterrows():
-        school_name = row['school_name']
-        division = row['division']
-        city_state = row.get('city_state', '')
-        typ = row.get('type', '')
-        conference = row.get('conference', '')
-
-        progress_num = idx + 1
-        total = len(df_to_process)
-        logger.info(f"[{progress_num}/{total}] 🔍 {school_name[:50]}")
-
-        time.sleep(MIN_DELAY)
-        result = find_athletics_domain_for_school(row, used_domains, CONFIG, domain_map, default_profile)
-        domain = result['domain']
-        status = result['status']
-        score = result.get('score', 0)
-        reason = result.get('reason', '')
-
-        if status == "FOUND":
-            logger.info(f"           ✅ {domain} | Score: {score} | Reason: {reason}")
-            valid_results.append({
-                'school_name': school_name,
-                'division': division,
-                'city_state': city_state,
-                'type': typ,
-                'conference': conference,
-                'athletics_domain': domain,
-                'status': status,
-                'score': score,
-                'reason': reason
-            })
-        elif status == "FOUND_NOT_CONFIDENT":
-            logger.info(f"           ⚠️  .edu, not confident: {domain} | Score: {score} | Reason: {reason}")
-            valid_results.append({
-                'school_name': school_name,
-                'division': division,
-                'city_state': city_state,
-                'type': typ,
-                'conference': conference,
-                'athletics_domain': domain,
-                'status': status,
-                'score': score,
-                'reason': reason
-            })
+                print(f"\n♻️  RESUMING: {len(checkpoints)} schools already processed, {checkpoints.due_count()} due for a retry")
         else:
-            logger.info(f"           ❌ Not found | Reason: {reason}")
-            error_results.append({
-                'school_name': school_name,
-                'division': division,
-                'city_state': city_state,
-                'type': typ,
-                'conference': conference,
-                'athletics_domain': '',
-                'status': status,
-                'score': score,
-                'reason': reason
-            })
-
-        # Mostrar progreso en cada iteración
-        print(f"Progress: {progress_num}/{total}", end='\r')
-
-        if (progress_num) % auto_save_interval == 0:
-            if valid_results:
-                pd.DataFrame(valid_results).to_csv(output_csv, mode='a', header=not os.path.exists(output_csv), index=False)
-                valid_results = []
-            if error_results:
-                error_csv = output_csv.replace('.csv', '_errors.csv')
-                pd.DataFrame(error_results).to_csv(error_csv, mode='a', header=not os.path.exists(error_csv), index=False)
-                error_results = []
-            print(f"\n💾 Auto-saved | Progress: {progress_num}/{total}\n")
-
-    # Final save
-    if valid_results:
-        pd.DataFrame(valid_results).to_csv(output_csv, mode='a', header=not os.path.exists(output_csv), index=False)
-    if error_results:
-        error_csv = output_csv.replace('.csv', '_errors.csv')
-        pd.DataFrame(error_results).to_csv(error_csv, mode='a', header=not os.path.exists(error_csv), index=False)
-
-    # Summary
-    total_processed = len(df_to_process)
-    elapsed_time = time.time() - start_time
-    found_count = sum(1 for r in pd.read_csv(output_csv)['status'] if r == 'FOUND') if os.path.exists(output_csv) else 0
-    found_not_conf = sum(1 for r in pd.read_csv(output_csv)['status'] if r == 'FOUND_NOT_CONFIDENT') if os.path.exists(output_csv) else 0
-    not_found_count = sum(1 for r in pd.read_csv(output_csv.replace('.csv', '_errors.csv'))['status'] if r == 'NOT_FOUND') if os.path.exists(output_csv.replace('.csv', '_errors.csv')) else 0
-    print("\n" + "="*70)
-    print("✅ PROCESSING COMPLETE")
-    print("="*70)
-    print(f"Total processed: {total_processed}")
-    print(f"✅ Found: {found_count}")
-    print(f"⚠️  Found .edu/not confident: {found_not_conf}")
-    print(f"❌ Not found: {not_found_count}")
-    print(f"⏱️  Time: {elapsed_time/60:.1f} min")
-    print(f"\n💾 Saved: {output_csv} and {output_csv.replace('.csv', '_errors.csv')}")
-    print("="*70)
-    return None
+            print("\n🆕 Starting fresh")
+
+        if limit is not None:
+            try:
+                limit = int(limit)
+            except Exception:
+                print(f"[WARN] Invalid limit value: {limit}")
+                limit = None
+        # Parsed, tokenized School records, cached per input file under cache.schools_dir
+        cache_config = config.get('cache', {})
+        schools_dir = cache_config.get('schools_dir', 'data/cache/schools') if cache_config.get('enabled', True) else None
+        rows = iter_schools(input_csv, profile_mascot(self.sport_profile), schools_dir)
+        if skip_processed:
+            rows = (row for row in rows if checkpoints.is_due(row.school_name, row.division))
+        if limit is not None:
+            rows = islice(rows, limit)
+            total = min(total, limit)
+        print(f"   Remaining: {total} schools to process\n")
+        first = next(rows, None)
+        if first is None:
+            checkpoints.close()
+            print("✅ All schools already processed!")
+            return None
+        rows = chain([first], rows)
+
+        search_config = config.get('search', {})
+        workers = self.workers
+        client = self.client
+        if self.offline:
+            print("📴 Offline mode: cached search responses only, domain accessibility checks skipped\n")
+        liveness = self.liveness
+        output_config = config.get('output', {})
+        candidate_store = None
+        if output_config.get('save_candidates', True):
+            candidate_store = _submodule('candidate_store').CandidateStore(output_config.get('candidates_dir', 'data/output/candidates'))
+        if workers > 1:
+            print(f"⚡ Concurrent mode: {workers} workers, ≤{client.limiter.rate:.2f} searches/s\n")
+        valid_out = CsvAppender(output_csv)
+        error_out = CsvAppender(error_csv)
+        start_time = time.time()
+        auto_save_interval = config.get('output', {}).get('auto_save_interval', 10)
+        METRICS.reset()
+        performance = config.get('performance', {})
+        progress = Progress(total, performance.get('show_percentage', True), performance.get('show_eta', False))
+        progress_interval = max(1, int(performance.get('progress_interval', 25)))
+
+        def search(item):
+            n, row = item
+            logger.info(f"[{n}/{total}] 🔍 {row.school_name[:50]}")
+            # Pacing between searches is handled by the client's token bucket.
+            return n, row, self.find(row)
+
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="search") if workers > 1 else None
+        requeue_passes = max(0, int(search_config.get('requeue_passes', 1)))
+        progress_num = 0
+        deferred = 0  # left unrecorded because the daily quota ran out; due on the next run
+        search_cost = 0  # API calls, including those of schools re-queued or deferred
+        searched_found = 0  # domains found through a search (not overrides/domain_map)
+        fanned_out = 0  # schools that needed more than one query
+        queue = rows
+        for pass_num in range(requeue_passes + 1):
+            last_pass = pass_num == requeue_passes
+            requeued = []
+            # Results come back in input order; only a small window of searches overlaps,
+            # so memory stays flat however long the input is.
+            results = ordered_map(search, enumerate(queue, start=1), executor, window=workers * 2)
+            for _, row, result in results:
+                search_cost += result.get('searches', 0)
+                if result.get('quota_exhausted'):
+                    deferred += 1
+                    continue
+                if result.get('rate_limited') and not last_pass:
+                    # Still rate limited after the client's retries: try again once the limiter has settled.
+                    requeued.append(row)
+                    continue
+                progress_num += 1
+                if 'queries' in result:
+                    fanned_out += result['queries'] > 1
+                    searched_found += result['status'] in ('FOUND', 'FOUND_NOT_CONFIDENT')
+                domain = result['domain']
+                status = result['status']
+                score = result.get('score', 0)
+                reason = result.get('reason', '')
+                if candidate_store is not None and 'items' in result:
+                    candidate_store.add(row.school_name, row.division, result['query'], result['items'])
+
+                record = {
+                    'school_name': row.school_name,
+                    'division': row.division,
+                    'city_state': row.city_state,
+                    'type': row.type,
+                    'conference': row.conference,
+                    'athletics_domain': domain,
+                    'status': status,
+                    'score': score,
+                    'reason': reason
+                }
+                checkpoints.record(row.school_name, row.division, 'ERROR' if result.get('error') else status, reason)
+                if status == "FOUND":
+                    logger.info(f"           ✅ {domain} | Score: {score} | Reason: {reason}")
+                    valid_out.write(record)
+                elif status == "FOUND_NOT_CONFIDENT":
+                    logger.info(f"           ⚠️  .edu, not confident: {domain} | Score: {score} | Reason: {reason}")
+                    valid_out.write(record)
+                else:
+                    logger.info(f"           ❌ Not found | Reason: {reason}")
+                    error_out.write(dict(record, athletics_domain=''))
+
+                # Mostrar progreso en cada iteración
+                print(f"Progress: {progress.line(progress_num)}", end='\r')
+                if progress.show_eta and progress_num % progress_interval == 0:
+                    search_p50 = METRICS.percentile('search', 0.5)
+                    print(f"\n📈 {progress.line(progress_num)}" + (f" | search p50 {search_p50 * 1000:.0f} ms" if search_p50 is not None else ""))
+
+                if progress_num % auto_save_interval == 0:
+                    valid_out.sync()
+                    error_out.sync()
+                    if candidate_store is not None:
+                        candidate_store.flush()
+                    print(f"\n💾 Auto-saved | Progress: {progress_num}/{total}\n")
+
+            if not requeued:
+                break
+            queue = requeued
+            print(f"\n🔁 Re-queueing {len(requeued)} rate-limited schools (now ≤{client.limiter.rate:.2f} searches/s)\n")
+
+        if executor:
+            executor.shutdown()
+        if client.cache:
+            print(f"\n🗄️  Search cache: {client.cache.hits} hits, {client.cache.misses} misses")
+        if searched_found:
+            print(f"💸 Search cost: {search_cost} API calls, {search_cost / searched_found:.2f} per domain found by search ({fanned_out} schools needed more than one query)")
+        elif search_cost:
+            print(f"💸 Search cost: {search_cost} API calls, no domain found by search")
+        if client.retries:
+            print(f"🚦 Search retries: {client.retries} ({client.rate_limited} rate limited), ending at ≤{client.limiter.rate:.2f} searches/s")
+        if client.quota and not self.offline:
+            limit = f" of {client.quota.limit}" if client.quota.limit else ""
+            print(f"📊 Search quota: {client.quota.used}{limit} used today")
+        if deferred:
+            print(f"⛽ Daily search quota reached: {deferred} schools left for the next run")
+        if liveness:
+            print(f"🌐 Domain checks: {liveness.probes} probed, {liveness.cached} from cache")
+
+        # Final save
+        valid_out.close()
+        error_out.close()
+        if candidate_store is not None:
+            candidate_store.flush()
+            print(f"🗂️  Raw candidates for {candidate_store.schools} schools saved to {candidate_store.directory}/")
+        if self.global_assignment:
+            # Every searched school so far, this run and earlier ones, in one matching.
+            with METRICS.timer('assignment'):
+                assigned, changed = _submodule('assignment').resolve_results(
+                    output_csv, error_csv, str(candidate_store.directory), config, self.domain_map, self.sport_profile,
+                    checkpoints=checkpoints, liveness=liveness, rules=self.rules,
+                )
+            print(f"🧩 Domain assignment: {assigned} searched schools, {changed} changed by cross-school conflicts")
+        else:
+            # A requeued or retried school was appended again; keep only its latest row.
+            dropped = dedupe_results(output_csv, error_csv)
+            if dropped:
+                print(f"🧹 Dropped {dropped} superseded result rows")
+        self.close()
+
+        # Summary: latest outcome of every school ever processed
+        totals = checkpoints.counts()
+        checkpoints.close()
+        elapsed_time = time.time() - start_time
+        print("\n" + "="*70)
+        print("✅ PROCESSING COMPLETE")
+        print("="*70)
+        print(f"Total processed: {progress_num}")
+        print(f"✅ Found: {totals['FOUND']}")
+        print(f"⚠️  Found .edu/not confident: {totals['FOUND_NOT_CONFIDENT']}")
+        print(f"❌ Not found: {totals['NOT_FOUND']} (+{totals['ERROR']} search errors, retried later)")
+        print(f"⏱️  Time: {elapsed_time/60:.1f} min")
+        metrics_file = performance.get('metrics_file') or output_csv.replace('.csv', '_metrics.jsonl')
+        METRICS.write_summary(
+            metrics_file, pipeline='domain_finder', input=input_csv, output=output_csv, workers=workers, offline=self.offline,
+            processed=progress_num, deferred=deferred, search_cost=search_cost, results=dict(totals),
+        )
+        print(f"\n⏱️  Where the time went (full summary appended to {metrics_file}):")
+        for line in METRICS.report():
+            print(f"   {line}")
+        print(f"\n💾 Saved: {output_csv} and {error_csv}")
+        print("="*70)
+        return None
+
+def process_schools(input_csv, output_csv, limit=None, workers=None, offline=False):
+    """Runs a DomainFinder configured from config.yaml and .env over an input CSV."""
+    return DomainFinder.from_env(offline=offline, workers=workers).process_schools(input_csv, output_csv, limit=limit)
 
 def main():
-    INPUT_CSV = CONFIG.get('input', {}).get('input_file')
-    OUTPUT_CSV = CONFIG.get('output', {}).get('output_file')
+    import sys
+    config = load_config()
+    INPUT_CSV = config.get('input', {}).get('input_file')
+    OUTPUT_CSV = config.get('output', {}).get('output_file')
     # Fallback to default if not set
     if not INPUT_CSV:
         INPUT_CSV = str(Path(__file__).parent.parent / "data" / "input" / "data_input_njcaa_d1_schools_CLEAN.csv")
@@ -507,7 +847,6 @@ def main():
     print("  ✅ Output: athletics_domain, status ('FOUND', 'FOUND_NOT_CONFIDENT', 'NOT_FOUND')")
     print("  ✅ No .edu, no social/media, no Wikipedia. Cumple requerimientos estrictos.")
     print("="*70)
-    import sys
     limit = None
     for i, arg in enumerate(sys.argv):
         if arg == '--limit' and i+1 < len(sys.argv):
@@ -515,9 +854,22 @@ def main():
                 limit = int(sys.argv[i+1])
             except Exception:
                 print(f"[WARN] Invalid value for --limit: {sys.argv[i+1]}")
+    workers = None
+    for i, arg in enumerate(sys.argv):
+        if arg == '--workers' and i+1 < len(sys.argv):
+            try:
+                workers = int(sys.argv[i+1])
+            except Exception:
+                print(f"[WARN] Invalid value for --workers: {sys.argv[i+1]}")
     if '--no-prompt' not in sys.argv:
         input("\nPress ENTER to start...")
-    process_schools(INPUT_CSV, OUTPUT_CSV, limit=limit)
+    configure_logging(config)
+    api_key, cse_id = load_credentials()
+    finder = DomainFinder(config, api_key, cse_id, offline='--offline' in sys.argv, workers=workers)
+    finder.process_schools(INPUT_CSV, OUTPUT_CSV, limit=limit)
 
 if __name__ == "__main__":
-    main()
+    # Run the module imported by its name, so the modules that import domain_finder
+    # (batch_scorer, assignment) share it instead of a second copy next to __main__.
+    import domain_finder
+    domain_finder.main()
@@ -0,0 +1,159 @@
+"""
+Domain liveness checks for candidate selection.
+
+select_candidate only accepts a domain that answers over HTTP. Checks go
+through one LivenessChecker shared by all search threads:
+
+- the top-K eligible candidates of a school are probed concurrently,
+  over a pooled session, following redirects (the final host is recorded);
+- a domain already checked, or being checked for another school, is never
+  probed twice in a run;
+- verdicts are kept in a small SQLite cache across runs. "Up" verdicts live
+  for `ttl_days`, "down" verdicts only for `down_ttl_hours`, so a transient
+  outage does not hide a domain for long.
+"""
+
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    from .metrics import METRICS
+except ImportError:
+    from metrics import METRICS
+
+
+class LivenessCache:
+    """Thread-safe SQLite table of up/down verdicts keyed by domain."""
+
+    def __init__(self, path: str, ttl_seconds: float = 7 * 86400, down_ttl_seconds: float = 12 * 3600):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.down_ttl_seconds = down_ttl_seconds
+        self._lock = threading.Lock()
+        # Checks finish on the checker's "liveness" pool while search threads read verdicts,
+        # so the single connection is only touched under the lock.
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("""CREATE TABLE IF NOT EXISTS liveness (
+                                      domain TEXT PRIMARY KEY,
+                                      up INTEGER NOT NULL,
+                                      final_host TEXT,
+                                      status INTEGER,
+                                      checked_at REAL NOT NULL
+                                  )""")
+
+    def get(self, domain: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT up, final_host, status, checked_at FROM liveness WHERE domain = ?", (domain.lower(),)
+            ).fetchone()
+        if not row:
+            return None
+        ttl = self.ttl_seconds if row[0] else self.down_ttl_seconds
+        if time.time() - row[3] > ttl:
+            return None
+        return {'up': bool(row[0]), 'final_host': row[1], 'status': row[2]}
+
+    def put(self, domain: str, verdict: dict):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO liveness (domain, up, final_host, status, checked_at) VALUES (?, ?, ?, ?, ?)",
+                (domain.lower(), int(verdict['up']), verdict.get('final_host'), verdict.get('status'), time.time()),
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class LivenessChecker:
+    """Concurrent, deduplicated, cached HTTP liveness checks."""
+
+    def __init__(self, timeout: float = 5, workers: int = 8, top_k: int = 3, cache: Optional[LivenessCache] = None):
+        self.timeout = timeout
+        self.top_k = max(1, int(top_k))
+        self.cache = cache
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="liveness")
+        self._lock = threading.Lock()
+        self._checks: Dict[str, Future] = {}
+        self.probes = 0
+        self.cached = 0
+
+    @classmethod
+    def from_config(cls, config: dict, use_cache: bool = True) -> "LivenessChecker":
+        validation = config.get('validation', {})
+        cache_config = config.get('cache', {})
+        cache = None
+        if use_cache and cache_config.get('enabled', True):
+            cache = LivenessCache(
+                cache_config.get('liveness_file', 'data/cache/liveness.sqlite'),
+                ttl_seconds=float(cache_config.get('liveness_ttl_days', 7)) * 86400,
+                down_ttl_seconds=float(cache_config.get('liveness_down_ttl_hours', 12)) * 3600,
+            )
+        return cls(
+            timeout=float(validation.get('accessibility_timeout', 5)),
+            workers=int(validation.get('accessibility_workers', 8)),
+            top_k=int(validation.get('accessibility_top_k', 3)),
+            cache=cache,
+        )
+
+    def _probe(self, domain: str) -> dict:
+        try:
+            with METRICS.timer('head_check', key=domain):
+                r = self.session.head("http://" + domain, timeout=self.timeout, allow_redirects=True)
+            final_host = urlparse(r.url).hostname or domain
+            if final_host.startswith('www.'):
+                final_host = final_host[4:]
+            verdict = {'up': r.status_code < 400, 'final_host': final_host, 'status': r.status_code}
+        except requests.RequestException:
+            verdict = {'up': False, 'final_host': None, 'status': None}
+        if self.cache:
+            self.cache.put(domain, verdict)
+        return verdict
+
+    def submit(self, domain: str) -> Future:
+        """Future verdict for a domain; starts a probe only if none is known or running."""
+        with self._lock:
+            future = self._checks.get(domain)
+            if future is not None:
+                return future
+            cached = self.cache.get(domain) if self.cache else None
+            if cached is not None:
+                future = Future()
+                future.set_result(cached)
+                self.cached += 1
+            else:
+                future = self._executor.submit(self._probe, domain)
+                self.probes += 1
+            self._checks[domain] = future
+            return future
+
+    def prefetch(self, domains: Iterable[str]):
+        """Starts checks for the first top_k domains without waiting for them."""
+        for domain in list(dict.fromkeys(domains))[:self.top_k]:
+            self.submit(domain)
+
+    def verdict(self, domain: str) -> dict:
+        return self.submit(domain).result()
+
+    def is_up(self, domain: str) -> bool:
+        return self.verdict(domain)['up']
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self.session.close()
+        if self.cache:
+            self.cache.close()
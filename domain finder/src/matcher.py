@@ -0,0 +1,100 @@
+"""
+Compiled matchers for the domain blacklist and the scoring word lists.
+
+Each list is compiled once into a trie and answered in a single pass per
+string, instead of one substring scan per entry:
+
+- TermMatcher keeps the plain "entry occurs anywhere in the string"
+  semantics. Its terms are merged into a trie-shaped regex (shared prefixes
+  factored out), which the C regex engine runs in one pass.
+- DomainMatcher matches whole labels only: an entry matches the domain
+  itself and its subdomains ("x.com" matches "x.com" and "www.x.com", but
+  not "max.com" or "x.com.evil.net"). Domains are looked up in a trie of
+  reversed labels, one dict step per label.
+
+domain_matcher() picks one of the two from the `validation.blacklist_match`
+setting ("substring" or "registrable").
+"""
+
+import re
+from typing import Dict, Iterable
+
+MATCH_MODES = ('substring', 'registrable')
+_END = None  # trie key marking the end of an entry
+
+
+def _trie(words: Iterable) -> Dict:
+    root: Dict = {}
+    for word in words:
+        node = root
+        for part in word:
+            node = node.setdefault(part, {})
+        node[_END] = {}
+    return root
+
+
+def _trie_pattern(node: Dict, prune: bool) -> str:
+    """
+    Regex for a character trie. With prune=True, longer entries behind a
+    complete one are dropped: for "does any entry occur" they can never
+    change the answer.
+    """
+    end = _END in node
+    if end and prune:
+        return ''
+    alternatives = [re.escape(ch) + _trie_pattern(node[ch], prune) for ch in sorted(k for k in node if k is not _END)]
+    if not alternatives:
+        return ''
+    if len(alternatives) == 1 and not end:
+        return alternatives[0]
+    return '(?:' + '|'.join(alternatives) + ')' + ('?' if end else '')
+
+
+def trie_regex(terms: Iterable[str]) -> re.Pattern:
+    """One regex that finds any of the literal terms (never matches for an empty list)."""
+    terms = list(terms)
+    if not terms:
+        return re.compile(r'(?!)')
+    return re.compile(_trie_pattern(_trie(terms), prune=True))
+
+
+class TermMatcher:
+    """True when any of the terms occurs anywhere in the text."""
+
+    def __init__(self, terms: Iterable[str]):
+        self.terms = tuple(dict.fromkeys(terms))
+        self.regex = trie_regex(self.terms)
+
+    def search(self, text: str) -> bool:
+        return self.regex.search(text) is not None
+
+
+class DomainMatcher:
+    """True when the domain is one of the entries or a subdomain of one."""
+
+    def __init__(self, domains: Iterable[str]):
+        self.terms = tuple(dict.fromkeys(d.strip().strip('.').lower() for d in domains if d.strip().strip('.')))
+        self._labels = _trie(reversed(d.split('.')) for d in self.terms)
+        if self.terms:
+            self.regex = re.compile(r'(?:^|\.)' + _trie_pattern(_trie(self.terms), prune=False) + r'$')
+        else:
+            self.regex = re.compile(r'(?!)')
+
+    def search(self, domain: str) -> bool:
+        node = self._labels
+        for label in reversed(domain.lower().rstrip('.').split('.')):
+            node = node.get(label)
+            if node is None:
+                return False
+            if _END in node:
+                return True
+        return False
+
+
+def domain_matcher(domains: Iterable[str], mode: str = 'substring'):
+    """Matcher for a list of domains: substring semantics, or whole registrable labels."""
+    if mode == 'substring':
+        return TermMatcher(domains)
+    if mode == 'registrable':
+        return DomainMatcher(domains)
+    raise ValueError(f"Unknown match mode '{mode}' (expected one of: {', '.join(MATCH_MODES)})")
@@ -0,0 +1,166 @@
+"""
+Per-stage timers and counters for a run, shared by the domain finder and the
+coaches scraper.
+
+Stages time themselves with `METRICS.timer(name, key)`: a context manager
+that records the duration under `name` and, for the slowest calls, the `key`
+(a domain or school) that took that long. Counters are plain named totals.
+Recording is one perf_counter() pair and a few locked updates, cheap enough
+for every search, page load and CSV row. Count, total and max are exact;
+percentiles come from a bounded reservoir sample, so memory stays flat
+however long the run.
+
+At the end of a run, summary() reduces each timer to count, total, mean,
+p50, p95 and max, plus its slowest keys, and write_summary() appends it as
+one JSON line to the run metrics file, so runs can be compared over time.
+Progress renders the live progress line with throughput and ETA.
+"""
+
+import json
+import random
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+SLOWEST = 5  # slowest keys kept per timer
+SAMPLES = 10000  # durations kept per timer for percentiles
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class _Timer:
+    __slots__ = ('count', 'total', 'max', 'samples')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples: List[float] = []
+
+
+class Metrics:
+    """Thread-safe registry of named timers and counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Forgets everything recorded so far (start of a run)."""
+        with self._lock:
+            self.started = time.time()
+            self._timers: Dict[str, _Timer] = {}
+            self._random = random.Random(0)
+            self._slowest: Dict[str, List[Tuple[float, str]]] = {}
+            self._counters: Dict[str, int] = {}
+
+    @contextmanager
+    def timer(self, name: str, key: Optional[str] = None):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start, key)
+
+    def add(self, name: str, seconds: float, key: Optional[str] = None):
+        """Records one duration of a stage, e.g. one measured elsewhere."""
+        with self._lock:
+            timer = self._timers.get(name)
+            if timer is None:
+                timer = self._timers[name] = _Timer()
+            timer.count += 1
+            timer.total += seconds
+            timer.max = max(timer.max, seconds)
+            if len(timer.samples) < SAMPLES:
+                timer.samples.append(seconds)
+            else:
+                slot = self._random.randrange(timer.count)
+                if slot < SAMPLES:
+                    timer.samples[slot] = seconds
+            if key is not None:
+                slowest = self._slowest.setdefault(name, [])
+                if len(slowest) < SLOWEST or seconds > slowest[-1][0]:
+                    slowest.append((seconds, key))
+                    slowest.sort(reverse=True)
+                    del slowest[SLOWEST:]
+
+    def count(self, name: str, n: int = 1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def percentile(self, name: str, q: float) -> Optional[float]:
+        """Seconds at quantile q (0-1) of a timer so far, or None before its first call."""
+        with self._lock:
+            timer = self._timers.get(name)
+            samples = sorted(timer.samples) if timer else []
+        return _percentile(samples, q) if samples else None
+
+    def summary(self) -> dict:
+        with self._lock:
+            timers = {name: (t.count, t.total, t.max, sorted(t.samples)) for name, t in self._timers.items()}
+            slowest = {name: list(entries) for name, entries in self._slowest.items()}
+            counters = dict(self._counters)
+        stages = {}
+        for name, (count, total, longest, samples) in sorted(timers.items()):
+            stages[name] = {
+                'count': count,
+                'total_s': round(total, 3),
+                'mean_ms': round(total / count * 1000, 1),
+                'p50_ms': round(_percentile(samples, 0.5) * 1000, 1),
+                'p95_ms': round(_percentile(samples, 0.95) * 1000, 1),
+                'max_ms': round(longest * 1000, 1),
+            }
+            if name in slowest:
+                stages[name]['slowest'] = [[key, round(s * 1000, 1)] for s, key in slowest[name]]
+        return {'started': self.started, 'elapsed_s': round(time.time() - self.started, 3), 'stages': stages, 'counters': dict(sorted(counters.items()))}
+
+    def write_summary(self, path: str, **run) -> dict:
+        """Appends summary() plus the run's own fields as one JSON line to `path`."""
+        summary = dict(run, **self.summary())
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(summary, ensure_ascii=False) + '\n')
+        return summary
+
+    def report(self, limit: int = 8) -> List[str]:
+        """Lines for the end-of-run printout: the stages with the most total time."""
+        stages = self.summary()['stages']
+        lines = []
+        for name, s in sorted(stages.items(), key=lambda item: item[1]['total_s'], reverse=True)[:limit]:
+            line = f"{name:<28} {s['count']:>6}x  total {s['total_s']:>8.1f}s  p50 {s['p50_ms']:>8.1f} ms  p95 {s['p95_ms']:>8.1f} ms"
+            if s.get('slowest'):
+                key, ms = s['slowest'][0]
+                line += f"  slowest: {key} ({ms:.0f} ms)"
+            lines.append(line)
+        return lines
+
+
+METRICS = Metrics()
+
+
+class Progress:
+    """Live progress text: done/total, optionally with percentage, throughput and ETA."""
+
+    def __init__(self, total: int, show_percentage: bool = True, show_eta: bool = False, unit: str = 'schools'):
+        self.total = total
+        self.show_percentage = show_percentage
+        self.show_eta = show_eta
+        self.unit = unit
+        self.start = time.perf_counter()
+
+    def line(self, done: int) -> str:
+        text = f"{done}/{self.total}"
+        if self.show_percentage and self.total:
+            text += f" ({done / self.total:.0%})"
+        if self.show_eta:
+            elapsed = time.perf_counter() - self.start
+            rate = done / elapsed if elapsed > 0 else 0.0
+            text += f" | {rate:.2f} {self.unit}/s"
+            if rate > 0 and done < self.total:
+                text += f" | ETA {(self.total - done) / rate / 60:.1f} min"
+        return text
@@ -0,0 +1,86 @@
+"""
+Query variants tried per school, cheapest-to-stop first.
+
+One query per school misses schools whose site Google does not rank for
+that exact wording. A QueryPlan renders several variants from the school
+fields (see `search.queries` in config.yaml) and find_athletics_domain_for_school
+runs them in rounds of `fanout` queries (1 = one after another, more = that
+many concurrently). Results of all rounds so far are merged and scored
+together, and no further round is sent once a candidate is confident:
+unused and scoring at least `stop_score`. It defaults to the FOUND threshold
+of select_candidate, so any school the first query finds costs exactly one
+search, as before; only schools it would leave NOT_FOUND pay for variants.
+
+Templates use School field names in braces, plus {default} for the
+original build_search_query() query. A variant that uses a field the school
+does not have (e.g. no mascot), or that renders to a query already planned,
+is skipped.
+"""
+
+import re
+import string
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, List, Optional, Set
+
+DEFAULT_VARIANTS = [
+    "{default}",
+    "{school_name} athletics",
+    "{school_name} {mascot} sports",
+    "{school_name} {city_state} athletics site:.com",
+]
+DEFAULT_STOP_SCORE = 150  # select_candidate's threshold for a FOUND domain
+
+
+class QueryPlan:
+    """Renders query variants for a school and decides when to stop searching."""
+
+    def __init__(self, variants: Optional[List[str]] = None, max_queries: int = 3, fanout: int = 1, stop_score: int = DEFAULT_STOP_SCORE):
+        self.variants = list(variants or DEFAULT_VARIANTS)
+        self.max_queries = max(1, int(max_queries))
+        self.fanout = max(1, int(fanout))
+        self.stop_score = stop_score
+        self._executor = ThreadPoolExecutor(max_workers=self.fanout, thread_name_prefix="query") if self.fanout > 1 else None
+
+    @classmethod
+    def from_config(cls, config: dict) -> "QueryPlan":
+        queries = config.get('search', {}).get('queries', {})
+        return cls(
+            variants=queries.get('variants'),
+            max_queries=queries.get('max_queries', 3),
+            fanout=queries.get('fanout', 1),
+            stop_score=queries.get('stop_score', DEFAULT_STOP_SCORE),
+        )
+
+    def queries(self, school) -> List[str]:
+        """Distinct rendered queries for one School, at most max_queries, in variant order."""
+        values = dict(school._asdict(), default=school.query)
+        planned = []
+        for template in self.variants:
+            names = [name for _, name, _, _ in string.Formatter().parse(template) if name]
+            if not all(values.get(name) for name in names):
+                continue
+            query = re.sub(r'\s+', ' ', template.format_map(values)).strip()
+            if query and query not in planned:
+                planned.append(query)
+            if len(planned) >= self.max_queries:
+                break
+        return planned
+
+    def rounds(self, queries: List[str]) -> Iterator[List[str]]:
+        for i in range(0, len(queries), self.fanout):
+            yield queries[i:i + self.fanout]
+
+    def map(self, fn: Callable, queries: List[str]) -> list:
+        """fn over one round of queries, concurrently when fanout > 1."""
+        if self._executor is None or len(queries) == 1:
+            return [fn(q) for q in queries]
+        return list(self._executor.map(fn, queries))
+
+    def confident(self, candidates: list, used_domains: Set[str]) -> bool:
+        """True when a candidate is good enough that further queries are not worth their quota."""
+        return any(c['score'] >= self.stop_score and c['domain'] not in used_domains for c in candidates)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
@@ -0,0 +1,102 @@
+"""
+Daily Custom Search quota, counted across runs.
+
+Google resets the Custom Search quota at midnight Pacific time. DailyQuota
+counts the requests sent on the current Pacific day in a small JSON file, so
+stopping and restarting the finder does not reset the count. With a
+`daily_quota` limit, take() raises QuotaExhausted once the day's budget is
+spent (or once the API itself reports the daily limit) instead of sending a
+request that can only fail.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+try:
+    from zoneinfo import ZoneInfo
+    QUOTA_TZ = ZoneInfo('America/Los_Angeles')
+except Exception:  # no tz database available
+    QUOTA_TZ = timezone(timedelta(hours=-8))
+
+
+class QuotaExhausted(Exception):
+    """Raised instead of sending a search once the daily quota is spent."""
+
+
+class DailyQuota:
+    """Thread-safe per-day request counter persisted to a JSON file; limit 0 only counts."""
+
+    def __init__(self, path: str, limit: int = 0):
+        self.path = Path(path)
+        self.limit = max(0, int(limit))
+        self._lock = threading.Lock()
+        self._day = self._today()
+        self._used = 0
+        self._exhausted = False
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get('day') == self._day:
+                self._used = int(state.get('used', 0))
+                self._exhausted = bool(state.get('exhausted', False))
+        except (OSError, ValueError):
+            pass
+
+    @classmethod
+    def from_config(cls, config: dict) -> "DailyQuota":
+        search = config.get('search', {})
+        return cls(search.get('quota_file', 'data/cache/search_quota.json'), search.get('daily_quota', 0))
+
+    @staticmethod
+    def _today() -> str:
+        return datetime.now(QUOTA_TZ).date().isoformat()
+
+    def _roll(self):
+        today = self._today()
+        if today != self._day:
+            self._day, self._used, self._exhausted = today, 0, False
+
+    def _save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix('.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'day': self._day, 'used': self._used, 'exhausted': self._exhausted}, f)
+        os.replace(tmp, self.path)
+
+    @property
+    def used(self) -> int:
+        with self._lock:
+            self._roll()
+            return self._used
+
+    @property
+    def exhausted(self) -> bool:
+        with self._lock:
+            self._roll()
+            return self._exhausted or (self.limit > 0 and self._used >= self.limit)
+
+    def take(self):
+        """Counts one request about to be sent; raises QuotaExhausted if none is left today."""
+        with self._lock:
+            self._roll()
+            if self._exhausted or (self.limit and self._used >= self.limit):
+                raise QuotaExhausted(f"daily search quota reached ({self._used} used on {self._day})")
+            self._used += 1
+            self._save()
+
+    def release(self):
+        """Gives back a request the API rejected without charging it (429)."""
+        with self._lock:
+            self._roll()
+            self._used = max(0, self._used - 1)
+            self._save()
+
+    def exhaust(self):
+        """The API reported its daily limit: stop sending until the next day."""
+        with self._lock:
+            self._roll()
+            self._exhausted = True
+            self._save()
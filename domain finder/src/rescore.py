@@ -0,0 +1,132 @@
+"""
+Re-rank every school from the stored raw candidates, without network I/O.
+
+process_schools saves what Google returned for each school in the candidate
+store (output.candidates_dir). This script runs the current scoring and
+selection rules over that store (with assignment.mode global, one domain
+assignment across all schools, see assignment.py) and writes a fresh
+results file. It makes
+no search calls and no domain accessibility checks, so a scoring change can
+be evaluated over the whole dataset in seconds.
+
+Usage (from the domain finder folder):
+    python src/rescore.py [--limit N] [--input CSV] [--candidates DIR] [--output CSV]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    from .assignment import assign_domains
+    from .batch_scorer import candidate_table, candidates_for, group_by_school, score_table
+    from .candidate_store import candidates_by_school, load_candidates
+    from .domain_finder import ScoringRules, known_domain_result, load_config, profile_mascot, select_candidate
+    from .schools import load_schools
+except ImportError:
+    from assignment import assign_domains
+    from batch_scorer import candidate_table, candidates_for, group_by_school, score_table
+    from candidate_store import candidates_by_school, load_candidates
+    from domain_finder import ScoringRules, known_domain_result, load_config, profile_mascot, select_candidate
+    from schools import load_schools
+
+RESULT_COLUMNS = ['school_name', 'division', 'city_state', 'type', 'conference', 'athletics_domain', 'status', 'score', 'reason']
+
+
+def rescore(input_csv, output_csv, candidates_dir, limit=None, config=None):
+    start_time = time.time()
+    config = config if config is not None else load_config()
+    rules = ScoringRules.from_config(config)
+    default_profile = list(config.get('sport_profiles', {}).values())[0] if config.get('sport_profiles') else {}
+    cache_config = config.get('cache', {})
+    schools_dir = cache_config.get('schools_dir', 'data/cache/schools') if cache_config.get('enabled', True) else None
+    rows = load_schools(input_csv, profile_mascot(default_profile), schools_dir, limit or 0)
+    stored = candidates_by_school(load_candidates(candidates_dir))
+    print(f"\n📂 {len(rows)} schools from {input_csv}, stored candidates for {len(stored)}")
+
+    # No network: never HEAD-check domains while re-ranking.
+    domain_map = config.get('domain_map', {})
+    config = dict(config, validation=dict(config.get('validation', {}), check_domain_accessibility=False))
+    used_domains = set()
+    global_assignment = config.get('assignment', {}).get('mode', 'global') == 'global'
+
+    # Score every stored candidate of every school in one batch.
+    entries = [stored.get((row.school_name, row.division)) for row in rows]
+    table = candidate_table({i: entry['items'] for i, entry in enumerate(entries) if entry})
+    scored = score_table(table, dict(enumerate(rows)), domain_map, default_profile, rules)
+    scored_by_school = group_by_school(scored)
+    known = {i: known_domain_result(row, config, domain_map) for i, row in enumerate(rows)}
+    if global_assignment:
+        # All searched schools at once: domains wanted by several schools go where the total score is highest.
+        assigned = assign_domains({i: candidates_for(scored_by_school.get(i, []), set()) for i in known if known[i] is None}, rules=rules)
+
+    valid_results = []
+    error_results = []
+    missing = 0
+    for i, row in enumerate(rows):
+        result = known[i]
+        if result is None and global_assignment:
+            result = assigned[i]
+        elif result is None:
+            # Greedy: each school's choice depends on the domains taken before it.
+            candidates = candidates_for(scored_by_school.get(i, []), used_domains)
+            result = select_candidate(candidates, used_domains, config, rules=rules)
+        if entries[i] is None and result['status'] == 'NOT_FOUND' and not result['candidates']:
+            missing += 1
+            result = dict(result, reason='No stored search candidates')
+        record = {
+            'school_name': row.school_name,
+            'division': row.division,
+            'city_state': row.city_state,
+            'type': row.type,
+            'conference': row.conference,
+            'athletics_domain': result['domain'],
+            'status': result['status'],
+            'score': result.get('score', 0),
+            'reason': result.get('reason', ''),
+        }
+        (valid_results if result['status'] in ('FOUND', 'FOUND_NOT_CONFIDENT') else error_results).append(record)
+
+    error_csv = output_csv.replace('.csv', '_errors.csv')
+    pd.DataFrame(valid_results, columns=RESULT_COLUMNS).to_csv(output_csv, index=False)
+    pd.DataFrame(error_results, columns=RESULT_COLUMNS).to_csv(error_csv, index=False)
+
+    print("\n" + "="*70)
+    print("✅ RESCORE COMPLETE")
+    print("="*70)
+    print(f"✅ Found: {sum(1 for r in valid_results if r['status'] == 'FOUND')}")
+    print(f"⚠️  Found .edu/not confident: {sum(1 for r in valid_results if r['status'] == 'FOUND_NOT_CONFIDENT')}")
+    print(f"❌ Not found: {len(error_results)} ({missing} without stored candidates)")
+    print(f"⏱️  Time: {time.time() - start_time:.2f} s")
+    print(f"\n💾 Saved: {output_csv} and {error_csv}")
+    print("="*70)
+
+
+def main():
+    config = load_config()
+    input_csv = config.get('input', {}).get('input_file') or str(Path(__file__).parent.parent / "data" / "input" / "data_input_njcaa_d1_schools_CLEAN.csv")
+    output_config = config.get('output', {})
+    candidates_dir = output_config.get('candidates_dir', 'data/output/candidates')
+    output_csv = str(Path(output_config.get('output_file') or "data/output/domain_results.csv").with_name("rescored_domain_results.csv"))
+    limit = None
+    for i, arg in enumerate(sys.argv):
+        if i + 1 >= len(sys.argv):
+            break
+        if arg == '--limit':
+            try:
+                limit = int(sys.argv[i+1])
+            except Exception:
+                print(f"[WARN] Invalid value for --limit: {sys.argv[i+1]}")
+        elif arg == '--input':
+            input_csv = sys.argv[i+1]
+        elif arg == '--candidates':
+            candidates_dir = sys.argv[i+1]
+        elif arg == '--output':
+            output_csv = sys.argv[i+1]
+    rescore(input_csv, output_csv, candidates_dir, limit=limit, config=config)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Typed school records, preprocessed once per input file.
+
+Every input row becomes a School: the cleaned input columns plus what the
+finder derives from them on every search - the lowercase tokens matched
+against candidates, the default search query and the manual_overrides key.
+Both the domain finder and the coaches scraper read their input through
+iter_schools() / load_schools().
+
+With a cache directory, the records of an input file are stored under a hash
+of its contents (and of the profile mascot, which enters tokens and query),
+so later runs over the same file skip CSV parsing and tokenizing. The cache
+is a stream of pickled chunks of plain tuples: it is read in constant memory
+and does not depend on how this module was imported. It is only kept once
+the whole file has been read; runs cut short by a limit build it again.
+"""
+
+import hashlib
+import os
+import pickle
+import re
+from pathlib import Path
+from typing import FrozenSet, Iterator, List, NamedTuple, Optional
+
+try:
+    from .streaming import read_schools
+except ImportError:
+    from streaming import read_schools
+
+CACHE_VERSION = 1  # bump when School or its derived fields change
+CHUNK_SIZE = 1000
+TOKEN_SPLIT = re.compile('[^a-zA-Z0-9]')
+
+
+def safe_str(val) -> str:
+    """An input cell as a string: None and NaN (pandas rows) become ''."""
+    if val is None:
+        return ''
+    if isinstance(val, float) and val != val:
+        return ''
+    return str(val)
+
+
+def _words(text: str) -> List[str]:
+    return [w.lower() for w in TOKEN_SPLIT.split(text) if len(w) > 2]
+
+
+class School(NamedTuple):
+    """One input row, cleaned, with its search tokens, default query and override key."""
+
+    school_name: str
+    division: str
+    city_state: str
+    type: str
+    conference: str
+    athletics_domain: str
+    status: str
+    mascot: str
+    tokens: FrozenSet[str]
+    query: str
+    override_key: str
+
+    @classmethod
+    def from_row(cls, row, mascot: str = '') -> "School":
+        """Builds the record from a CSV dict or pandas row; `mascot` comes from the sport profile."""
+        def cell(column):
+            return safe_str(row.get(column, '')).strip()
+
+        name, division, city_state, conference = cell('school_name'), cell('division'), cell('city_state'), cell('conference')
+        tokens = set(_words(name))
+        if city_state:
+            tokens.update(_words(city_state))
+        if mascot:
+            tokens.add(mascot.lower())
+        if conference:
+            tokens.add(conference.lower())
+        query = " ".join(p for p in (name, city_state, conference, mascot, "athletics", "official site") if p)
+        return cls(
+            school_name=name,
+            division=division,
+            city_state=city_state,
+            type=cell('type'),
+            conference=conference,
+            athletics_domain=cell('athletics_domain'),
+            status=cell('status'),
+            mascot=mascot,
+            tokens=frozenset(tokens),
+            query=query,
+            override_key=f"{name}|{division}",
+        )
+
+
+def cache_key(path: str, mascot: str = '') -> str:
+    """Hash of the input file's bytes, the mascot and the record format."""
+    digest = hashlib.sha256(f"v{CACHE_VERSION}\x00{mascot}\x00".encode('utf-8'))
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()[:32]
+
+
+def _read_cache(path: Path) -> Iterator[School]:
+    with open(path, 'rb') as f:
+        while True:
+            try:
+                chunk = pickle.load(f)
+            except EOFError:
+                return
+            for values in chunk:
+                yield School._make(values)
+
+
+def _build_cache(input_csv: str, mascot: str, path: Path) -> Iterator[School]:
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    complete = False
+    try:
+        with open(tmp, 'wb') as f:
+            chunk = []
+            for row in read_schools(input_csv):
+                school = School.from_row(row, mascot)
+                chunk.append(tuple(school))
+                if len(chunk) >= CHUNK_SIZE:
+                    pickle.dump(chunk, f, protocol=pickle.HIGHEST_PROTOCOL)
+                    chunk = []
+                yield school
+            if chunk:
+                pickle.dump(chunk, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        complete = True
+        # Records of older versions of the same input file are no longer needed.
+        for stale in path.parent.glob(f"{_stem(input_csv)}-*.pickle"):
+            if stale != path:
+                stale.unlink(missing_ok=True)
+    finally:
+        if not complete:
+            tmp.unlink(missing_ok=True)
+
+
+def _stem(input_csv: str) -> str:
+    return re.sub(r'[^A-Za-z0-9_.-]', '_', Path(input_csv).stem)
+
+
+def iter_schools(input_csv: str, mascot: str = '', cache_dir: Optional[str] = None) -> Iterator[School]:
+    """School records of an input CSV, in file order, from the cache when it is current."""
+    if cache_dir is None:
+        for row in read_schools(input_csv):
+            yield School.from_row(row, mascot)
+        return
+    path = Path(cache_dir) / f"{_stem(input_csv)}-{cache_key(input_csv, mascot)}.pickle"
+    if path.exists():
+        yield from _read_cache(path)
+    else:
+        yield from _build_cache(input_csv, mascot, path)
+
+
+def load_schools(input_csv: str, mascot: str = '', cache_dir: Optional[str] = None, limit: int = 0) -> List[School]:
+    """iter_schools() as a list, optionally only the first `limit` schools."""
+    schools = []
+    for school in iter_schools(input_csv, mascot, cache_dir):
+        schools.append(school)
+        if limit and len(schools) >= limit:
+            break
+    return schools
@@ -0,0 +1,116 @@
+"""
+Persistent cache of raw Google Custom Search responses.
+
+Responses are stored as one JSON file per query, content-addressed by a hash
+of the normalized query string and `num`, so re-running the finder after a
+scoring change costs no quota and no network time. Entries expire after
+`ttl_seconds`; when the cache holds more than `max_entries` files the oldest
+are evicted first.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+
+class OfflineCacheMiss(Exception):
+    """Raised in offline mode for a query that is not in the search cache."""
+
+
+def normalize_query(query: str) -> str:
+    return re.sub(r'\s+', ' ', str(query)).strip().lower()
+
+
+class SearchCache:
+    """Thread-safe, size-bounded, TTL'd directory of cached search responses."""
+
+    EVICT_EVERY = 100  # puts between size checks
+
+    def __init__(self, directory: str, ttl_seconds: float = 30 * 86400, max_entries: int = 20000):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._puts = 0
+        self.hits = 0
+        self.misses = 0
+        self.evict()
+
+    @classmethod
+    def from_config(cls, config: dict) -> Optional["SearchCache"]:
+        cache_config = config.get('cache', {})
+        if not cache_config.get('enabled', True):
+            return None
+        return cls(
+            cache_config.get('directory', 'data/cache/search'),
+            ttl_seconds=float(cache_config.get('ttl_days', 30)) * 86400,
+            max_entries=int(cache_config.get('max_entries', 20000)),
+        )
+
+    @staticmethod
+    def key(query: str, num: int) -> str:
+        return hashlib.sha256(f"{normalize_query(query)}\x00{int(num)}".encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, query: str, num: int) -> Optional[dict]:
+        """Returns the cached response body for a query, or None if absent or expired."""
+        path = self._path(self.key(query, num))
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+        if time.time() - entry.get('fetched_at', 0) > self.ttl_seconds:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return entry.get('response')
+
+    def put(self, query: str, num: int, response: dict):
+        key = self.key(query, num)
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {'query': normalize_query(query), 'num': int(num), 'fetched_at': time.time(), 'response': response}
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(tmp, path)
+        with self._lock:
+            self._puts += 1
+            due = self._puts % self.EVICT_EVERY == 0
+        if due:
+            self.evict()
+
+    def evict(self) -> int:
+        """Drops expired entries, then the oldest ones beyond max_entries. Returns the number removed."""
+        with self._lock:
+            entries = []
+            for path in self.directory.glob('*/*.json'):
+                try:
+                    entries.append((path.stat().st_mtime, path))
+                except OSError:
+                    pass
+            cutoff = time.time() - self.ttl_seconds
+            expired = [p for mtime, p in entries if mtime < cutoff]
+            fresh = sorted((e for e in entries if e[0] >= cutoff), key=lambda e: e[0])
+            overflow = [p for _, p in fresh[:max(0, len(fresh) - self.max_entries)]]
+            removed = 0
+            for path in expired + overflow:
+                try:
+                    path.unlink()
+                    removed += 1
+                except OSError:
+                    pass
+            return removed
@@ -0,0 +1,181 @@
+"""
+Google Custom Search client shared by all search threads.
+
+Wraps the HTTP call made by find_athletics_domain_for_school so that rate
+limiting and the number of requests in flight are enforced in one place.
+The endpoint can point at a local stub server (`search.endpoint` in
+config.yaml) for offline testing.
+
+With a SearchCache, answered queries are served from disk without touching
+the limiter or the network; in offline mode a query missing from the cache
+raises OfflineCacheMiss instead of being sent.
+
+429, 5xx and network failures are retried up to `max_retries` times with
+full-jitter exponential backoff, or after the server's Retry-After. A 429
+also throttles the shared limiter, so all threads slow down together instead
+of each one stalling on its own. Every request sent is counted against the
+DailyQuota; once it is spent, search() raises QuotaExhausted.
+"""
+
+import threading
+import time
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    from .metrics import METRICS
+    from .quota import DailyQuota, QuotaExhausted
+    from .search_cache import OfflineCacheMiss, SearchCache
+    from .throttle import TokenBucket, backoff_delay, retry_after_seconds
+except ImportError:
+    from metrics import METRICS
+    from quota import DailyQuota, QuotaExhausted
+    from search_cache import OfflineCacheMiss, SearchCache
+    from throttle import TokenBucket, backoff_delay, retry_after_seconds
+
+DEFAULT_SEARCH_URL = "https://www.googleapis.com/customsearch/v1"
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+DAILY_LIMIT_REASONS = ('dailyLimitExceeded', 'quotaExceeded')
+
+
+def is_daily_limit(response) -> bool:
+    """True for a 429 that reports the per-day quota rather than a short-term rate limit."""
+    try:
+        error = response.json().get('error', {})
+    except ValueError:
+        return False
+    reasons = [e.get('reason', '') for e in error.get('errors', []) if isinstance(e, dict)]
+    return any(r in DAILY_LIMIT_REASONS for r in reasons) or 'per day' in str(error.get('message', '')).lower()
+
+
+class CachedResponse:
+    """Stand-in for a requests.Response served from the search cache."""
+
+    status_code = 200
+    from_cache = True
+
+    def __init__(self, payload: dict):
+        self._payload = payload
+
+    def json(self) -> dict:
+        return self._payload
+
+
+class SearchClient:
+    """Pooled, rate-limited Custom Search client; safe to share between threads."""
+
+    def __init__(
+        self,
+        api_key: str,
+        cse_id: str,
+        endpoint: str = DEFAULT_SEARCH_URL,
+        timeout: float = 10,
+        limiter: Optional[TokenBucket] = None,
+        max_in_flight: int = 4,
+        cache: Optional[SearchCache] = None,
+        offline: bool = False,
+        quota: Optional[DailyQuota] = None,
+        max_retries: int = 5,
+        backoff_base: float = 2.0,
+        backoff_max: float = 120.0,
+    ):
+        self.api_key = api_key
+        self.cse_id = cse_id
+        self.endpoint = endpoint
+        self.timeout = timeout
+        self.limiter = limiter
+        self.cache = cache
+        self.offline = offline
+        self.quota = quota
+        self.max_retries = max(0, int(max_retries))
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retries = 0
+        self.rate_limited = 0
+        self._lock = threading.Lock()
+        self._in_flight = threading.BoundedSemaphore(max(1, max_in_flight))
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, max_in_flight))
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+
+    @classmethod
+    def from_config(cls, config: dict, api_key: str, cse_id: str, max_in_flight: int = 1, offline: bool = False) -> "SearchClient":
+        search = config.get('search', {})
+        return cls(
+            api_key,
+            cse_id,
+            endpoint=search.get('endpoint', DEFAULT_SEARCH_URL),
+            timeout=search.get('request_timeout', 10),
+            limiter=TokenBucket.from_config(search),
+            max_in_flight=search.get('max_in_flight', max_in_flight),
+            cache=SearchCache.from_config(config),
+            offline=offline,
+            quota=DailyQuota.from_config(config),
+            max_retries=search.get('max_retries', 5),
+            backoff_base=float(search.get('backoff_base_seconds', 2)),
+            backoff_max=float(search.get('backoff_max_seconds', 120)),
+        )
+
+    def search(self, query: str, num: int = 10):
+        """Runs one Custom Search query and returns the HTTP response (or its cached copy)."""
+        if self.cache:
+            payload = self.cache.get(query, num)
+            if payload is not None:
+                METRICS.count('search_cache_hits')
+                return CachedResponse(payload)
+        if self.offline:
+            raise OfflineCacheMiss(f"offline mode, query not cached: {query!r}")
+        params = {'key': self.api_key, 'cx': self.cse_id, 'q': query, 'num': num}
+        attempt = 0
+        while True:
+            if self.limiter:
+                self.limiter.acquire()
+            if self.quota:
+                self.quota.take()
+            try:
+                with self._in_flight, METRICS.timer('search_request'):
+                    response = self._session.get(self.endpoint, params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if self.quota:
+                    self.quota.release()
+                if attempt >= self.max_retries:
+                    raise
+                time.sleep(backoff_delay(attempt, self.backoff_base, self.backoff_max))
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    if self.limiter:
+                        self.limiter.recover()
+                    break
+                if response.status_code == 429:
+                    with self._lock:
+                        self.rate_limited += 1
+                    if self.quota:
+                        self.quota.release()
+                        if is_daily_limit(response):
+                            self.quota.exhaust()
+                            raise QuotaExhausted("the API reported the daily search quota as exceeded")
+                delay = retry_after_seconds(response.headers.get('Retry-After'))
+                if delay is None:
+                    delay = backoff_delay(attempt, self.backoff_base, self.backoff_max)
+                throttled = response.status_code == 429 and self.limiter is not None
+                if throttled:
+                    self.limiter.throttle(delay)  # the next acquire() waits it out, along with every other thread
+                if attempt >= self.max_retries:
+                    break
+                if not throttled:
+                    time.sleep(delay)
+            attempt += 1
+            with self._lock:
+                self.retries += 1
+        if self.cache and response.status_code == 200:
+            try:
+                self.cache.put(query, num, response.json())
+            except ValueError:
+                pass
+        return response
+
+    def close(self):
+        self._session.close()
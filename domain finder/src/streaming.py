@@ -0,0 +1,139 @@
+"""
+Constant-memory CSV input/output for process_schools.
+
+The input is read one row at a time with the csv module, results are
+appended through one open handle per output file, and status totals are
+counted by the checkpoint store. Nothing here grows with the size of the input.
+"""
+
+import csv
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+try:
+    from .metrics import METRICS
+except ImportError:
+    from metrics import METRICS
+
+RESULT_FIELDS = ['school_name', 'division', 'city_state', 'type', 'conference', 'athletics_domain', 'status', 'score', 'reason']
+VALID_STATUSES = ('FOUND', 'FOUND_NOT_CONFIDENT')  # rows of the output file; the rest go to _errors
+
+
+def read_schools(path: str) -> Iterator[Dict[str, str]]:
+    """Yields input rows as dicts of strings (missing values are '')."""
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        for row in csv.DictReader(f):
+            yield {k: (v if v is not None else '') for k, v in row.items()}
+
+
+def approx_row_count(path: str) -> int:
+    """Data rows in a CSV by counting newlines in 1 MB blocks (exact unless fields contain newlines)."""
+    lines = 0
+    last = b'\n'
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            lines += block.count(b'\n')
+            last = block[-1:]
+    if last != b'\n':
+        lines += 1
+    return max(0, lines - 1)
+
+
+class CsvAppender:
+    """
+    Append-only CSV writer that keeps one handle open for the whole run.
+
+    The file and its header are created on the first row, so a run without
+    rows leaves no empty file behind. sync() flushes and fsyncs so every row
+    written so far survives a crash; a row torn by an earlier crash is
+    terminated before appending. The coaches scraper writes its outputs
+    through this class too.
+    """
+
+    def __init__(self, path: str, fieldnames: List[str] = RESULT_FIELDS):
+        self.path = Path(path)
+        self.fieldnames = fieldnames
+        self.rows = 0
+        self._file = None
+        self._writer = None
+
+    def _open(self):
+        new_file = not self.path.exists() or self.path.stat().st_size == 0
+        torn_line = False
+        if not new_file:
+            with open(self.path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                torn_line = f.read(1) not in (b'\n', b'\r')
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'a', encoding='utf-8', newline='')
+        if torn_line:
+            self._file.write('\n')
+        self._writer = csv.DictWriter(self._file, fieldnames=self.fieldnames, extrasaction='ignore', lineterminator='\n')
+        if new_file:
+            self._writer.writeheader()
+
+    def write(self, row: Dict):
+        self.write_rows([row])
+
+    def write_rows(self, rows: Iterable[Dict]):
+        rows = list(rows)
+        if not rows:
+            return
+        with METRICS.timer('csv_write'):
+            if self._file is None:
+                self._open()
+            self._writer.writerows(rows)
+        self.rows += len(rows)
+
+    def sync(self):
+        if self._file is not None:
+            with METRICS.timer('csv_sync'):
+                self._file.flush()
+                os.fsync(self._file.fileno())
+
+    def close(self):
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+
+def latest_results(output_csv: str, error_csv: str) -> Tuple[Dict[Tuple[str, str], Dict[str, str]], int]:
+    """
+    The latest result row of every (school_name, division) in a run's result
+    files, in file order, and the number of older rows they superseded.
+
+    Rows are appended, so a school's latest row is the last one of its file;
+    a school in both files was retried after a NOT_FOUND or ERROR and then
+    found (found schools are never searched again), so its output_csv row wins.
+    """
+    latest: Dict[Tuple[str, str], Dict[str, str]] = {}
+    superseded = 0
+    for path in (error_csv, output_csv):
+        for row in read_schools(path) if os.path.exists(path) else ():
+            key = (row.get('school_name', '').strip(), row.get('division', '').strip())
+            superseded += key in latest
+            latest[key] = row
+    return latest, superseded
+
+
+def write_results(output_csv: str, error_csv: str, rows: Iterable[Dict]):
+    """Replaces both result files with `rows`, split by status; each file is swapped in atomically."""
+    rows = list(rows)
+    for path, part in ((output_csv, [r for r in rows if r.get('status') in VALID_STATUSES]),
+                       (error_csv, [r for r in rows if r.get('status') not in VALID_STATUSES])):
+        tmp = Path(f"{path}.tmp")
+        with open(tmp, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS, extrasaction='ignore', lineterminator='\n')
+            writer.writeheader()
+            writer.writerows(part)
+        os.replace(tmp, path)
+
+
+def dedupe_results(output_csv: str, error_csv: str) -> int:
+    """Keeps only the latest row of each school in the result files. Returns the number of rows dropped."""
+    latest, superseded = latest_results(output_csv, error_csv)
+    if superseded:
+        write_results(output_csv, error_csv, latest.values())
+    return superseded
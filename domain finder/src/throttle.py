@@ -0,0 +1,103 @@
+"""
+Rate limiting for Google Custom Search calls.
+
+A TokenBucket shared by all search threads keeps the overall request rate at
+`rate` requests per second (one every `search.rate_limit_seconds`), while
+`capacity` controls how many requests may go out back to back after a pause.
+
+The rate adapts to what the API accepts: throttle() on a 429 pauses every
+thread for the backoff delay and halves the rate, and each accepted request
+recover()s a tenth of the configured rate, up to the configured maximum.
+"""
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+MIN_RATE_FRACTION = 1 / 16   # the rate never drops below this share of the configured rate
+RECOVERY_STEP = 0.1          # share of the configured rate regained per accepted request
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Full-jitter exponential backoff: uniform in [0, min(cap, base * 2**attempt)]."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date), or None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Thread-safe token bucket; acquire() blocks until a token is available."""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.max_rate = self.rate
+        self.capacity = max(1.0, float(capacity))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, search_config: dict) -> "TokenBucket":
+        """Builds the limiter from `search.qps` or, failing that, `search.rate_limit_seconds`."""
+        qps = search_config.get('qps')
+        if not qps:
+            qps = 1.0 / max(float(search_config.get('rate_limit_seconds', 1.5)), 1e-6)
+        return cls(qps, search_config.get('burst', 1))
+
+    def _refill(self):
+        now = time.monotonic()
+        if now > self._updated:  # no tokens accrue while paused
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+    def throttle(self, pause: float):
+        """Rate limited by the server: hold every caller for `pause` seconds and halve the rate."""
+        with self._lock:
+            now = time.monotonic()
+            if now >= self._paused_until:
+                # 429s from requests already in flight during a pause count as one signal.
+                self.rate = max(self.max_rate * MIN_RATE_FRACTION, self.rate / 2)
+            self._paused_until = max(self._paused_until, now + pause)
+            self._tokens = 0.0
+            self._updated = self._paused_until
+
+    def recover(self):
+        """A request went through: step the rate back towards the configured maximum."""
+        with self._lock:
+            if self.rate < self.max_rate:
+                self._refill()
+                self.rate = min(self.max_rate, self.rate + self.max_rate * RECOVERY_STEP)
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Takes `tokens`, sleeping as needed. Returns the time spent waiting."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    delay = self._paused_until - now
+                else:
+                    self._refill()
+                    if self._tokens >= tokens:
+                        self._tokens -= tokens
+                        return waited
+                    delay = (tokens - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay